@@ -0,0 +1,54 @@
+"""
+FastAPI dependencies for application-lifetime services.
+
+The objects themselves are created and torn down by the lifespan handler in
+backend.main and stored on `app.state`.
+"""
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, Request
+
+from backend.services.trends_cache import TrendsCache, TrendsLoader
+from backend.services.trends_regions import TrendsRegion
+from backend.services.trends_service import TrendsService
+
+
+def get_trends_service(request: Request) -> TrendsService:
+    """Return the application-wide TrendsService."""
+    return request.app.state.trends_service
+
+
+def get_trends_region(
+    request: Request,
+    region: Optional[str] = Query(
+        None,
+        description="Country code of the trends region (defaults to TRENDS_REGION)"
+    ),
+) -> TrendsRegion:
+    """
+    Return the requested region's caches and background tasks.
+    
+    Raises:
+        HTTPException: 400 for a region that is not configured (TRENDS_REGIONS)
+    """
+    regions: dict[str, TrendsRegion] = request.app.state.trends_regions
+    if region is None:
+        return next(iter(regions.values()))
+    
+    found = regions.get(region.strip().lower())
+    if found is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown region '{region}'. Available regions: {', '.join(regions)}"
+        )
+    return found
+
+
+def get_trends_cache(region: TrendsRegion = Depends(get_trends_region)) -> TrendsCache:
+    """Return the requested region's trends snapshot cache."""
+    return region.cache
+
+
+def get_trends_loader(region: TrendsRegion = Depends(get_trends_region)) -> TrendsLoader:
+    """Return the loader that builds the region's trends snapshots for the cache."""
+    return region.loader
@@ -0,0 +1,40 @@
+"""
+FastAPI routes for debugging request latency.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from backend.core.config import Config
+from backend.core.tracing import TRACER
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+def require_debug_traces():
+    """404 unless DEBUG_TRACES_ENABLED; traces are served without authentication."""
+    if not Config.DEBUG_TRACES_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+@router.get("/traces", dependencies=[Depends(require_debug_traces)])
+async def slowest_traces(
+    limit: int = Query(10, ge=1, le=100, description="Number of traces to return"),
+    span: Optional[str] = Query(
+        None,
+        description="Rank by the total time spent in spans with this name (e.g. openai_chat)"
+    ),
+):
+    """
+    The slowest recent requests and background refreshes, broken down by span.
+
+    Traces come from the in-process ring buffer (TRACE_BUFFER_SIZE most
+    recent); each lists its spans with offsets and durations, and a
+    per-span-name breakdown of where the time went. Only served when
+    DEBUG_TRACES_ENABLED is set.
+    """
+    return JSONResponse({
+        **TRACER.stats(),
+        "traces": [trace.to_dict() for trace in TRACER.slowest(limit, name=span)],
+    })
@@ -1,11 +1,30 @@
 """
 FastAPI routes for Tech Trends endpoint.
 """
+import asyncio
+import hashlib
+import json
 import logging
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import AsyncIterator, Optional
 
-from backend.models.trends import TrendsResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from backend.api.dependencies import (
+    get_trends_cache,
+    get_trends_loader,
+    get_trends_region,
+    get_trends_service,
+)
+from backend.models.trends import TrendItem, TrendsResponse
+from backend.core.config import Config
+from backend.core.startup import STARTUP_PROFILE
+from backend.services.serialization import dumps_model
+from backend.services.trends_cache import CacheEntry, TrendsCache, TrendsLoader
+from backend.services.trends_index import InvalidCursorError
+from backend.services.trends_regions import TrendsRegion
 from backend.services.trends_service import TrendsService
 
 logger = logging.getLogger(__name__)
@@ -13,37 +32,258 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/trends", tags=["trends"])
 
 
+def _last_modified(entry: CacheEntry) -> datetime:
+    """Snapshot modification time as an aware UTC datetime (second precision)."""
+    last_updated = entry.response.last_updated
+    if last_updated.tzinfo is None:
+        last_updated = last_updated.replace(tzinfo=timezone.utc)
+    return last_updated.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _cache_headers(entry: CacheEntry, cache: TrendsCache, etag: str) -> dict[str, str]:
+    """Validator and freshness headers for a snapshot response."""
+    max_age = int(min(cache.seconds_until_stale(entry), Config.TRENDS_HTTP_MAX_AGE_SECONDS))
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(_last_modified(entry), usegmt=True),
+        "Cache-Control": (
+            f"public, max-age={max_age}, "
+            f"stale-while-revalidate={int(Config.TRENDS_HTTP_MAX_AGE_SECONDS)}"
+        ),
+    }
+
+
+def _is_not_modified(request: Request, entry: CacheEntry, etag: str) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against the snapshot (RFC 7232)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence and uses weak comparison
+        if if_none_match.strip() == "*":
+            return True
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return any(
+            tag.removeprefix("W/") == etag
+            for tag in candidates
+        )
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return _last_modified(entry) <= since
+    
+    return False
+
+
 @router.get("", response_model=TrendsResponse)
-async def get_trends():
+async def get_trends(
+    request: Request,
+    category: Optional[str] = Query(None, description="Only items in this category"),
+    source: Optional[str] = Query(None, description="Only items from this source domain"),
+    since: Optional[datetime] = Query(None, description="Only items published at or after this time"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Maximum items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    loader: TrendsLoader = Depends(get_trends_loader),
+    cache: TrendsCache = Depends(get_trends_cache),
+):
     """
     Get current tech trends.
     
     Fetches latest technology trends from Google Search and enriches them
-    with AI-generated highlights.
+    with AI-generated highlights. Served from the process-wide snapshot cache,
+    which the background refresher keeps warm; without the refresher, stale
+    snapshots are returned while a background refresh rebuilds them.
+    
+    Responses carry a strong ETag and Last-Modified for the snapshot, and
+    conditional requests (If-None-Match / If-Modified-Since) for an unchanged
+    snapshot get an empty 304. The body is the snapshot's pre-serialized JSON,
+    so no per-request validation or serialization takes place
+    (`response_model` is kept for the OpenAPI schema only).
+    
+    With any of `category`, `source`, `since`, `limit` or `cursor`, the
+    response is a newest-first page served from the snapshot's indexes;
+    `next_cursor` is set when more items match.
+    
+    In two-phase mode (TRENDS_TWO_PHASE) items may be served with
+    `enrichment_status: "pending"` before their highlight is ready; the
+    snapshot (and its ETag) is updated as highlights arrive.
     
     Returns:
         TrendsResponse with list of trend items and last updated timestamp
     """
     try:
-        service = TrendsService()
-        response = await service.get_trends()
-        return response
+        entry = await cache.get_entry(loader)
     except Exception as e:
         logger.error(f"Error in get_trends endpoint: {e}", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail="Failed to fetch trends. Please try again later."
         )
+    
+    filtered = any(value is not None for value in (category, source, since, limit, cursor))
+    
+    # Filtered pages are derived deterministically from the snapshot, so their
+    # validator combines the snapshot ETag with the query
+    etag = entry.etag
+    if filtered:
+        digest = hashlib.sha256(f"{entry.etag}?{request.url.query}".encode("utf-8"))
+        etag = '"' + digest.hexdigest()[:32] + '"'
+    
+    headers = _cache_headers(entry, cache, etag)
+    if _is_not_modified(request, entry, etag):
+        return Response(status_code=304, headers=headers)
+    
+    body = entry.body
+    if filtered:
+        try:
+            body = entry.index.query(
+                category=category,
+                source=source,
+                since=since,
+                limit=limit,
+                cursor=cursor,
+            ).body
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _sse(event: str, data: bytes) -> bytes:
+    """Format one Server-Sent Event."""
+    return b"event: " + event.encode("ascii") + b"\ndata: " + data + b"\n\n"
+
+
+def _highlight_patch(item: TrendItem) -> bytes:
+    """`highlight` event payload for an item sent earlier."""
+    return json.dumps({"url": item.url, "highlight": item.highlight}).encode("utf-8")
+
+
+def _done_event(entry: Optional[CacheEntry]) -> bytes:
+    """Final stream event summarizing the snapshot."""
+    return _sse("done", json.dumps({
+        "count": len(entry.response.items) if entry else 0,
+        "last_updated": entry.response.last_updated.isoformat() if entry else None,
+    }).encode("utf-8"))
+
+
+async def _trend_events(
+    service: TrendsService,
+    region: TrendsRegion
+) -> AsyncIterator[bytes]:
+    """
+    SSE events for /api/trends/stream.
+    
+    With a cached snapshot, its items are sent straight away. Otherwise this
+    stream runs the pipeline as the cache's (single-flight) refresh and
+    forwards items as soon as they are normalized, then a `highlight` patch
+    per item as each enrichment batch finishes. A stream that finds another
+    refresh already in flight waits for it and sends the resulting snapshot,
+    as does one whose refresh adopted another worker's snapshot (shared
+    store) without running the pipeline here.
+    
+    In two-phase mode the stream's refresh is built like the worker's own
+    loader: items are not enriched inline but queued for the enrichment
+    worker, so readers joining the refresh do not wait on OpenAI, and only
+    carried-forward highlights are patched in.
+    """
+    cache = region.cache
+    worker = region.worker
+    if cache.entry is None:
+        queue: asyncio.Queue = asyncio.Queue()
+        streamed = False
+        
+        async def forwarding_loader() -> TrendsResponse:
+            # Events are serialized here, as they happen, since enrichment
+            # keeps updating the same items while the client catches up
+            nonlocal streamed
+            streamed = True
+            response = TrendsResponse(items=[], last_updated=datetime.utcnow())
+            async for event, payload in service.stream_trends(enrich=worker is None, region=region.name):
+                if event == "done":
+                    response = payload
+                elif event == "items":
+                    for item in payload:
+                        queue.put_nowait(_sse("item", dumps_model(item)))
+                else:
+                    for item in payload:
+                        if item.highlight:
+                            queue.put_nowait(_sse("highlight", _highlight_patch(item)))
+            if worker is not None:
+                worker.enqueue(response.items)
+            return response
+        
+        task = cache.start_refresh_if_idle(region.coordinate(forwarding_loader))
+        if task is not None:
+            # Ended by the refresh task, not the loader: a shared-store
+            # refresh may finish without calling the loader at all
+            task.add_done_callback(lambda _: queue.put_nowait(None))
+            while (message := await queue.get()) is not None:
+                yield message
+            
+            # Let the cache store the result before reporting it
+            await asyncio.wait({task})
+            if streamed:
+                yield _done_event(cache.entry)
+                return
+        else:
+            await cache.wait_for_refresh()
+    
+    entry = cache.entry
+    for item in entry.response.items if entry else []:
+        yield _sse("item", dumps_model(item))
+    yield _done_event(entry)
+
+
+@router.get("/stream")
+async def stream_trends(
+    service: TrendsService = Depends(get_trends_service),
+    region: TrendsRegion = Depends(get_trends_region),
+):
+    """
+    Stream trends as Server-Sent Events.
+    
+    Events:
+    - `item`: a TrendItem (JSON), sent as soon as it is available
+    - `highlight`: `{"url", "highlight"}` patch for an item sent earlier
+      without its highlight
+    - `done`: `{"count", "last_updated"}`, always the last event
+    """
+    return StreamingResponse(
+        _trend_events(service, region),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/health")
-async def health_check():
-    """Health check endpoint for trends service."""
-    from backend.core.config import Config
+async def health_check(
+    request: Request,
+    service: TrendsService = Depends(get_trends_service),
+    region: TrendsRegion = Depends(get_trends_region),
+):
+    """
+    Health check endpoint for trends service.
     
+    Cache, refresher, query and enrichment-worker state is for `region`
+    (default: TRENDS_REGION); enrichment and circuit state is shared.
+    """
     return JSONResponse({
         "status": "ok",
         "serpapi_configured": Config.is_serpapi_configured(),
-        "openai_configured": Config.is_openai_configured()
+        "openai_configured": Config.is_openai_configured(),
+        "region": region.name,
+        "regions": list(request.app.state.trends_regions),
+        **region.stats(),
+        "enrichment_tiers": dict(service.enrichment_tiers),
+        "enrichment_batches": service.batcher.stats(),
+        "circuits": {
+            "serpapi": service.serpapi_breaker.stats(),
+            "openai": service.openai_breaker.stats()
+        },
+        "startup": STARTUP_PROFILE.report() if Config.TRENDS_STARTUP_PROFILE else None
     })
-
@@ -0,0 +1,102 @@
+"""
+Microbenchmark: per-request CPU for serving a trends snapshot.
+
+Compares the previous path (returning the TrendsResponse model through
+`response_model=TrendsResponse`, which validates and serializes on every
+request) with serving the snapshot's pre-serialized bytes as a raw Response.
+
+Usage:
+    python -m backend.benchmarks.bench_serialization [--items 40] [--requests 2000]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import FastAPI, Response
+
+from backend.models.trends import TrendItem, TrendsResponse
+from backend.services.trends_cache import CacheEntry, serialize_response
+
+
+def make_snapshot(count: int) -> TrendsResponse:
+    """Build a snapshot shaped like a real refresh."""
+    now = datetime.utcnow()
+    return TrendsResponse(
+        items=[
+            TrendItem(
+                title=f"AI-powered code review tools are transforming engineering teams #{i}",
+                url=f"https://example.com/articles/{i}",
+                source="example.com",
+                published_at=now - timedelta(hours=i),
+                raw_excerpt="A new wave of AI-powered tools is automating code reviews " * 3,
+                highlight="AI-driven review tools are speeding up PR cycles and reducing bugs for startup teams.",
+                category=("ai", "startups", "software_engineering", "engineering")[i % 4]
+            )
+            for i in range(count)
+        ],
+        last_updated=now
+    )
+
+
+def build_app(snapshot: TrendsResponse) -> FastAPI:
+    """App exposing both serving strategies for the same snapshot."""
+    app = FastAPI()
+    entry = CacheEntry.build(snapshot, fetched_at=0.0, fresh_until=0.0)
+
+    @app.get("/model", response_model=TrendsResponse)
+    async def model_path():
+        return snapshot
+
+    @app.get("/bytes", response_model=TrendsResponse)
+    async def bytes_path():
+        return Response(content=entry.body, media_type="application/json")
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> tuple[float, int]:
+    """Process CPU seconds per request and response size for `path`."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up
+        for _ in range(50):
+            response = await client.get(path)
+
+        started = time.process_time()
+        for _ in range(requests):
+            response = await client.get(path)
+        elapsed = time.process_time() - started
+
+    return elapsed / requests, len(response.content)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=40, help="Trend items in the snapshot")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per strategy")
+    args = parser.parse_args()
+
+    snapshot = make_snapshot(args.items)
+    app = build_app(snapshot)
+
+    # Serialization cost alone, which the bytes path pays once per refresh
+    started = time.process_time()
+    for _ in range(args.requests):
+        serialize_response(snapshot)
+    encode_cost = (time.process_time() - started) / args.requests
+
+    model_cpu, model_size = asyncio.run(measure(app, "/model", args.requests))
+    bytes_cpu, bytes_size = asyncio.run(measure(app, "/bytes", args.requests))
+
+    print(f"Snapshot: {args.items} items, {args.requests} requests per strategy")
+    print(f"{'strategy':<26}{'CPU/request':>14}{'body bytes':>12}")
+    print(f"{'response_model (before)':<26}{model_cpu * 1e6:>11.1f} us{model_size:>12}")
+    print(f"{'pre-serialized bytes':<26}{bytes_cpu * 1e6:>11.1f} us{bytes_size:>12}")
+    print(f"{'one-off serialization':<26}{encode_cost * 1e6:>11.1f} us")
+    print(f"Speedup: {model_cpu / bytes_cpu:.2f}x per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Fake Upstreams
+
+Local stand-ins for SerpAPI and the OpenAI Chat Completions API, used by the
+load benchmark and the tests. Both are ASGI apps served in-process through
+`httpx.ASGITransport`, so no network access, API keys or open ports are
+needed, and both support injected latency and errors:
+
+- FakeSerpAPI: `GET /search` returns `num` organic results for the query
+  (stable URLs per query, so repeated fetches return the same articles).
+- FakeOpenAI: `POST /v1/chat/completions` answers batch prompts with the
+  structured `{"highlights": [{"id", "highlight"}]}` output and single-article
+  prompts with plain text.
+
+Each fake counts the requests it received (`calls`) and the errors it
+injected (`errors`).
+
+Usage:
+    serpapi = FakeSerpAPI(latency_seconds=0.05)
+    openai = FakeOpenAI(latency_seconds=0.2, error_rate=0.05)
+    service = TrendsService(
+        serpapi_http=serpapi.client(),
+        openai_client=openai.client(),
+    )
+"""
+import asyncio
+import json
+import random
+import re
+from typing import Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from openai import AsyncOpenAI
+
+_ARTICLE_ID = re.compile(r"^Article id: (\d+)$", re.MULTILINE)
+
+# Vocabulary for generated search results
+_SNIPPET_WORDS = (
+    "funding round seed series startup founders launch model agents inference "
+    "open source benchmark latency pricing cloud chips hiring layoffs security "
+    "breach compliance regulation europe developers tooling compiler database "
+    "vector search robotics acquisition merger revenue growth platform api "
+    "mobile browser privacy quantum battery satellite payments fintech health"
+).split()
+
+
+class FakeUpstream:
+    """Shared latency and error injection for the fake upstream apps."""
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        jitter_seconds: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: Optional[int] = 0,
+    ):
+        """
+        Args:
+            latency_seconds: Base delay before each response
+            jitter_seconds: Uniform random delay added on top of the base
+            error_rate: Probability (0-1) that a request fails with `error_status`
+            error_status: HTTP status for injected errors (429 adds retry-after-ms)
+            seed: Random seed, for reproducible runs (None for unseeded)
+        """
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+        self.app = FastAPI()
+
+    async def _delay_or_error(self) -> Optional[JSONResponse]:
+        """Apply the configured latency; return an error response if one is injected."""
+        self.calls += 1
+        delay = self.latency_seconds + self._random.uniform(0, self.jitter_seconds)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            headers = {"retry-after-ms": "10"} if self.error_status == 429 else None
+            return JSONResponse(
+                {"error": {"message": "Injected upstream error", "type": "fake_error"}},
+                status_code=self.error_status,
+                headers=headers,
+            )
+        return None
+
+    def reset(self) -> None:
+        """Zero the request counters."""
+        self.calls = 0
+        self.errors = 0
+
+
+class FakeSerpAPI(FakeUpstream):
+    """In-process stand-in for the SerpAPI search endpoint."""
+
+    def __init__(self, published_date: str = "2025-12-11T08:00:00Z", **kwargs):
+        super().__init__(**kwargs)
+        self.published_date = published_date
+        self.app.add_api_route("/search", self.search, methods=["GET"])
+
+    async def search(self, request: Request):
+        error = await self._delay_or_error()
+        if error is not None:
+            return error
+
+        query = request.query_params.get("q", "")
+        num = int(request.query_params.get("num", "10"))
+        slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")
+        return {
+            "search_metadata": {"status": "Success"},
+            "organic_results": [
+                self._result(query, slug, i)
+                for i in range(num)
+            ],
+        }
+
+    def _result(self, query: str, slug: str, i: int) -> dict:
+        """A distinct (not near-duplicate) organic result for `query`."""
+        rng = random.Random(f"{query}/{i}")
+        words = rng.sample(_SNIPPET_WORDS, 12)
+        return {
+            "position": i + 1,
+            "title": f"{query.title()}: {' '.join(words[:4])}",
+            "link": f"https://news{i % 3}.example.com/{slug}/{i + 1}",
+            "snippet": " ".join(words[4:]).capitalize() + ".",
+            "date": self.published_date,
+        }
+
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client routed to this app (any host, e.g. serpapi.com)."""
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app))
+
+
+class FakeOpenAI(FakeUpstream):
+    """In-process stand-in for the OpenAI Chat Completions endpoint."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.app.add_api_route("/v1/chat/completions", self.chat_completions, methods=["POST"])
+
+    async def chat_completions(self, request: Request):
+        error = await self._delay_or_error()
+        if error is not None:
+            return error
+
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        ids = _ARTICLE_ID.findall(prompt)
+        if body.get("response_format"):
+            content = json.dumps({
+                "highlights": [
+                    {"id": article_id, "highlight": f"Fake highlight for article {article_id}."}
+                    for article_id in ids
+                ]
+            })
+        else:
+            content = "Fake highlight for a single article."
+
+        return {
+            "id": f"chatcmpl-fake-{self.calls}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get("model", "fake"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": (len(prompt) + len(content)) // 4,
+            },
+        }
+
+    def client(self) -> AsyncOpenAI:
+        """OpenAI client routed to this app (retries left to TrendsService)."""
+        return AsyncOpenAI(
+            api_key="fake-key",
+            base_url="http://fake-openai/v1",
+            http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app)),
+            max_retries=0,
+        )
@@ -0,0 +1,220 @@
+"""
+Load benchmark: /api/trends against fake SerpAPI and OpenAI upstreams.
+
+Drives the real FastAPI app (lifespan, cache, routes) in-process with a fixed
+number of concurrent clients and reports throughput, latency percentiles and
+upstream calls per request. SerpAPI and OpenAI are replaced by the fakes in
+`fake_upstreams`, with configurable latency and error injection, so runs are
+offline and repeatable.
+
+Scenarios:
+- warm: the first request builds the snapshot, the rest are cache hits
+- cold: the snapshot expires immediately, so every read needs a refresh
+  (concurrent reads coalesce onto one in-flight refresh). Each refresh runs
+  the whole pipeline: highlights are not carried forward between refreshes
+
+In both scenarios every query is refetched on each refresh (the registry's
+per-query TTLs are ignored), so calls per request stay comparable across
+commits.
+
+Each run is appended to `results/load_trends.jsonl` with the current git
+commit, and compared with the previous run of the same configuration, so
+regressions show up across commits.
+
+Usage:
+    python -m backend.benchmarks.load_trends [--scenario warm] [--concurrency 1,10,50]
+        [--requests 500] [--serpapi-latency 0.05] [--openai-latency 0.2]
+        [--error-rate 0.0] [--no-save]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import subprocess
+import time
+from dataclasses import replace
+from datetime import datetime
+from typing import Optional
+from unittest.mock import patch
+
+import httpx
+
+from backend.benchmarks.fake_upstreams import FakeOpenAI, FakeSerpAPI
+from backend.core.config import Config
+from backend.main import app
+from backend.services.query_registry import load_query_registry
+from backend.services.trends_cache import TrendsCache
+from backend.services.trends_service import TrendsService
+
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), "results", "load_trends.jsonl")
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def git_commit() -> str:
+    """Short hash of HEAD (suffixed when the tree has local changes)."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run_level(
+    scenario: str,
+    concurrency: int,
+    requests: int,
+    serpapi: FakeSerpAPI,
+    openai: FakeOpenAI,
+) -> dict:
+    """Run `requests` requests at `concurrency` against a freshly started app."""
+    serpapi.reset()
+    openai.reset()
+
+    async with app.router.lifespan_context(app):
+        await app.state.trends_service.aclose()
+        app.state.trends_service = TrendsService(
+            serpapi_http=serpapi.client(),
+            openai_client=openai.client(),
+            queries=[replace(query, ttl_seconds=None) for query in load_query_registry()],
+        )
+        region = next(iter(app.state.trends_regions.values()))
+        region.service = app.state.trends_service
+        if scenario == "cold":
+            region.cache = TrendsCache(ttl_seconds=0, stale_seconds=0)
+            # No incremental baseline, so every refresh re-enriches every item
+            app.state.trends_service.remember_snapshot = lambda items, region=None: None
+        else:
+            region.cache = TrendsCache()
+        app.state.trends_cache = region.cache
+
+        latencies: list[float] = []
+        failures = 0
+        remaining = requests
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            async def worker() -> None:
+                nonlocal remaining, failures
+                while remaining > 0:
+                    remaining -= 1
+                    started = time.perf_counter()
+                    response = await client.get("/api/trends")
+                    latencies.append(time.perf_counter() - started)
+                    if response.status_code != 200 or not response.json()["items"]:
+                        failures += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*[worker() for _ in range(concurrency)])
+            elapsed = time.perf_counter() - started
+
+        await app.state.trends_service.aclose()
+
+    latencies.sort()
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": requests,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "failed_requests": failures,
+        "serpapi_calls_per_request": round(serpapi.calls / requests, 4),
+        "openai_calls_per_request": round(openai.calls / requests, 4),
+        "upstream_errors": serpapi.errors + openai.errors,
+    }
+
+
+def previous_result(path: str, key: dict) -> Optional[dict]:
+    """Most recent stored result with the same configuration."""
+    if not os.path.exists(path):
+        return None
+    match = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if all(record.get(k) == v for k, v in key.items()):
+                match = record
+    return match
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=["warm", "cold"], default="warm")
+    parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per concurrency level")
+    parser.add_argument("--serpapi-latency", type=float, default=0.05, help="Fake SerpAPI latency (s)")
+    parser.add_argument("--openai-latency", type=float, default=0.2, help="Fake OpenAI latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Injected error rate for both fakes")
+    parser.add_argument("--results", default=RESULTS_PATH, help="JSON-lines results file")
+    parser.add_argument("--no-save", action="store_true", help="Do not store this run")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    serpapi = FakeSerpAPI(latency_seconds=args.serpapi_latency, error_rate=args.error_rate)
+    openai = FakeOpenAI(latency_seconds=args.openai_latency, error_rate=args.error_rate)
+    upstream = {
+        "serpapi_latency": args.serpapi_latency,
+        "openai_latency": args.openai_latency,
+        "error_rate": args.error_rate,
+    }
+    commit = git_commit()
+
+    # Refreshes run on read (no background refresher) and the persistent
+    # highlight cache and snapshot store are off, so every refresh reaches the fakes
+    with patch.object(Config, "SERPAPI_KEY", "bench"), \
+            patch.object(Config, "TRENDS_REFRESH_ENABLED", False), \
+            patch.object(Config, "TRENDS_TWO_PHASE", False), \
+            patch.object(Config, "TRENDS_HIGHLIGHT_CACHE_PATH", ""), \
+            patch.object(Config, "TRENDS_SNAPSHOT_PATH", ""):
+        results = [
+            asyncio.run(run_level(args.scenario, int(level), args.requests, serpapi, openai))
+            for level in args.concurrency.split(",")
+        ]
+
+    print(f"Scenario: {args.scenario}, {args.requests} requests per level, commit {commit}")
+    print(f"{'conc':>5}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'serp/req':>10}{'oai/req':>10}{'failed':>8}   vs previous")
+    for result in results:
+        key = {"scenario": result["scenario"], "concurrency": result["concurrency"],
+               "requests": result["requests"], "upstream": upstream}
+        previous = previous_result(args.results, key)
+        comparison = ""
+        if previous:
+            comparison = (
+                f"rps {result['rps'] / previous['rps'] - 1:+.1%}, "
+                f"p95 {result['p95_ms'] / previous['p95_ms'] - 1:+.1%} ({previous['commit']})"
+            ) if previous["rps"] and previous["p95_ms"] else f"({previous['commit']})"
+        print(f"{result['concurrency']:>5}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}"
+              f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+              f"{result['serpapi_calls_per_request']:>10.3f}{result['openai_calls_per_request']:>10.3f}"
+              f"{result['failed_requests']:>8}   {comparison}")
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(args.results), exist_ok=True)
+        timestamp = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+        with open(args.results, "a", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps({"commit": commit, "timestamp": timestamp, "upstream": upstream, **result}) + "\n")
+        print(f"Results appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
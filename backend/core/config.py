@@ -12,9 +12,81 @@ class Config:
     # SerpAPI Configuration (same as job scraper)
     SERPAPI_KEY: Optional[str] = os.getenv("SERPAPI_KEY")
     TRENDS_REGION: str = os.getenv("TRENDS_REGION", "us")  # SerpAPI uses lowercase country codes
+    TRENDS_REGIONS: str = os.getenv("TRENDS_REGIONS", "")  # Comma-separated regions served via ?region= (TRENDS_REGION is always included)
+    SERPAPI_MAX_CONCURRENCY: int = int(os.getenv("SERPAPI_MAX_CONCURRENCY", "4"))  # Parallel trend queries
+    SERPAPI_QUERY_TIMEOUT_SECONDS: float = float(os.getenv("SERPAPI_QUERY_TIMEOUT_SECONDS", "10"))  # Per-query timeout
+    TRENDS_QUERY_REGISTRY: str = os.getenv("TRENDS_QUERY_REGISTRY", "")  # Inline JSON or JSON file path; empty uses TREND_QUERIES
+    TRENDS_QUERY_MAX_AGE_SECONDS: float = float(os.getenv("TRENDS_QUERY_MAX_AGE_SECONDS", str(6 * 3600)))  # Retained query results older than this are dropped
     
     # OpenAI Configuration
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    OPENAI_MAX_CONCURRENCY: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "4"))  # Parallel enrichment calls
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "3"))  # Retries on 429
+    OPENAI_BACKOFF_BASE_SECONDS: float = float(os.getenv("OPENAI_BACKOFF_BASE_SECONDS", "1"))  # When no retry-after
+    OPENAI_BACKOFF_MAX_SECONDS: float = float(os.getenv("OPENAI_BACKOFF_MAX_SECONDS", "30"))
+    OPENAI_BATCH_TOKEN_BUDGET: int = int(os.getenv("OPENAI_BATCH_TOKEN_BUDGET", "4000"))  # Prompt + completion per batch call
+    OPENAI_CONTEXT_LIMIT: int = int(os.getenv("OPENAI_CONTEXT_LIMIT", "128000"))
+    OPENAI_BATCH_MAX_ITEMS: int = int(os.getenv("OPENAI_BATCH_MAX_ITEMS", "10"))
+    OPENAI_HIGHLIGHT_TOKENS: int = int(os.getenv("OPENAI_HIGHLIGHT_TOKENS", "80"))  # Completion tokens per highlight
+    OPENAI_MISSING_RETRIES: int = int(os.getenv("OPENAI_MISSING_RETRIES", "1"))  # Re-asks for ids a batch response left out
+    
+    # Trends cache configuration (seconds)
+    TRENDS_CACHE_TTL_SECONDS: float = float(os.getenv("TRENDS_CACHE_TTL_SECONDS", "900"))  # Fresh window
+    TRENDS_CACHE_STALE_SECONDS: float = float(os.getenv("TRENDS_CACHE_STALE_SECONDS", "3600"))  # Serve-stale window after TTL
+    TRENDS_CACHE_RETRY_SECONDS: float = float(os.getenv("TRENDS_CACHE_RETRY_SECONDS", "60"))  # Back-off after a failed refresh
+    TRENDS_HTTP_MAX_AGE_SECONDS: float = float(os.getenv("TRENDS_HTTP_MAX_AGE_SECONDS", "60"))  # Client-side Cache-Control max-age cap
+    
+    # Background trends refresher (keeps the snapshot warm outside the request path)
+    TRENDS_REFRESH_ENABLED: bool = os.getenv("TRENDS_REFRESH_ENABLED", "true").lower() in ("1", "true", "yes")
+    TRENDS_REFRESH_INTERVAL_SECONDS: float = float(os.getenv("TRENDS_REFRESH_INTERVAL_SECONDS", "600"))
+    TRENDS_REFRESH_JITTER_SECONDS: float = float(os.getenv("TRENDS_REFRESH_JITTER_SECONDS", "60"))
+    TRENDS_REFRESH_DEADLINE_SECONDS: float = float(os.getenv("TRENDS_REFRESH_DEADLINE_SECONDS", "120"))
+    
+    # End-to-end budget for one fetch/normalize/enrich run (keep below the refresh deadline)
+    TRENDS_PIPELINE_DEADLINE_SECONDS: float = float(os.getenv("TRENDS_PIPELINE_DEADLINE_SECONDS", "90"))
+    
+    # Circuit breakers for SerpAPI and OpenAI
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))  # Consecutive failures to open
+    CIRCUIT_RESET_SECONDS: float = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))  # Open time before a trial call
+    
+    # SimHash bit distance at or below which two results are the same story (negative disables)
+    TRENDS_NEAR_DUPLICATE_DISTANCE: int = int(os.getenv("TRENDS_NEAR_DUPLICATE_DISTANCE", "6"))
+    
+    # Two-phase publishing: un-enriched items first, highlights filled in by a background worker
+    TRENDS_TWO_PHASE: bool = os.getenv("TRENDS_TWO_PHASE", "false").lower() in ("1", "true", "yes")
+    TRENDS_ENRICHMENT_CHUNK_SIZE: int = int(os.getenv("TRENDS_ENRICHMENT_CHUNK_SIZE", "20"))
+    
+    # Persistent AI highlight cache (SQLite, WAL mode); empty path disables it
+    TRENDS_HIGHLIGHT_CACHE_PATH: str = os.getenv("TRENDS_HIGHLIGHT_CACHE_PATH", ".cache/trend_highlights.sqlite3")
+    TRENDS_HIGHLIGHT_CACHE_MAX_ENTRIES: int = int(os.getenv("TRENDS_HIGHLIGHT_CACHE_MAX_ENTRIES", "5000"))
+    TRENDS_HIGHLIGHT_CACHE_MAX_AGE_SECONDS: float = float(os.getenv("TRENDS_HIGHLIGHT_CACHE_MAX_AGE_SECONDS", str(30 * 24 * 3600)))
+    
+    # Durable copy of the latest snapshot, restored at startup; empty path disables it.
+    # Point it at a mounted volume for the snapshot to survive deploys
+    TRENDS_SNAPSHOT_PATH: str = os.getenv("TRENDS_SNAPSHOT_PATH", ".cache/trends_snapshot.json")
+    
+    # Snapshot shared by all uvicorn workers (SQLite, WAL mode) with a refresh
+    # lease so only one worker refreshes; empty path disables it
+    TRENDS_SHARED_CACHE_PATH: str = os.getenv("TRENDS_SHARED_CACHE_PATH", "")
+    TRENDS_SHARED_LEASE_SECONDS: float = float(os.getenv("TRENDS_SHARED_LEASE_SECONDS", "150"))  # Keep above TRENDS_REFRESH_DEADLINE_SECONDS
+    TRENDS_SHARED_SYNC_SECONDS: float = float(os.getenv("TRENDS_SHARED_SYNC_SECONDS", "5"))  # How often readers look for a newer shared snapshot
+    
+    # Trace import and startup costs; the report is logged at boot and shown by /api/trends/health
+    TRENDS_STARTUP_PROFILE: bool = os.getenv("TRENDS_STARTUP_PROFILE", "false").lower() in ("1", "true", "yes")
+    
+    # In-process span tracing, served by /debug/traces and optionally exported as OTLP JSON lines
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "true").lower() in ("1", "true", "yes")
+    TRACE_BUFFER_SIZE: int = int(os.getenv("TRACE_BUFFER_SIZE", "200"))  # Finished traces kept in memory
+    TRACE_MAX_SPANS: int = int(os.getenv("TRACE_MAX_SPANS", "500"))  # Spans kept per trace
+    TRACE_EXPORT_PATH: str = os.getenv("TRACE_EXPORT_PATH", "")  # Empty disables the file exporter
+    DEBUG_TRACES_ENABLED: bool = os.getenv("DEBUG_TRACES_ENABLED", "false").lower() in ("1", "true", "yes")  # Serve /debug/traces (unauthenticated)
+    
+    # Upstream HTTP connection pools (SerpAPI and OpenAI each get one)
+    UPSTREAM_POOL_MAX_CONNECTIONS: int = int(os.getenv("UPSTREAM_POOL_MAX_CONNECTIONS", "20"))
+    UPSTREAM_POOL_MAX_KEEPALIVE: int = int(os.getenv("UPSTREAM_POOL_MAX_KEEPALIVE", "10"))
+    UPSTREAM_POOL_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("UPSTREAM_POOL_KEEPALIVE_EXPIRY_SECONDS", "60"))
+    UPSTREAM_TIMEOUT_SECONDS: float = float(os.getenv("UPSTREAM_TIMEOUT_SECONDS", "30"))
     
     # API Configuration
     API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
@@ -29,6 +101,16 @@ class Config:
             print("Warning: OPENAI_API_KEY not set")
         return True
     
+    @classmethod
+    def trends_regions(cls) -> list[str]:
+        """Regions served by /api/trends, default region (TRENDS_REGION) first."""
+        regions = [cls.TRENDS_REGION.strip().lower()]
+        for region in cls.TRENDS_REGIONS.split(","):
+            region = region.strip().lower()
+            if region and region not in regions:
+                regions.append(region)
+        return regions
+    
     @classmethod
     def is_serpapi_configured(cls) -> bool:
         """Check if SerpAPI is configured."""
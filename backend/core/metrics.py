@@ -0,0 +1,201 @@
+"""
+Metrics
+
+Minimal in-process metrics (counters and histograms) rendered in the
+Prometheus text exposition format by the `/metrics` endpoint.
+
+Recording is a dict lookup plus an integer/float update on the event-loop
+thread: no locks, no allocation beyond the first observation of a label set,
+so it is safe on the request path. Rendering walks the registry on scrape.
+
+Metric names follow Prometheus conventions (`_total` counters, `_seconds`
+histograms); ratios such as cache hit rate are derived at query time, e.g.
+`rate(trends_cache_requests_total{result="hit"}[5m]) / rate(trends_cache_requests_total[5m])`.
+"""
+import bisect
+import math
+from typing import Iterable, Optional
+
+# Default latency buckets (seconds), from fast cache work to slow upstream calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Add `amount` to the series for the given label values (in labelnames order)."""
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Histogram:
+    """Bucketed distribution of observations per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (non-cumulative, last is +Inf), sum, count]
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation for the given label values."""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def samples(self) -> list[str]:
+        lines = []
+        bucket_names = self.labelnames + ("le",)
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_format_labels(bucket_names, labels + (_format_value(bound),))} {cumulative}"
+                )
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Optional[Iterable[float]] = None,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets or LATENCY_BUCKETS))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    "trends_stage_duration_seconds",
+    "Duration of trends pipeline stages (fetch, normalize, enrich)",
+    ["stage"],
+)
+UPSTREAM_CALLS = REGISTRY.counter(
+    "trends_upstream_calls_total",
+    "Requests sent to upstream providers",
+    ["provider"],
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "trends_upstream_errors_total",
+    "Failed or skipped upstream requests by provider and kind",
+    ["provider", "kind"],
+)
+QUERY_FETCHES = REGISTRY.counter(
+    "trends_query_fetches_total",
+    "Trend queries per refresh by outcome (fetched, reused within TTL, failed)",
+    ["category", "result"],
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "trends_cache_requests_total",
+    "Snapshot cache reads by result (hit, stale, miss)",
+    ["result"],
+)
+SHARED_SNAPSHOT_EVENTS = REGISTRY.counter(
+    "trends_shared_snapshot_events_total",
+    "Cross-worker snapshot coordination (published, adopted, lease_wait)",
+    ["event"],
+)
+HIGHLIGHT_CACHE_LOOKUPS = REGISTRY.counter(
+    "trends_highlight_cache_lookups_total",
+    "Highlight cache lookups by result (hit, miss)",
+    ["result"],
+)
+REFRESH_ITEMS = REGISTRY.histogram(
+    "trends_refresh_items",
+    "Items in each snapshot produced by a refresh",
+    buckets=(0, 5, 10, 20, 40, 80, 160),
+)
+REFRESH_DIFF_ITEMS = REGISTRY.counter(
+    "trends_refresh_diff_items_total",
+    "Refreshed items by change against the previous snapshot (unchanged, changed, new)",
+    ["change"],
+)
+ENRICHMENT_TIERS = REGISTRY.counter(
+    "trends_enrichment_tier_total",
+    "Enrichment calls and fallbacks by tier",
+    ["tier"],
+)
@@ -0,0 +1,179 @@
+"""
+Startup Profile
+
+Timing of what the process does before it can serve traffic: module imports
+and lifespan initialization steps (highlight cache, service, regions).
+
+Heavy client SDKs (OpenAI) are not imported at startup. They are imported on
+first use through `STARTUP_PROFILE.import_module`, off the event loop when
+called from async code, so health checks are answered while they load. Those
+deferred imports are recorded too and marked as such.
+
+With TRENDS_STARTUP_PROFILE enabled, an import hook also records the
+cumulative import time of each module (like `python -X importtime`, limited
+to the application and its main dependencies). The report is logged once the
+application is ready and included in `/api/trends/health`.
+
+Configuration (see Config):
+- TRENDS_STARTUP_PROFILE: Trace imports and log the startup report
+"""
+import asyncio
+import importlib
+import importlib.abc
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Top-level packages whose imports are traced
+TRACED_PACKAGES = ("backend", "fastapi", "starlette", "pydantic", "httpx", "openai")
+
+
+@dataclass
+class StartupStep:
+    """One timed import or initialization step."""
+    name: str
+    kind: str
+    seconds: float
+    # True if it ran after the application was ready (lazy imports)
+    deferred: bool = False
+
+
+class _TimedLoader:
+    """Loader proxy that records how long the wrapped loader takes to execute a module."""
+
+    def __init__(self, loader, profile: "StartupProfile"):
+        self._loader = loader
+        self._profile = profile
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        with self._profile.measure(module.__name__, kind="import"):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, name):
+        # Resource readers, get_source etc. are served by the real loader
+        return getattr(self._loader, name)
+
+
+class _ImportTracer(importlib.abc.MetaPathFinder):
+    """Meta path finder that times imports of the traced packages."""
+
+    def __init__(self, profile: "StartupProfile", packages: tuple[str, ...]):
+        self._profile = profile
+        self._packages = set(packages)
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname.partition(".")[0] not in self._packages:
+            return None
+
+        # Let the regular finders locate the module, then wrap its loader
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self._profile)
+        return spec
+
+
+class StartupProfile:
+    """Import and initialization timings for the process."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self.ready_at: Optional[float] = None
+        self.steps: list[StartupStep] = []
+        self._tracer: Optional[_ImportTracer] = None
+
+    @contextmanager
+    def measure(self, name: str, kind: str = "init") -> Iterator[None]:
+        """Time the enclosed block as a startup step."""
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.steps.append(StartupStep(
+                name=name,
+                kind=kind,
+                seconds=self._clock() - started,
+                deferred=self.ready_at is not None,
+            ))
+
+    def import_module(self, name: str) -> ModuleType:
+        """Import `name` if it is not loaded yet, recording the cost."""
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        with self.measure(name, kind="import"):
+            return importlib.import_module(name)
+
+    async def import_module_async(self, name: str) -> ModuleType:
+        """Like `import_module`, but runs the import in a thread so the event loop keeps serving."""
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        return await asyncio.to_thread(self.import_module, name)
+
+    def trace_imports(self, packages: tuple[str, ...] = TRACED_PACKAGES) -> None:
+        """Record the import time of every module in `packages` from now until `mark_ready`."""
+        if self._tracer is None:
+            self._tracer = _ImportTracer(self, packages)
+            sys.meta_path.insert(0, self._tracer)
+
+    def mark_ready(self) -> None:
+        """Note that the application is ready to serve and stop tracing imports."""
+        if self.ready_at is None:
+            self.ready_at = self._clock()
+        if self._tracer is not None:
+            sys.meta_path.remove(self._tracer)
+            self._tracer = None
+
+    def report(self, limit: int = 20) -> dict:
+        """
+        Startup timings, slowest first.
+
+        Args:
+            limit: Maximum number of imports listed (they are cumulative, so
+                a package includes the modules it imports)
+        """
+        imports = sorted(
+            (step for step in self.steps if step.kind == "import"),
+            key=lambda step: step.seconds,
+            reverse=True,
+        )
+        return {
+            "ready_seconds": round(self.ready_at - self.started, 3) if self.ready_at is not None else None,
+            "init": [self._step_dict(step) for step in self.steps if step.kind == "init"],
+            "imports": [self._step_dict(step) for step in imports[:limit]],
+        }
+
+    def log_report(self, limit: int = 20) -> None:
+        """Log the report, one line per step."""
+        report = self.report(limit)
+        lines = [f"Startup profile: ready in {report['ready_seconds']}s"]
+        for kind in ("init", "imports"):
+            for step in report[kind]:
+                deferred = " (deferred)" if step["deferred"] else ""
+                lines.append(f"  {kind:<7} {step['seconds']:>8.3f}s  {step['name']}{deferred}")
+        logger.info("\n".join(lines))
+
+    @staticmethod
+    def _step_dict(step: StartupStep) -> dict:
+        return {"name": step.name, "seconds": round(step.seconds, 4), "deferred": step.deferred}
+
+
+STARTUP_PROFILE = StartupProfile()
@@ -0,0 +1,452 @@
+"""
+Request Tracing
+
+Lightweight in-process span tracing for the trends pipeline. Each HTTP
+request (TracingMiddleware) and each background refresh is a trace; the
+pipeline stages (get_trends, fetch_raw_trends, each SerpAPI query,
+_normalize_results, each enrichment batch and OpenAI call) are spans within
+it, so a slow request can be attributed to SerpAPI, OpenAI or a fallback
+tier.
+
+The current span is carried in a context variable, so spans started in
+tasks created during a request (concurrent queries, enrichment batches)
+attach to that request's trace. Work that outlives its request runs in a
+fresh context and is traced on its own: stale-while-revalidate refreshes,
+the background refresher and the enrichment worker (see
+TrendsCache._start_refresh). A span started after its trace finished also
+starts a new trace rather than joining one that was already exported.
+
+Finished traces are kept in a fixed-size ring buffer and served, slowest
+first, by `GET /debug/traces` (when DEBUG_TRACES_ENABLED). They can also be appended to a file as OTLP
+JSON (one ExportTraceServiceRequest per line, as read by the OpenTelemetry
+Collector's file receiver).
+
+Configuration (see Config):
+- TRACING_ENABLED: Record traces (default on)
+- TRACE_BUFFER_SIZE: Finished traces kept in memory
+- TRACE_MAX_SPANS: Spans kept per trace (further spans are counted, not kept)
+- TRACE_EXPORT_PATH: OTLP JSON lines file, `{pid}` expanded (empty disables export)
+- DEBUG_TRACES_ENABLED: Serve `GET /debug/traces` (default off; it has no auth)
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Iterator, Optional
+
+from backend.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Paths not traced by TracingMiddleware (scrapes and the trace viewer itself)
+UNTRACED_PATH_PREFIXES = ("/metrics", "/debug")
+
+
+def describe_error(error: BaseException) -> str:
+    """
+    Span error text: the exception type and, for HTTP errors, the status code.
+
+    The message is left out because upstream errors embed request URLs, and
+    SerpAPI URLs carry the API key in their query string.
+    """
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if isinstance(status, int):
+        return f"{type(error).__name__}: HTTP {status}"
+    return type(error).__name__
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+    name: str
+    trace: "Trace"
+    span_id: str
+    parent_id: Optional[str]
+    # perf_counter() timestamps; `end` is None while the span is open
+    start: float
+    end: Optional[float] = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    # (name, perf_counter() timestamp, attributes)
+    events: list[tuple[str, float, dict]] = field(default_factory=list)
+    status: str = "ok"
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """Seconds from start to end (or to now, while open)."""
+        return (time.perf_counter() if self.end is None else self.end) - self.start
+
+
+@dataclass
+class Trace:
+    """A request or background refresh: a root span and its descendants."""
+    trace_id: str
+    # Wall-clock time of the root span's start, and its perf_counter() value
+    started_at: datetime
+    start: float
+    spans: list[Span] = field(default_factory=list)
+    dropped_spans: int = 0
+    finished: bool = False
+
+    @property
+    def root(self) -> Span:
+        return self.spans[0]
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration
+
+    def unix_nanos(self, timestamp: float) -> int:
+        """Convert a perf_counter() timestamp within the trace to Unix nanoseconds."""
+        return int((self.started_at.timestamp() + (timestamp - self.start)) * 1e9)
+
+    def breakdown(self) -> dict[str, dict]:
+        """Time per span name (count, total and max milliseconds), slowest first."""
+        totals: dict[str, dict] = {}
+        for span in self.spans[1:]:
+            entry = totals.setdefault(span.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            duration_ms = span.duration * 1000
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+        for entry in totals.values():
+            entry["total_ms"] = round(entry["total_ms"], 2)
+            entry["max_ms"] = round(entry["max_ms"], 2)
+        return dict(sorted(totals.items(), key=lambda kv: kv[1]["total_ms"], reverse=True))
+
+    def to_dict(self) -> dict:
+        """JSON-ready view for `/debug/traces`."""
+        root = self.root
+        return {
+            "trace_id": self.trace_id,
+            "name": root.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(root.duration * 1000, 2),
+            "status": root.status,
+            "attributes": root.attributes,
+            "breakdown": self.breakdown(),
+            "spans": [
+                {
+                    "name": span.name,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "offset_ms": round((span.start - self.start) * 1000, 2),
+                    "duration_ms": round(span.duration * 1000, 2),
+                    "status": span.status,
+                    "error": span.error,
+                    "attributes": span.attributes,
+                    "events": [
+                        {"name": name, "offset_ms": round((at - self.start) * 1000, 2), **attributes}
+                        for name, at, attributes in span.events
+                    ],
+                }
+                for span in self.spans
+            ],
+            "dropped_spans": self.dropped_spans,
+        }
+
+
+def _otlp_value(value: Any) -> dict:
+    """Encode an attribute value as an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list[dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class OTLPFileExporter:
+    """Appends finished traces to a file as OTLP JSON lines."""
+
+    def __init__(self, path: str, service_name: str = "vetted-backend"):
+        """
+        Args:
+            path: Output file (appended to; its directory is created if
+                missing); `{pid}` is replaced by the process id, so that
+                workers do not interleave writes in one file
+            service_name: `service.name` resource attribute
+        """
+        self.path = path.replace("{pid}", str(os.getpid()))
+        self.service_name = service_name
+        self.failures = 0
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Buffered: lines reach the file in blocks, and on close
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def export(self, trace: Trace) -> None:
+        """Write one trace; failures are logged and counted, never raised."""
+        line = json.dumps(self.encode(trace), separators=(",", ":"))
+        try:
+            with self._lock:
+                self._file.write(line + "\n")
+        except (OSError, ValueError) as e:
+            self.failures += 1
+            logger.error(f"Failed to export trace {trace.trace_id}: {e}")
+
+    def encode(self, trace: Trace) -> dict:
+        """The trace as an OTLP ExportTraceServiceRequest."""
+        spans = []
+        for span in trace.spans:
+            encoded = {
+                "traceId": trace.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(trace.unix_nanos(span.start)),
+                "endTimeUnixNano": str(trace.unix_nanos(span.start + span.duration)),
+                "attributes": _otlp_attributes(span.attributes),
+                "events": [
+                    {
+                        "timeUnixNano": str(trace.unix_nanos(at)),
+                        "name": name,
+                        "attributes": _otlp_attributes(attributes),
+                    }
+                    for name, at, attributes in span.events
+                ],
+                # STATUS_CODE_OK / STATUS_CODE_ERROR
+                "status": {"code": 1} if span.status == "ok" else {"code": 2, "message": span.error or span.status},
+            }
+            if span.parent_id is not None:
+                encoded["parentSpanId"] = span.parent_id
+            spans.append(encoded)
+
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+            }]
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """Records spans into per-request traces and keeps recent traces in a ring buffer."""
+
+    def __init__(
+        self,
+        capacity: int = 200,
+        max_spans: int = 500,
+        exporter: Optional[OTLPFileExporter] = None,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            capacity: Finished traces kept (oldest dropped first)
+            max_spans: Spans kept per trace
+            exporter: Where finished traces are also written (None keeps them in memory only)
+            enabled: When False, spans are not recorded
+        """
+        self.enabled = enabled
+        self.capacity = max(1, capacity)
+        self.max_spans = max(1, max_spans)
+        self.exporter = exporter
+        self._traces: deque[Trace] = deque(maxlen=self.capacity)
+        self._current: ContextVar[Optional[Span]] = ContextVar(f"current_span_{id(self)}", default=None)
+
+        # Counters
+        self.finished_traces = 0
+
+    @classmethod
+    def from_config(cls) -> "Tracer":
+        """Create the tracer (and its exporter, if configured) from Config."""
+        exporter = None
+        if Config.TRACING_ENABLED and Config.TRACE_EXPORT_PATH:
+            try:
+                exporter = OTLPFileExporter(Config.TRACE_EXPORT_PATH)
+            except OSError as e:
+                logger.error(f"Could not open trace export file {Config.TRACE_EXPORT_PATH}: {e}")
+        return cls(
+            capacity=Config.TRACE_BUFFER_SIZE,
+            max_spans=Config.TRACE_MAX_SPANS,
+            exporter=exporter,
+            enabled=Config.TRACING_ENABLED,
+        )
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Time the enclosed block as a span of the current trace.
+
+        Starts a new trace if there is no current span (or its trace has
+        already finished). Exceptions mark the span as failed and propagate.
+
+        Yields:
+            The span (None when tracing is disabled or the trace is full)
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        parent = self._current.get()
+        now = time.perf_counter()
+        if parent is None or parent.trace.finished:
+            trace = Trace(
+                trace_id=secrets.token_hex(16),
+                started_at=datetime.now(timezone.utc),
+                start=now,
+            )
+            parent = None
+        else:
+            trace = parent.trace
+            if len(trace.spans) >= self.max_spans:
+                trace.dropped_spans += 1
+                yield None
+                return
+
+        span = Span(
+            name=name,
+            trace=trace,
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            start=now,
+            attributes=attributes,
+        )
+        trace.spans.append(span)
+        # Restored with set() rather than a reset token, since an async
+        # generator may be finalized in a different context
+        self._current.set(span)
+        try:
+            yield span
+        except asyncio.CancelledError:
+            span.status = "cancelled"
+            raise
+        except BaseException as e:
+            span.status = "error"
+            span.error = describe_error(e)
+            raise
+        finally:
+            span.end = time.perf_counter()
+            self._current.set(parent)
+            if parent is None:
+                self._finish(trace)
+
+    def traced(self, name: str):
+        """Decorator running each call of a function or coroutine function in a span."""
+        def decorate(func):
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute on the current span, if any."""
+        span = self._current.get()
+        if span is not None:
+            span.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        """Record a point-in-time event (e.g. a fallback tier) on the current span, if any."""
+        span = self._current.get()
+        if span is not None:
+            span.events.append((name, time.perf_counter(), attributes))
+
+    def slowest(self, limit: int = 10, name: Optional[str] = None) -> list[Trace]:
+        """
+        The slowest recent traces.
+
+        Args:
+            limit: Maximum number of traces returned
+            name: Rank by the total time of spans with this name instead of
+                the whole trace (traces without it are skipped)
+        """
+        traces = list(self._traces)
+        if name is None:
+            return sorted(traces, key=lambda trace: trace.duration, reverse=True)[:limit]
+
+        timed = []
+        for trace in traces:
+            matching = [span.duration for span in trace.spans if span.name == name]
+            if matching:
+                timed.append((sum(matching), trace))
+        timed.sort(key=lambda pair: pair[0], reverse=True)
+        return [trace for _, trace in timed[:limit]]
+
+    def clear(self) -> None:
+        """Drop the recorded traces."""
+        self._traces.clear()
+
+    def stats(self) -> dict:
+        """Buffer state for `/debug/traces`."""
+        return {
+            "enabled": self.enabled,
+            "capacity": self.capacity,
+            "buffered": len(self._traces),
+            "finished_traces": self.finished_traces,
+            "span_names": dict(Counter(span.name for trace in self._traces for span in trace.spans)),
+            "export_path": self.exporter.path if self.exporter else None,
+            "export_failures": self.exporter.failures if self.exporter else 0,
+        }
+
+    def close(self) -> None:
+        """Flush and close the exporter."""
+        if self.exporter is not None:
+            self.exporter.close()
+            self.exporter = None
+
+    def _finish(self, trace: Trace) -> None:
+        trace.finished = True
+        self.finished_traces += 1
+        self._traces.append(trace)
+        if self.exporter is not None:
+            self.exporter.export(trace)
+
+
+class TracingMiddleware:
+    """ASGI middleware that runs each HTTP request in its own trace."""
+
+    def __init__(self, app, tracer: Optional[Tracer] = None):
+        self.app = app
+        self.tracer = tracer or TRACER
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not self.tracer.enabled or path.startswith(UNTRACED_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        attributes = {"http.method": scope["method"], "http.target": path}
+        query = scope.get("query_string", b"")
+        if query:
+            attributes["http.query"] = query.decode("latin-1")
+
+        with self.tracer.span(f"{scope['method']} {path}", **attributes) as span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start" and span is not None:
+                    span.attributes["http.status_code"] = message["status"]
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+
+
+TRACER = Tracer.from_config()
@@ -2,24 +2,83 @@
 FastAPI main application for Vetted backend services.
 """
 import logging
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 
-from backend.api.routes import trends
 from backend.core.config import Config
+from backend.core.startup import STARTUP_PROFILE
+
+if Config.TRENDS_STARTUP_PROFILE:
+    # Installed before the remaining imports so that their cost is recorded
+    STARTUP_PROFILE.trace_imports()
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+
+from backend.api.routes import debug, metrics, trends  # noqa: E402
+from backend.core.tracing import TRACER, TracingMiddleware  # noqa: E402
+from backend.services.highlight_cache import HighlightCache  # noqa: E402
+from backend.services.trends_regions import create_regions  # noqa: E402
+from backend.services.trends_service import TrendsService  # noqa: E402
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
+# httpx logs each request URL at INFO, and SerpAPI URLs carry the API key
+logging.getLogger("httpx").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create application-lifetime services on startup and release them on shutdown."""
+    logger.info("Starting Vetted Backend API...")
+    Config.validate()
+    logger.info("Configuration validated")
+    
+    with STARTUP_PROFILE.measure("highlight_cache"):
+        app.state.highlight_cache = HighlightCache.from_config()
+    with STARTUP_PROFILE.measure("trends_service"):
+        # Upstream SDKs are imported on first use, not here
+        app.state.trends_service = TrendsService(highlight_cache=app.state.highlight_cache)
+    
+    # One snapshot cache (and refresher/worker) per region, sharing the
+    # service and its highlight cache. Persisted snapshots are restored here,
+    # before requests are accepted, so the first request after a restart is a
+    # cache read (across deploys only if the snapshot path is on a volume)
+    with STARTUP_PROFILE.measure("trends_regions"):
+        app.state.trends_regions = create_regions(app.state.trends_service)
+    
+    # The default region's objects, for callers that are not region-aware
+    default_region = next(iter(app.state.trends_regions.values()))
+    app.state.trends_cache = default_region.cache
+    app.state.snapshot_store = default_region.store
+    app.state.trends_refresher = default_region.refresher
+    app.state.enrichment_worker = default_region.worker
+    
+    STARTUP_PROFILE.mark_ready()
+    if Config.TRENDS_STARTUP_PROFILE:
+        STARTUP_PROFILE.log_report()
+    
+    try:
+        yield
+    finally:
+        logger.info("Shutting down Vetted Backend API...")
+        for region in app.state.trends_regions.values():
+            await region.stop()
+        await app.state.trends_service.aclose()
+        if app.state.highlight_cache is not None:
+            app.state.highlight_cache.close()
+        TRACER.close()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Vetted Backend API",
     description="Backend API services for Vetted platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -31,31 +90,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# One trace per request (see /debug/traces)
+app.add_middleware(TracingMiddleware)
+
 # Include routers
 app.include_router(trends.router)
+app.include_router(metrics.router)
+app.include_router(debug.router)
 
 
 @app.get("/")
 async def root():
     """Root endpoint."""
+    endpoints = {
+        "trends": "/api/trends",
+        "health": "/api/trends/health",
+        "metrics": "/metrics",
+    }
+    if Config.DEBUG_TRACES_ENABLED:
+        endpoints["traces"] = "/debug/traces"
     return {
         "message": "Vetted Backend API",
         "version": "1.0.0",
-        "endpoints": {
-            "trends": "/api/trends",
-            "health": "/api/trends/health"
-        }
+        "endpoints": endpoints
     }
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Validate configuration on startup."""
-    logger.info("Starting Vetted Backend API...")
-    Config.validate()
-    logger.info("Configuration validated")
-
-
 if __name__ == "__main__":
     import uvicorn
     import os
@@ -2,10 +2,16 @@
 Pydantic models for Tech Trends API responses.
 """
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, HttpUrl, Field
 
 
+class AlternateSource(BaseModel):
+    """Another URL carrying the same story as a trend item."""
+    source: str = Field(..., description="Source domain")
+    url: str = Field(..., description="Article URL")
+
+
 class TrendItem(BaseModel):
     """Represents a single tech trend article/item."""
     title: str = Field(..., description="Article title")
@@ -15,6 +21,14 @@ class TrendItem(BaseModel):
     raw_excerpt: str = Field(..., description="Raw snippet/description from search results")
     highlight: str = Field(default="", description="AI-generated highlight summary")
     category: str = Field(..., description="Category (e.g., 'startups', 'software_engineering', 'ai')")
+    enrichment_status: Literal["pending", "done", "failed", "skipped"] = Field(
+        default="pending",
+        description="Highlight state: 'pending' items may gain a highlight later and are worth re-polling"
+    )
+    alternate_sources: list[AlternateSource] = Field(
+        default_factory=list,
+        description="Duplicate or syndicated copies of this story collapsed into this item"
+    )
     
     class Config:
         json_schema_extra = {
@@ -25,7 +39,8 @@ class TrendItem(BaseModel):
                 "published_at": "2025-12-11T08:00:00Z",
                 "raw_excerpt": "A new wave of AI-powered tools is automating code reviews...",
                 "highlight": "AI-driven review tools are speeding up PR cycles and reducing bugs for fast-growing SaaS and startup teams.",
-                "category": "software_engineering"
+                "category": "software_engineering",
+                "enrichment_status": "done"
             }
         }
 
@@ -34,6 +49,7 @@ class TrendsResponse(BaseModel):
     """Response model for trends endpoint."""
     items: list[TrendItem] = Field(..., description="List of trend items")
     last_updated: datetime = Field(..., description="Timestamp when trends were last fetched")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page of a filtered query, if any")
     
     class Config:
         json_schema_extra = {
@@ -46,7 +62,8 @@ class TrendsResponse(BaseModel):
                         "published_at": "2025-12-11T08:00:00Z",
                         "raw_excerpt": "A new wave of AI-powered tools is automating code reviews...",
                         "highlight": "AI-driven review tools are speeding up PR cycles and reducing bugs for fast-growing SaaS and startup teams.",
-                        "category": "software_engineering"
+                        "category": "software_engineering",
+                        "enrichment_status": "done"
                     }
                 ],
                 "last_updated": "2025-12-12T10:15:00Z"
@@ -0,0 +1,158 @@
+"""
+Trend Deduplication
+
+Collapses duplicate search results before enrichment, so each story is
+summarized (and paid for) once:
+
+- URL canonicalization: scheme, `www.`/`amp.`/`m.` hosts, AMP paths and
+  query flags, tracking parameters (utm_*, fbclid, ...), fragments, query
+  parameter order and trailing slashes are normalized away, so variants of one
+  URL compare equal.
+- Near-duplicates: syndicated copies of a story under different URLs are
+  detected with a 64-bit SimHash of the title and snippet; items whose
+  fingerprints differ in at most TRENDS_NEAR_DUPLICATE_DISTANCE bits are
+  treated as the same story.
+
+The first item of each cluster (SerpAPI rank order) survives, and the others
+are recorded in its `alternate_sources`.
+"""
+import hashlib
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, unquote_plus, urlencode, urlparse, urlsplit, urlunparse, urlunsplit
+
+from backend.core.config import Config
+from backend.models.trends import AlternateSource, TrendItem
+
+# Query parameters that only track the referral, never select content
+_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid",
+    "ref", "ref_src", "ref_url", "cmpid", "ocid", "spm", "_ga", "guccounter",
+}
+_TRACKING_PREFIXES = ("utm_",)
+
+# Query parameters that request the AMP rendition of a page
+_AMP_PARAMS = {"amp", "outputtype", "amp_js_v"}
+
+# Host prefixes that serve the same content as the bare domain
+_HOST_PREFIXES = ("www.", "amp.", "m.")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in _TRACKING_PARAMS or name.startswith(_TRACKING_PREFIXES)
+
+
+def strip_tracking_params(url: str) -> str:
+    """
+    Remove tracking query parameters, leaving the URL otherwise untouched.
+
+    The other `&`-separated segments are kept byte for byte (no re-encoding),
+    and a URL without tracking parameters is returned as-is, since this is
+    the URL served to clients.
+    """
+    parsed = urlsplit(url)
+    if not parsed.query:
+        return url
+    segments = parsed.query.split("&")
+    kept = [s for s in segments if not _is_tracking_param(unquote_plus(s.split("=", 1)[0]))]
+    if len(kept) == len(segments):
+        return url
+    return urlunsplit(parsed._replace(query="&".join(kept)))
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of `url` for duplicate detection (not necessarily fetchable).
+
+    Example:
+        https://www.example.com/amp/story/?utm_source=x#top -> https://example.com/story
+    """
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or "").lower()
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    if parsed.port and parsed.port not in (80, 443):
+        host = f"{host}:{parsed.port}"
+
+    # AMP paths: /amp/..., .../amp, ....amp.html
+    segments = [s for s in parsed.path.split("/") if s and s.lower() != "amp"]
+    path = "/" + "/".join(segments)
+    path = re.sub(r"\.amp(\.html?)$", r"\1", path, flags=re.IGNORECASE)
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if not _is_tracking_param(k) and k.lower() not in _AMP_PARAMS
+    )
+    return urlunparse(("https", host, path.rstrip("/") or "/", "", urlencode(query), ""))
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of the word tokens (and adjacent word pairs) in `text`."""
+    tokens = _TOKEN.findall(text.lower())
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+
+    weights = [0] * 64
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def collapse_duplicates(items: list[TrendItem], max_distance: Optional[int] = None) -> list[TrendItem]:
+    """
+    Drop duplicate and near-duplicate items, keeping the first of each cluster.
+
+    Args:
+        items: Items in rank order
+        max_distance: SimHash bit distance at or below which two items are the
+            same story (defaults to TRENDS_NEAR_DUPLICATE_DISTANCE; negative
+            disables near-duplicate detection)
+
+    Returns:
+        Surviving items, in order, with `alternate_sources` listing the
+        collapsed duplicates
+    """
+    if max_distance is None:
+        max_distance = Config.TRENDS_NEAR_DUPLICATE_DISTANCE
+
+    survivors: list[TrendItem] = []
+    by_url: dict[str, TrendItem] = {}
+    fingerprints: list[tuple[int, TrendItem]] = []
+
+    for item in items:
+        canonical = canonicalize_url(item.url)
+        duplicate_of = by_url.get(canonical)
+
+        fingerprint = simhash(f"{item.title} {item.raw_excerpt}")
+        if duplicate_of is None and max_distance >= 0:
+            for other_fingerprint, other in fingerprints:
+                if hamming_distance(fingerprint, other_fingerprint) <= max_distance:
+                    duplicate_of = other
+                    break
+
+        if duplicate_of is None:
+            survivors.append(item)
+            by_url[canonical] = item
+            fingerprints.append((fingerprint, item))
+            continue
+
+        by_url.setdefault(canonical, duplicate_of)
+        if canonical != canonicalize_url(duplicate_of.url) and all(
+            alternate.url != item.url for alternate in duplicate_of.alternate_sources
+        ):
+            duplicate_of.alternate_sources.append(AlternateSource(source=item.source, url=item.url))
+
+    return survivors
@@ -0,0 +1,146 @@
+"""
+Enrichment Batcher
+
+Packs trend items into OpenAI enrichment calls by estimated token cost instead
+of a fixed item count. Each item costs its prompt tokens (title, excerpt and
+source plus framing) and its completion tokens (one highlight); items are
+added to a call, in order, until the next one would exceed the per-call
+budget (itself capped by the model's context window). Short excerpts
+therefore share fuller calls, and long ones never push a call into
+truncation.
+
+Token counts are estimated from text length (about four characters per
+token for English), which is close enough for packing; `max_tokens` for each
+call is derived from the same estimate with headroom for the JSON wrapper.
+
+Every call is recorded, so `stats()` reports how many items calls carry and
+how full they are relative to the budget.
+
+Configuration (see Config):
+- OPENAI_BATCH_TOKEN_BUDGET: Target prompt + completion tokens per call
+- OPENAI_CONTEXT_LIMIT: Model context window (hard cap on the budget)
+- OPENAI_BATCH_MAX_ITEMS: Most items per call (keeps calls parallelizable)
+- OPENAI_HIGHLIGHT_TOKENS: Completion tokens reserved per highlight
+"""
+import math
+from dataclasses import dataclass, field
+from typing import Optional
+
+from backend.core.config import Config
+from backend.models.trends import TrendItem
+
+# Characters per token for length-based estimates
+_CHARS_PER_TOKEN = 4
+
+# Per-article framing in the prompt ("Article n:", field labels, separators)
+_ARTICLE_OVERHEAD_TOKENS = 12
+
+# Chat formatting tokens per call, plus the structured-output wrapper
+_CALL_OVERHEAD_TOKENS = 20
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for `text`."""
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+@dataclass
+class EnrichmentBatch:
+    """Items for one enrichment call with their estimated token cost."""
+    items: list[TrendItem] = field(default_factory=list)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class TokenBudgetBatcher:
+    """Plans token-budgeted enrichment batches and tracks call fill."""
+
+    def __init__(
+        self,
+        system_prompt: str = "",
+        token_budget: Optional[int] = None,
+        context_limit: Optional[int] = None,
+        max_items: Optional[int] = None,
+        highlight_tokens: Optional[int] = None,
+    ):
+        """
+        Initialize the batcher, defaulting limits from Config.
+
+        Args:
+            system_prompt: Batch system prompt, counted once per call
+        """
+        self.token_budget = Config.OPENAI_BATCH_TOKEN_BUDGET if token_budget is None else token_budget
+        self.context_limit = Config.OPENAI_CONTEXT_LIMIT if context_limit is None else context_limit
+        self.max_items = Config.OPENAI_BATCH_MAX_ITEMS if max_items is None else max_items
+        self.highlight_tokens = Config.OPENAI_HIGHLIGHT_TOKENS if highlight_tokens is None else highlight_tokens
+        self.call_overhead_tokens = estimate_tokens(system_prompt) + _CALL_OVERHEAD_TOKENS
+
+        # Call statistics
+        self.calls = 0
+        self.items = 0
+        self.estimated_tokens = 0
+        self.max_items_per_call = 0
+
+    @property
+    def budget(self) -> int:
+        """Effective tokens per call: the configured budget within the context window."""
+        return min(self.token_budget, self.context_limit)
+
+    def item_prompt_tokens(self, item: TrendItem) -> int:
+        """Estimated prompt tokens for one article."""
+        return estimate_tokens(item.title + item.raw_excerpt + item.source) + _ARTICLE_OVERHEAD_TOKENS
+
+    def plan(self, items: list[TrendItem]) -> list[EnrichmentBatch]:
+        """
+        Split `items` (in order) into batches that fit the token budget.
+
+        An item that does not fit even on its own gets a batch to itself.
+        """
+        batches: list[EnrichmentBatch] = []
+        current = EnrichmentBatch(prompt_tokens=self.call_overhead_tokens)
+
+        for item in items:
+            prompt_tokens = self.item_prompt_tokens(item)
+            cost = prompt_tokens + self.highlight_tokens
+            if current.items and (
+                current.total_tokens + cost > self.budget
+                or len(current.items) >= self.max_items
+            ):
+                batches.append(current)
+                current = EnrichmentBatch(prompt_tokens=self.call_overhead_tokens)
+            current.items.append(item)
+            current.prompt_tokens += prompt_tokens
+            current.completion_tokens += self.highlight_tokens
+
+        if current.items:
+            batches.append(current)
+        return batches
+
+    def max_completion_tokens(self, items: list[TrendItem]) -> int:
+        """`max_tokens` for a call enriching `items` (highlights plus JSON wrapper)."""
+        return self.highlight_tokens * len(items) + _CALL_OVERHEAD_TOKENS
+
+    def record_call(self, items: list[TrendItem]) -> None:
+        """Record an enrichment call carrying `items`."""
+        self.calls += 1
+        self.items += len(items)
+        self.estimated_tokens += (
+            self.call_overhead_tokens
+            + sum(self.item_prompt_tokens(item) for item in items)
+            + self.highlight_tokens * len(items)
+        )
+        self.max_items_per_call = max(self.max_items_per_call, len(items))
+
+    def stats(self) -> dict:
+        """Items per call and fill ratio (estimated tokens / budget) for health reporting."""
+        return {
+            "calls": self.calls,
+            "items_per_call": round(self.items / self.calls, 2) if self.calls else None,
+            "max_items_per_call": self.max_items_per_call,
+            "fill_ratio": round(self.estimated_tokens / (self.calls * self.budget), 3) if self.calls else None,
+            "token_budget": self.budget,
+        }
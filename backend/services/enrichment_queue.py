@@ -0,0 +1,155 @@
+"""
+Enrichment Queue
+
+Two-phase trends publishing. With TRENDS_TWO_PHASE enabled, a refresh only
+fetches and normalizes (applying highlights already in the highlight cache),
+so the snapshot is published as soon as SerpAPI answers. Items still missing
+a highlight are published with `enrichment_status: "pending"` and queued here;
+a background worker drains the queue, enriches them through TrendsService, and
+republishes the snapshot in place (new body, ETag and indexes) after each
+enrichment batch. Clients re-poll (cheaply, via If-None-Match) while any item
+is pending.
+
+The queue holds item URLs, not item objects: the worker resolves them against
+whatever snapshot is current when it gets to them, so items from a snapshot
+that was replaced in the meantime are never enriched for nothing.
+
+Configuration (see Config):
+- TRENDS_TWO_PHASE: Publish un-enriched items first (default: false)
+- TRENDS_ENRICHMENT_CHUNK_SIZE: Most queued items the worker takes at a time
+"""
+import asyncio
+import contextvars
+import logging
+from typing import Optional
+
+from backend.core.config import Config
+from backend.models.trends import TrendItem, TrendsResponse
+from backend.services.trends_cache import TrendsCache
+from backend.services.trends_service import TrendsService
+
+logger = logging.getLogger(__name__)
+
+
+class EnrichmentWorker:
+    """Enriches pending snapshot items in the background."""
+
+    def __init__(
+        self,
+        service: TrendsService,
+        cache: TrendsCache,
+        chunk_size: Optional[int] = None,
+        region: Optional[str] = None,
+    ):
+        """
+        Initialize the worker, defaulting the chunk size from Config.
+
+        Args:
+            region: Region whose snapshots `load_trends` builds (defaults to TRENDS_REGION)
+        """
+        self.service = service
+        self.cache = cache
+        self.region = region
+        self.chunk_size = Config.TRENDS_ENRICHMENT_CHUNK_SIZE if chunk_size is None else chunk_size
+        self.queue: asyncio.Queue[str] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.enriched = 0
+        self.failed = 0
+        self.republished = 0
+
+    async def load_trends(self) -> TrendsResponse:
+        """
+        Snapshot loader for the two-phase mode (use in place of
+        `TrendsService.get_trends`): fetch without enrichment and queue the
+        pending items.
+        """
+        response = await self.service.get_trends(enrich=False, region=self.region)
+        self.enqueue(response.items)
+        return response
+
+    def enqueue(self, items: list[TrendItem]) -> None:
+        """Queue the pending items among `items` for enrichment."""
+        for item in items:
+            if item.enrichment_status == "pending":
+                self.queue.put_nowait(item.url)
+
+    def start(self) -> None:
+        """Start draining the queue."""
+        if self._task is not None and not self._task.done():
+            return
+        # Fresh context: each enrichment pass is its own trace
+        self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+        logger.info(f"Enrichment worker started (chunk size {self.chunk_size})")
+
+    async def stop(self) -> None:
+        """Stop the worker; queued items are dropped."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def process(self, urls: list[str]) -> int:
+        """
+        Enrich the current snapshot's pending items with the given URLs.
+
+        Returns:
+            Number of items that were enriched (successfully or not)
+        """
+        entry = self.cache.entry
+        if entry is None:
+            return 0
+
+        response = entry.response
+        by_url = {item.url: item for item in response.items}
+        pending = [
+            by_url[url] for url in dict.fromkeys(urls)
+            if url in by_url and by_url[url].enrichment_status == "pending"
+        ]
+        if not pending:
+            return 0
+
+        async for group in self.service.iter_enrichment(pending):
+            for item in group:
+                if item.enrichment_status == "done":
+                    self.enriched += 1
+                elif item.enrichment_status == "failed":
+                    self.failed += 1
+            if self.cache.republish(response):
+                self.republished += 1
+
+        # Whatever iter_enrichment did not settle (e.g. OpenAI not configured)
+        # must not stay pending forever
+        stragglers = [item for item in pending if item.enrichment_status == "pending"]
+        for item in stragglers:
+            item.enrichment_status = "failed"
+            self.failed += 1
+        if stragglers and self.cache.republish(response):
+            self.republished += 1
+        return len(pending)
+
+    def stats(self) -> dict:
+        """Worker state for health reporting."""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "queued": self.queue.qsize(),
+            "enriched": self.enriched,
+            "failed": self.failed,
+            "republished": self.republished,
+        }
+
+    async def _run(self) -> None:
+        """Drain the queue forever until cancelled."""
+        while True:
+            urls = [await self.queue.get()]
+            while len(urls) < self.chunk_size and not self.queue.empty():
+                urls.append(self.queue.get_nowait())
+
+            try:
+                await self.process(urls)
+            except Exception as e:
+                logger.error(f"Background enrichment failed: {e}", exc_info=True)
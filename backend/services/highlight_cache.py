@@ -0,0 +1,187 @@
+"""
+Highlight Cache
+
+Persistent, content-addressed cache for AI trend highlights. The same articles
+come back from SerpAPI across many refreshes; caching their highlights means
+only genuinely new content is sent to OpenAI.
+
+Entries are keyed by a hash of (title, raw_excerpt, source, model, prompt
+version), so changing the model or the prompt naturally invalidates them.
+Storage is a local SQLite database in WAL mode with age-based and LRU
+eviction.
+
+Configuration (see Config):
+- TRENDS_HIGHLIGHT_CACHE_PATH: SQLite file path (empty disables the cache)
+- TRENDS_HIGHLIGHT_CACHE_MAX_ENTRIES: LRU cap on stored highlights
+- TRENDS_HIGHLIGHT_CACHE_MAX_AGE_SECONDS: Highlights older than this are evicted
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+
+from backend.core.config import Config
+from backend.models.trends import TrendItem
+
+logger = logging.getLogger(__name__)
+
+
+class HighlightCache:
+    """SQLite-backed highlight cache keyed by article content hash."""
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 5000,
+        max_age_seconds: float = 30 * 24 * 3600,
+    ):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite database file path (":memory:" for tests)
+            max_entries: Maximum number of highlights kept (least recently used evicted first)
+            max_age_seconds: Highlights older than this are evicted
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+
+        directory = os.path.dirname(path)
+        if directory and path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS highlights (
+                key TEXT PRIMARY KEY,
+                highlight TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_highlights_last_used ON highlights (last_used_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_highlights_created ON highlights (created_at)"
+        )
+
+    @classmethod
+    def from_config(cls) -> Optional["HighlightCache"]:
+        """Create the cache from Config, or return None if it is disabled."""
+        if not Config.TRENDS_HIGHLIGHT_CACHE_PATH:
+            return None
+
+        try:
+            return cls(
+                Config.TRENDS_HIGHLIGHT_CACHE_PATH,
+                max_entries=Config.TRENDS_HIGHLIGHT_CACHE_MAX_ENTRIES,
+                max_age_seconds=Config.TRENDS_HIGHLIGHT_CACHE_MAX_AGE_SECONDS,
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Could not open highlight cache at {Config.TRENDS_HIGHLIGHT_CACHE_PATH}: {e}")
+            return None
+
+    @staticmethod
+    def make_key(item: TrendItem, model: str, prompt_version: str) -> str:
+        """Content hash identifying the highlight for `item` under a model/prompt."""
+        payload = json.dumps(
+            [item.title, item.raw_excerpt, item.source, model, prompt_version],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        """
+        Look up highlights for the given keys.
+
+        Returns:
+            Mapping of key -> highlight for keys that are cached and not expired
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        now = time.time()
+        min_created_at = now - self.max_age_seconds
+        found: dict[str, str] = {}
+
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, highlight FROM highlights "
+                    f"WHERE key IN ({placeholders}) AND created_at >= ?",
+                    [*chunk, min_created_at],
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                hit_keys = list(found)
+                for i in range(0, len(hit_keys), 500):
+                    chunk = hit_keys[i:i + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    self._conn.execute(
+                        f"UPDATE highlights SET last_used_at = ? WHERE key IN ({placeholders})",
+                        [now, *chunk],
+                    )
+
+        return found
+
+    def put_many(self, highlights: dict[str, str]) -> None:
+        """Store highlights and evict old or least recently used entries."""
+        if not highlights:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO highlights (key, highlight, created_at, last_used_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(key, highlight, now, now) for key, highlight in highlights.items()],
+                )
+                self._evict(now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then trim to max_entries by last use."""
+        self._conn.execute(
+            "DELETE FROM highlights WHERE created_at < ?",
+            (now - self.max_age_seconds,),
+        )
+        self._conn.execute(
+            """
+            DELETE FROM highlights WHERE key IN (
+                SELECT key FROM highlights
+                ORDER BY last_used_at DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM highlights").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
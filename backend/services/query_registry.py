@@ -0,0 +1,171 @@
+"""
+Trend Query Registry
+
+The SerpAPI queries behind the trends feed, each with its own refresh
+cadence, result count and priority:
+
+- ttl_seconds: How long a query's results are reused before it is fetched
+  again. Fast-moving categories (e.g. ai) can refresh often and slow ones
+  (e.g. engineering) rarely, so a refresh only spends SerpAPI calls on the
+  queries that are due. None refetches the query on every refresh.
+  Whatever the TTL, retained results older than TRENDS_QUERY_MAX_AGE_SECONDS
+  are dropped rather than reused or served as a fallback.
+- num_results: Organic results requested from SerpAPI (max 100).
+- priority: Higher-priority queries are issued first, so under
+  SERPAPI_MAX_CONCURRENCY or a tight pipeline deadline they are the last to
+  be delayed or skipped.
+
+The registry defaults to TREND_QUERIES and can be replaced with
+TRENDS_QUERY_REGISTRY, either inline JSON or the path to a JSON file holding
+a list of entries:
+
+    [
+        {"query": "AI startup news", "category": "ai", "ttl_seconds": 300, "priority": 10},
+        {"query": "engineering firm innovations", "category": "engineering", "ttl_seconds": 3600}
+    ]
+"""
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+from backend.core.config import Config
+
+# Predefined search queries for tech trends (similar to job scraper pattern)
+TREND_QUERIES = [
+    {
+        "query": "latest technology trends startups 2025",
+        "category": "startups",
+        "num_results": 10,
+        "ttl_seconds": 1800,
+        "priority": 5
+    },
+    {
+        "query": "software engineering emerging trends",
+        "category": "software_engineering",
+        "num_results": 10,
+        "ttl_seconds": 3600
+    },
+    {
+        "query": "AI startup news artificial intelligence",
+        "category": "ai",
+        "num_results": 10,
+        "ttl_seconds": 600,
+        "priority": 10
+    },
+    {
+        "query": "engineering firm technology innovations",
+        "category": "engineering",
+        "num_results": 10,
+        "ttl_seconds": 3600
+    }
+]
+
+# Fraction of its TTL before expiry at which a query already counts as due, so
+# a refresh arriving slightly early (refresher jitter) does not postpone it by
+# a whole interval
+TTL_EARLY_FRACTION = 0.2
+
+
+@dataclass(frozen=True)
+class TrendQuery:
+    """One registry entry."""
+    query: str
+    category: str
+    num_results: int = 10
+    ttl_seconds: Optional[float] = None
+    priority: int = 0
+
+    @classmethod
+    def from_dict(cls, entry: dict) -> "TrendQuery":
+        """
+        Build a query from a registry entry.
+
+        Raises:
+            ValueError: If the entry is missing fields or has invalid values
+        """
+        if not isinstance(entry, dict):
+            raise ValueError(f"Trend query entry must be an object, got {entry!r}")
+        unknown = set(entry) - {"query", "category", "num_results", "ttl_seconds", "priority"}
+        if unknown:
+            raise ValueError(f"Unknown trend query fields: {', '.join(sorted(unknown))}")
+        try:
+            query = cls(
+                query=str(entry["query"]),
+                category=str(entry["category"]),
+                num_results=int(entry.get("num_results", 10)),
+                ttl_seconds=None if entry.get("ttl_seconds") is None else float(entry["ttl_seconds"]),
+                priority=int(entry.get("priority", 0)),
+            )
+        except KeyError as e:
+            raise ValueError(f"Trend query entry is missing {e}: {entry!r}") from e
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid trend query entry {entry!r}: {e}") from e
+
+        if not query.query or not query.category:
+            raise ValueError(f"Trend query and category must be non-empty: {entry!r}")
+        if not 1 <= query.num_results <= 100:
+            raise ValueError(f"num_results must be between 1 and 100: {entry!r}")
+        if query.ttl_seconds is not None and query.ttl_seconds <= 0:
+            raise ValueError(f"ttl_seconds must be positive: {entry!r}")
+        return query
+
+    def is_due(self, age_seconds: Optional[float]) -> bool:
+        """Whether results fetched `age_seconds` ago (None: never) should be refetched."""
+        if age_seconds is None or self.ttl_seconds is None:
+            return True
+        return age_seconds >= self.ttl_seconds * (1 - TTL_EARLY_FRACTION)
+
+
+def parse_query_registry(entries: list) -> list[TrendQuery]:
+    """
+    Validate registry entries.
+
+    Raises:
+        ValueError: On an empty registry, an invalid entry or a duplicate query
+    """
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("Trend query registry must be a non-empty list")
+
+    queries = [TrendQuery.from_dict(entry) for entry in entries]
+    seen = set()
+    for query in queries:
+        if query.query in seen:
+            raise ValueError(f"Duplicate trend query: {query.query!r}")
+        seen.add(query.query)
+    return queries
+
+
+def load_query_registry(source: Optional[str] = None) -> list[TrendQuery]:
+    """
+    Load the query registry.
+
+    Args:
+        source: Inline JSON or a JSON file path (defaults to
+            TRENDS_QUERY_REGISTRY; empty uses TREND_QUERIES)
+
+    Raises:
+        ValueError: If the registry cannot be read or is invalid
+    """
+    source = Config.TRENDS_QUERY_REGISTRY if source is None else source
+    if not source or not source.strip():
+        return parse_query_registry(TREND_QUERIES)
+
+    source = source.strip()
+    try:
+        if source.startswith("["):
+            entries = json.loads(source)
+        else:
+            with open(source, encoding="utf-8") as f:
+                entries = json.load(f)
+    except OSError as e:
+        raise ValueError(f"Could not read trend query registry {source}: {e}") from e
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Trend query registry is not valid JSON: {e}") from e
+
+    return parse_query_registry(entries)
+
+
+def refresh_interval(queries: list[TrendQuery], default: float) -> float:
+    """Snapshot refresh interval: `default`, shortened to the shortest query TTL."""
+    ttls = [query.ttl_seconds for query in queries if query.ttl_seconds is not None]
+    return min([default, *ttls])
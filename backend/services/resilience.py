@@ -0,0 +1,130 @@
+"""
+Resilience Primitives
+
+Deadlines and circuit breakers for the trends pipeline.
+
+- Deadline: an absolute time budget created once per pipeline run and passed
+  to every stage, so each stage only waits for what is left of the budget
+  (rather than its own full timeout) and the run can stop with whatever it
+  has when the budget is spent.
+- CircuitBreaker: per-upstream failure tracking. After
+  CIRCUIT_FAILURE_THRESHOLD consecutive failures the circuit opens and calls
+  fail fast with CircuitOpenError; after CIRCUIT_RESET_SECONDS one trial call
+  is let through (half-open), and its outcome closes or re-opens the circuit.
+"""
+import logging
+import time
+from typing import Callable, Optional
+
+from backend.core.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class Deadline:
+    """Absolute time budget on the monotonic clock."""
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.seconds = seconds
+        self.expires_at = clock() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left (0 once expired)."""
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Seconds a stage may wait: what is left of the budget, at most `cap`."""
+        remaining = self.remaining()
+        return remaining if cap is None else min(remaining, cap)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one upstream."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        reset_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize a closed circuit, defaulting thresholds from Config."""
+        self.name = name
+        self.failure_threshold = Config.CIRCUIT_FAILURE_THRESHOLD if failure_threshold is None else failure_threshold
+        self.reset_seconds = Config.CIRCUIT_RESET_SECONDS if reset_seconds is None else reset_seconds
+        self._clock = clock
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        # When the current half-open trial call was let through; a trial that
+        # never reports back (e.g. cancelled) is superseded after reset_seconds
+        self._trial_started_at: Optional[float] = None
+
+        # Counters
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open."""
+        if self.opened_at is None:
+            return "closed"
+        if self._clock() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims the trial call when half-open)."""
+        state = self.state
+        if state == "closed":
+            return True
+        now = self._clock()
+        if state == "half_open" and (
+            self._trial_started_at is None
+            or now - self._trial_started_at >= self.reset_seconds
+        ):
+            self._trial_started_at = now
+            return True
+        self.rejected += 1
+        return False
+
+    def check(self) -> None:
+        """Like `allow`, but raises CircuitOpenError when the call may not go out."""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info(f"{self.name} circuit closed")
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_started_at = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        was_trial = self._trial_started_at is not None
+        self._trial_started_at = None
+        if was_trial or (self.opened_at is None and self.consecutive_failures >= self.failure_threshold):
+            self.opened_at = self._clock()
+            self.opened += 1
+            logger.warning(
+                f"{self.name} circuit opened after {self.consecutive_failures} consecutive "
+                f"failures, failing fast for {self.reset_seconds}s"
+            )
+
+    def stats(self) -> dict:
+        """Circuit state for health reporting."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,18 @@
+"""
+JSON serialization helpers for pre-encoded responses.
+
+Uses orjson when it is installed and falls back to pydantic's encoder.
+"""
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # Optional fast encoder
+    orjson = None
+
+
+def dumps_model(model: BaseModel) -> bytes:
+    """Encode a pydantic model to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(model.model_dump())
+    return model.model_dump_json().encode("utf-8")
@@ -0,0 +1,267 @@
+"""
+Shared Snapshot Store
+
+Cross-process trends snapshot for deployments running several uvicorn
+workers. All workers on a host open the same SQLite database (WAL mode, so
+readers never block the writer) and use it to:
+
+- Share one authoritative snapshot per region. Every save bumps the region's
+  version; workers adopt a newer version instead of building their own.
+- Hold a refresh lease per region. Only the worker holding the lease runs the
+  SerpAPI/OpenAI pipeline; the others wait for its snapshot. The lease
+  expires after TRENDS_SHARED_LEASE_SECONDS, so a worker that dies
+  mid-refresh does not block refreshes for long.
+- Share the per-query SerpAPI results (with their fetch times) behind the
+  query TTLs. The lease holder starts from them, so a query is fetched once
+  per TTL across all workers rather than once per worker.
+
+Upstream cost therefore stays flat as the worker count grows. The store also
+replaces the JSON SnapshotStore for persistence across restarts.
+
+Configuration (see Config):
+- TRENDS_SHARED_CACHE_PATH: SQLite file path (empty disables sharing)
+- TRENDS_SHARED_LEASE_SECONDS: Lease lifetime (keep above the refresh deadline)
+- TRENDS_SHARED_SYNC_SECONDS: How often readers check for a newer snapshot
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from pydantic import ValidationError
+
+from backend.core.config import Config
+from backend.models.trends import TrendsResponse
+from backend.services.snapshot_store import SNAPSHOT_SCHEMA_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+def lease_owner_id() -> str:
+    """Identifier for this process's leases (pid plus a random suffix)."""
+    return f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class SharedSnapshotStore:
+    """SQLite-backed snapshot shared by all workers, with a refresh lease."""
+
+    # TrendsCache coordinates refreshes through stores that set this
+    shared = True
+
+    def __init__(self, path: str, region: str, lease_seconds: float = 150.0):
+        """
+        Open (or create) the shared database.
+
+        Args:
+            path: SQLite database file path (shared by all workers)
+            region: Region whose snapshot and lease this store manages
+            lease_seconds: How long a refresh lease is held before it expires
+        """
+        self.path = path
+        self.region = region
+        self.lease_seconds = lease_seconds
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS snapshots (
+                region TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                schema_version INTEGER NOT NULL,
+                saved_at REAL NOT NULL,
+                body BLOB NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS refresh_leases (
+                region TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS query_results (
+                region TEXT NOT NULL,
+                query TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                results TEXT NOT NULL,
+                PRIMARY KEY (region, query)
+            )
+            """
+        )
+
+    @classmethod
+    def from_config(cls, region: str) -> Optional["SharedSnapshotStore"]:
+        """Create the store from Config, or return None if sharing is disabled."""
+        if not Config.TRENDS_SHARED_CACHE_PATH:
+            return None
+
+        try:
+            return cls(
+                Config.TRENDS_SHARED_CACHE_PATH,
+                region,
+                lease_seconds=Config.TRENDS_SHARED_LEASE_SECONDS,
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Could not open shared trends cache at {Config.TRENDS_SHARED_CACHE_PATH}: {e}")
+            return None
+
+    def save(self, body: bytes) -> int:
+        """
+        Publish a snapshot to all workers.
+
+        Args:
+            body: Serialized TrendsResponse (the cache entry's pre-serialized body)
+
+        Returns:
+            The snapshot's new version
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    """
+                    INSERT INTO snapshots (region, version, schema_version, saved_at, body)
+                    VALUES (?, 1, ?, ?, ?)
+                    ON CONFLICT (region) DO UPDATE SET
+                        version = version + 1,
+                        schema_version = excluded.schema_version,
+                        saved_at = excluded.saved_at,
+                        body = excluded.body
+                    """,
+                    (self.region, SNAPSHOT_SCHEMA_VERSION, time.time(), body),
+                )
+                row = self._conn.execute(
+                    "SELECT version FROM snapshots WHERE region = ?",
+                    (self.region,),
+                ).fetchone()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row[0]
+
+    def load_newer(self, version: int) -> Optional[tuple[int, TrendsResponse, datetime]]:
+        """
+        Read the snapshot if it is newer than `version`.
+
+        Returns:
+            (version, response, saved_at) or None if there is no newer,
+            compatible snapshot
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, schema_version, saved_at, body FROM snapshots "
+                "WHERE region = ? AND version > ?",
+                (self.region, version),
+            ).fetchone()
+        if row is None:
+            return None
+
+        new_version, schema_version, saved_at, body = row
+        if schema_version != SNAPSHOT_SCHEMA_VERSION:
+            logger.warning(
+                f"Ignoring shared trends snapshot with schema version {schema_version} "
+                f"(expected {SNAPSHOT_SCHEMA_VERSION})"
+            )
+            return None
+        try:
+            response = TrendsResponse.model_validate(json.loads(body))
+        except (ValueError, ValidationError) as e:
+            logger.warning(f"Ignoring invalid shared trends snapshot for {self.region}: {e}")
+            return None
+        return new_version, response, datetime.fromtimestamp(saved_at, tz=timezone.utc)
+
+    def load(self) -> Optional[tuple[TrendsResponse, datetime]]:
+        """Read the current snapshot (same interface as SnapshotStore.load)."""
+        loaded = self.load_newer(0)
+        return None if loaded is None else loaded[1:]
+
+    def save_query_results(self, results: dict[str, tuple[float, list[dict]]]) -> None:
+        """
+        Publish per-query SerpAPI results to all workers.
+
+        Args:
+            results: query -> (wall-clock fetch time, raw results); an entry
+                never replaces one fetched later
+        """
+        rows = [
+            (self.region, query, fetched_at, json.dumps(items))
+            for query, (fetched_at, items) in results.items()
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT INTO query_results (region, query, fetched_at, results)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (region, query) DO UPDATE SET
+                        fetched_at = excluded.fetched_at,
+                        results = excluded.results
+                    WHERE excluded.fetched_at > query_results.fetched_at
+                    """,
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def load_query_results(self) -> dict[str, tuple[float, list[dict]]]:
+        """Read the region's shared per-query results: query -> (wall-clock fetch time, raw results)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT query, fetched_at, results FROM query_results WHERE region = ?",
+                (self.region,),
+            ).fetchall()
+        return {query: (fetched_at, json.loads(results)) for query, fetched_at, results in rows}
+
+    def acquire_lease(self, owner: str) -> bool:
+        """
+        Take the region's refresh lease unless another live owner holds it.
+
+        Re-acquiring a lease the owner already holds extends it.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO refresh_leases (region, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (region) DO UPDATE SET
+                    owner = excluded.owner,
+                    expires_at = excluded.expires_at
+                WHERE refresh_leases.expires_at < ? OR refresh_leases.owner = excluded.owner
+                """,
+                (self.region, owner, now + self.lease_seconds, now),
+            )
+        return cursor.rowcount == 1
+
+    def release_lease(self, owner: str) -> None:
+        """Give up the lease if `owner` still holds it."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM refresh_leases WHERE region = ? AND owner = ?",
+                (self.region, owner),
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
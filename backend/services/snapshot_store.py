@@ -0,0 +1,142 @@
+"""
+Snapshot Store
+
+Durable copy of the latest trends snapshot, so a restarted or redeployed
+process serves the last good TrendsResponse immediately instead of running
+the cold pipeline (or returning nothing while an upstream is down).
+
+The snapshot is a JSON file written atomically (temporary file, fsync, then
+rename over the previous one), so readers never see a partial write. It is
+wrapped in an envelope with a schema version; a file with a different
+version, or one that fails to parse, is ignored rather than served.
+
+Configuration (see Config):
+- TRENDS_SNAPSHOT_PATH: Snapshot file path (empty disables persistence)
+"""
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import Optional
+
+from pydantic import ValidationError
+
+from backend.core.config import Config
+from backend.models.trends import TrendsResponse
+
+logger = logging.getLogger(__name__)
+
+# Bump when the envelope or TrendsResponse changes incompatibly
+SNAPSHOT_SCHEMA_VERSION = 1
+
+
+def snapshot_age(saved_at: datetime) -> float:
+    """Seconds since a snapshot was saved (naive times are taken as UTC)."""
+    if saved_at.tzinfo is None:
+        saved_at = saved_at.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - saved_at).total_seconds()
+
+
+class SnapshotStore:
+    """Atomic, versioned on-disk copy of the latest trends snapshot."""
+
+    # Private to this process (see SharedSnapshotStore for multiple workers)
+    shared = False
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Snapshot file path (its directory is created if missing)
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, region: Optional[str] = None) -> Optional["SnapshotStore"]:
+        """
+        Create the store from Config, or return None if persistence is disabled.
+
+        Args:
+            region: Region whose snapshot is stored; regions other than
+                TRENDS_REGION get their own file next to TRENDS_SNAPSHOT_PATH
+                (e.g. trends_snapshot.gb.json)
+        """
+        path = Config.TRENDS_SNAPSHOT_PATH
+        if not path:
+            return None
+        if region and region != Config.TRENDS_REGION.strip().lower():
+            root, ext = os.path.splitext(path)
+            path = f"{root}.{region}{ext}"
+        try:
+            return cls(path)
+        except OSError as e:
+            logger.error(f"Could not create snapshot directory for {path}: {e}")
+            return None
+
+    def save(self, body: bytes) -> None:
+        """
+        Atomically replace the stored snapshot.
+
+        Args:
+            body: Serialized TrendsResponse (the cache entry's pre-serialized body)
+        """
+        header = json.dumps({
+            "schema_version": SNAPSHOT_SCHEMA_VERSION,
+            "saved_at": datetime.now(timezone.utc).isoformat(),
+        })
+        # Splice the pre-serialized response into the envelope
+        payload = header[:-1].encode("utf-8") + b',"response":' + body + b"}"
+
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(prefix=".snapshot-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def load(self) -> Optional[tuple[TrendsResponse, datetime]]:
+        """
+        Read the stored snapshot.
+
+        Returns:
+            (response, saved_at) or None if there is no usable snapshot
+        """
+        try:
+            with open(self.path, "rb") as f:
+                envelope = json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable trends snapshot at {self.path}: {e}")
+            return None
+
+        if not isinstance(envelope, dict) or envelope.get("schema_version") != SNAPSHOT_SCHEMA_VERSION:
+            version = envelope.get("schema_version") if isinstance(envelope, dict) else None
+            logger.warning(
+                f"Ignoring trends snapshot with schema version {version} "
+                f"(expected {SNAPSHOT_SCHEMA_VERSION})"
+            )
+            return None
+
+        try:
+            response = TrendsResponse.model_validate(envelope["response"])
+            saved_at = datetime.fromisoformat(envelope["saved_at"])
+        except (KeyError, TypeError, ValueError, ValidationError) as e:
+            logger.warning(f"Ignoring invalid trends snapshot at {self.path}: {e}")
+            return None
+
+        return response, saved_at
+
+    def close(self) -> None:
+        """Nothing to release: the file is only open while reading or writing."""
@@ -0,0 +1,525 @@
+"""
+Trends Snapshot Cache
+
+Process-wide in-memory cache for the trends endpoint. Holds the last
+TrendsResponse built by TrendsService and serves it with stale-while-revalidate
+semantics:
+
+- Fresh (age < TTL): returned immediately.
+- Stale (TTL <= age < TTL + stale window): returned immediately while a single
+  background refresh rebuilds the snapshot.
+- Expired or missing: the caller waits for a refresh.
+
+Refreshes are single-flight: at most one runs at a time, and concurrent
+callers that need a refresh await the in-flight one instead of starting their
+own pipeline. The number of such coalesced waiters is exposed via `stats()`.
+
+Snapshots can be persisted to a SnapshotStore on every change and restored
+from it at startup (`restore`), so a restarted process serves the last good
+snapshot immediately. A restored snapshot keeps its real age: if it is past
+the TTL it is served as stale and refreshed as usual.
+
+With a shared store (SharedSnapshotStore, several uvicorn workers), the cache
+also adopts snapshots other workers published: reads check for a newer
+version at most every TRENDS_SHARED_SYNC_SECONDS, and a refresh first takes
+the store's refresh lease. A worker that cannot get the lease waits for the
+holder's snapshot and adopts it instead of running the loader itself, so the
+pipeline runs once per refresh across all workers. `on_adopt` lets the owner
+bring its own state (e.g. the incremental-refresh baseline) up to date with
+each adopted snapshot.
+
+When a TrendsRefresher owns refreshes (`refresh_on_read = False`), reads never
+start a refresh: any existing snapshot is served as-is, and a cold read only
+joins the refresher's in-flight warm-up.
+
+Configuration (see Config):
+- TRENDS_CACHE_TTL_SECONDS: How long a snapshot is considered fresh
+- TRENDS_CACHE_STALE_SECONDS: How long a stale snapshot may still be served
+- TRENDS_CACHE_RETRY_SECONDS: Back-off before retrying after a failed refresh
+- TRENDS_SHARED_SYNC_SECONDS: How often reads look for a newer shared snapshot
+"""
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from backend.core.config import Config
+from backend.core.metrics import CACHE_REQUESTS, REFRESH_ITEMS, SHARED_SNAPSHOT_EVENTS
+from backend.models.trends import TrendsResponse
+from backend.services.serialization import dumps_model
+from backend.services.shared_snapshot import lease_owner_id
+from backend.services.snapshot_store import SnapshotStore, snapshot_age
+from backend.services.trends_index import TrendsIndex
+
+logger = logging.getLogger(__name__)
+
+TrendsLoader = Callable[[], Awaitable[TrendsResponse]]
+
+# How often a worker waiting on another worker's refresh lease polls for its snapshot
+LEASE_POLL_SECONDS = 0.25
+
+
+def serialize_response(response: TrendsResponse) -> bytes:
+    """Encode a TrendsResponse to JSON bytes (orjson when installed)."""
+    return dumps_model(response)
+
+
+def next_last_updated(previous: datetime) -> datetime:
+    """
+    A `last_updated` later than `previous` at HTTP-date (whole second) resolution.
+
+    Keeps `previous`'s naive/aware form. Used when a snapshot's content
+    changes in place, so Last-Modified moves forward with the ETag.
+    """
+    now = datetime.now(timezone.utc) if previous.tzinfo else datetime.utcnow()
+    return max(now, previous.replace(microsecond=0) + timedelta(seconds=1))
+
+
+@dataclass
+class CacheEntry:
+    """A cached trends snapshot and its freshness bookkeeping (monotonic clock)."""
+    response: TrendsResponse
+    fetched_at: float
+    fresh_until: float
+    # Response serialized once per snapshot, served as-is by the route
+    body: bytes = b""
+    # Strong HTTP validator for `body` (quoted)
+    etag: str = ""
+    # Hash of the items alone, used to detect refreshes that changed nothing
+    content_digest: str = ""
+    # Category/source/date indexes for filtered reads, built once per snapshot
+    index: Optional[TrendsIndex] = None
+
+    @classmethod
+    def build(cls, response: TrendsResponse, fetched_at: float, fresh_until: float) -> "CacheEntry":
+        """Create an entry, serializing it and computing its validators once."""
+        items_json = json.dumps(
+            [item.model_dump(mode="json") for item in response.items],
+            sort_keys=True,
+        )
+        body = serialize_response(response)
+        return cls(
+            response=response,
+            fetched_at=fetched_at,
+            fresh_until=fresh_until,
+            body=body,
+            etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+            content_digest=hashlib.sha256(items_json.encode("utf-8")).hexdigest(),
+            index=TrendsIndex(response),
+        )
+
+    def age(self, now: float) -> float:
+        return now - self.fetched_at
+
+
+class TrendsCache:
+    """In-memory trends snapshot cache with stale-while-revalidate."""
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        stale_seconds: Optional[float] = None,
+        retry_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        store: Optional[SnapshotStore] = None,
+        sync_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize the cache, defaulting timings from Config.
+
+        Args:
+            store: Where to persist each new snapshot (None keeps it in memory only);
+                a shared store also coordinates refreshes across workers
+            sync_seconds: How often reads check a shared store for a newer snapshot
+        """
+        self.ttl_seconds = Config.TRENDS_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.stale_seconds = Config.TRENDS_CACHE_STALE_SECONDS if stale_seconds is None else stale_seconds
+        self.retry_seconds = Config.TRENDS_CACHE_RETRY_SECONDS if retry_seconds is None else retry_seconds
+        self.sync_seconds = Config.TRENDS_SHARED_SYNC_SECONDS if sync_seconds is None else sync_seconds
+        self._clock = clock
+        self._store = store
+        self.shared = bool(store is not None and store.shared)
+        self.lease_owner = lease_owner_id()
+        self._shared_version = 0
+        self._last_sync: Optional[float] = None
+        self._entry: Optional[CacheEntry] = None
+        self._inflight: Optional[asyncio.Task] = None
+
+        # Set to False when a background refresher keeps the snapshot current
+        self.refresh_on_read = True
+
+        # Called with each snapshot adopted from the shared store
+        self.on_adopt: Optional[Callable[[TrendsResponse], None]] = None
+
+        # Counters
+        self.refreshes = 0
+        self.coalesced_waiters = 0
+        self.restored = False
+        self.persist_failures = 0
+        self.adopted = 0
+        self.lease_waits = 0
+
+    @property
+    def entry(self) -> Optional[CacheEntry]:
+        """Current cache entry, if any."""
+        return self._entry
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot."""
+        self._entry = None
+
+    def republish(self, response: TrendsResponse) -> bool:
+        """
+        Re-serialize the current snapshot after its items were updated in place.
+
+        Freshness is unchanged; `last_updated` is advanced and the body, ETag
+        and indexes are rebuilt so the update is visible to readers (and to
+        clients revalidating with either If-None-Match or If-Modified-Since).
+
+        Returns:
+            False if `response` is no longer the current snapshot
+        """
+        entry = self._entry
+        if entry is None or entry.response is not response:
+            return False
+        response.last_updated = next_last_updated(response.last_updated)
+        self._entry = CacheEntry.build(response, fetched_at=entry.fetched_at, fresh_until=entry.fresh_until)
+        self._persist(self._entry)
+        return True
+
+    def restore(self, response: TrendsResponse, age_seconds: float) -> bool:
+        """
+        Seed the cache with a persisted snapshot (used at startup).
+
+        Args:
+            response: The persisted TrendsResponse
+            age_seconds: Time since it was saved; freshness counts from then
+
+        Returns:
+            False if the cache already holds a snapshot (nothing restored)
+        """
+        if self._entry is not None:
+            return False
+        self._entry = self._aged_entry(response, age_seconds)
+        self.restored = True
+        return True
+
+    def sync_shared(self) -> bool:
+        """
+        Adopt a snapshot another worker published to the shared store.
+
+        Returns:
+            True if a newer snapshot was adopted (False without a shared store)
+        """
+        if not self.shared:
+            return False
+        self._last_sync = self._clock()
+        loaded = self._store.load_newer(self._shared_version)
+        if loaded is None:
+            return False
+
+        version, response, saved_at = loaded
+        self._shared_version = version
+        self._entry = self._aged_entry(response, snapshot_age(saved_at))
+        self.adopted += 1
+        SHARED_SNAPSHOT_EVENTS.inc("adopted")
+        logger.info(f"Adopted shared trends snapshot version {version} with {len(response.items)} items")
+        if self.on_adopt is not None:
+            self.on_adopt(response)
+        return True
+
+    def seconds_until_stale(self, entry: CacheEntry) -> float:
+        """Seconds until `entry` goes stale (0 if it already is)."""
+        return max(0.0, entry.fresh_until - self._clock())
+
+    def cancel_refresh(self) -> None:
+        """Cancel the in-flight refresh, if any (used on shutdown)."""
+        if self._inflight is not None and not self._inflight.done():
+            self._inflight.cancel()
+
+    async def get(self, loader: TrendsLoader) -> TrendsResponse:
+        """
+        Return the cached snapshot, refreshing it through `loader` as needed.
+
+        Args:
+            loader: Coroutine factory that builds a fresh TrendsResponse
+
+        Returns:
+            The current (possibly stale) TrendsResponse
+        """
+        entry = await self.get_entry(loader)
+        return entry.response
+
+    async def get_entry(self, loader: TrendsLoader) -> CacheEntry:
+        """Like `get`, but returns the cache entry with its HTTP validators."""
+        self._sync_if_due()
+        now = self._clock()
+        entry = self._entry
+
+        if not self.refresh_on_read:
+            CACHE_REQUESTS.inc("hit" if entry is not None else "miss")
+            return await self._get_without_refresh()
+
+        if entry is not None:
+            if now < entry.fresh_until:
+                CACHE_REQUESTS.inc("hit")
+                return entry
+
+            if entry.age(now) < self.ttl_seconds + self.stale_seconds:
+                CACHE_REQUESTS.inc("stale")
+                self._schedule_background_refresh(loader)
+                return entry
+
+        CACHE_REQUESTS.inc("miss")
+        await self._refresh(loader)
+        return self._entry
+
+    async def refresh(self, loader: TrendsLoader, timeout: Optional[float] = None) -> bool:
+        """
+        Refresh the snapshot now, joining an in-flight refresh if there is one.
+
+        Args:
+            loader: Coroutine factory that builds a fresh TrendsResponse
+            timeout: Seconds to allow; on expiry the refresh is cancelled and
+                the previous snapshot is kept
+
+        Returns:
+            True if the snapshot was replaced, False if the previous one was kept
+
+        Raises:
+            asyncio.TimeoutError: If the refresh exceeded `timeout` or was cancelled
+            Exception: Whatever the loader raised
+        """
+        task = self._join_or_start_refresh(loader)
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+        if not done:
+            task.cancel()
+            raise asyncio.TimeoutError(f"Trends refresh exceeded {timeout}s")
+        return self._refresh_result(task)
+
+    def start_refresh_if_idle(self, loader: TrendsLoader) -> Optional[asyncio.Task]:
+        """Start a refresh unless one is in flight; returns the task if started."""
+        if self._inflight is not None and not self._inflight.done():
+            return None
+        return self._start_refresh(loader)
+
+    async def wait_for_refresh(self) -> None:
+        """Wait for the in-flight refresh (if any) to finish, ignoring its outcome."""
+        task = self._inflight
+        if task is not None and not task.done():
+            self.coalesced_waiters += 1
+            await asyncio.wait({task})
+
+    def stats(self) -> dict:
+        """Cache counters and snapshot age for health reporting."""
+        entry = self._entry
+        return {
+            "has_snapshot": entry is not None,
+            "snapshot_age_seconds": round(entry.age(self._clock()), 1) if entry else None,
+            "refreshes": self.refreshes,
+            "coalesced_waiters": self.coalesced_waiters,
+            "refresh_in_flight": self._inflight is not None and not self._inflight.done(),
+            "restored_from_disk": self.restored,
+            "persist_failures": self.persist_failures,
+            "shared": self.shared,
+            "shared_version": self._shared_version if self.shared else None,
+            "adopted": self.adopted,
+            "lease_waits": self.lease_waits,
+        }
+
+    def _aged_entry(self, response: TrendsResponse, age_seconds: float) -> CacheEntry:
+        """Build an entry for a snapshot saved `age_seconds` ago; freshness counts from then."""
+        fetched_at = self._clock() - max(0.0, age_seconds)
+        fresh_for = self.ttl_seconds if response.items else self.retry_seconds
+        return CacheEntry.build(response, fetched_at=fetched_at, fresh_until=fetched_at + fresh_for)
+
+    def _sync_if_due(self) -> None:
+        """Check the shared store for a newer snapshot, at most every `sync_seconds`."""
+        if not self.shared:
+            return
+        if self._last_sync is not None and self._clock() - self._last_sync < self.sync_seconds:
+            return
+        try:
+            self.sync_shared()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read shared trends snapshot: {e}")
+
+    def _schedule_background_refresh(self, loader: TrendsLoader) -> None:
+        """Start a background refresh unless one is already running."""
+        if self._inflight is not None and not self._inflight.done():
+            return
+
+        logger.info("Trends snapshot is stale, refreshing in background")
+        self._start_refresh(loader, detached=True)
+
+    async def _get_without_refresh(self) -> CacheEntry:
+        """Serve the snapshot as-is; a cold read only joins an in-flight refresh."""
+        task = self._inflight
+        if self._entry is None and task is not None and not task.done():
+            self.coalesced_waiters += 1
+            await asyncio.wait({task})
+
+        if self._entry is None:
+            # Nothing to serve yet; an uncached, immediately stale placeholder
+            now = self._clock()
+            return CacheEntry.build(
+                TrendsResponse(items=[], last_updated=datetime.utcnow()),
+                fetched_at=now,
+                fresh_until=now,
+            )
+        return self._entry
+
+    async def _refresh(self, loader: TrendsLoader) -> None:
+        """Wait for a refresh, joining the in-flight one if there is one."""
+        task = self._join_or_start_refresh(loader)
+        # asyncio.wait (unlike awaiting the task) never cancels it, so a
+        # cancelled caller (e.g. client disconnect) does not abort the refresh
+        # other callers are waiting on
+        await asyncio.wait({task})
+        self._refresh_result(task)
+
+    def _join_or_start_refresh(self, loader: TrendsLoader) -> asyncio.Task:
+        """Return the in-flight refresh task, starting one if none is running."""
+        task = self._inflight
+        if task is not None and not task.done():
+            self.coalesced_waiters += 1
+            return task
+        return self._start_refresh(loader)
+
+    @staticmethod
+    def _refresh_result(task: asyncio.Task) -> bool:
+        """Result of a finished refresh task, re-raising its failure."""
+        if task.cancelled():
+            raise asyncio.TimeoutError("Trends refresh was cancelled")
+        return task.result()
+
+    def _start_refresh(self, loader: TrendsLoader, detached: bool = False) -> asyncio.Task:
+        """
+        Start the shared refresh task.
+
+        Args:
+            detached: Run it in a fresh context, so a refresh that outlives the
+                request that triggered it is traced on its own rather than
+                inside that request's trace
+        """
+        self.refreshes += 1
+        context = contextvars.Context() if detached else None
+        task = asyncio.create_task(self._run_refresh(loader), context=context)
+        task.add_done_callback(self._log_refresh_failure)
+        self._inflight = task
+        return task
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task) -> None:
+        """Log refresh failures (also marks the exception as retrieved)."""
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error(f"Trends refresh failed: {error}", exc_info=error)
+
+    async def _run_refresh(self, loader: TrendsLoader) -> bool:
+        """
+        Refresh the snapshot. Returns True if the snapshot was replaced.
+
+        With a shared store the refresh is coordinated with the other workers;
+        if the store fails, this worker falls back to refreshing on its own.
+        """
+        if self.shared:
+            try:
+                return await self._run_shared_refresh(loader)
+            except sqlite3.Error as e:
+                logger.error(f"Shared trends cache unavailable, refreshing locally: {e}")
+        return await self._run_loader(loader)
+
+    async def _run_shared_refresh(self, loader: TrendsLoader) -> bool:
+        """
+        Refresh under the shared store's lease, or adopt another worker's snapshot.
+
+        A fresh snapshot published by another worker is adopted as-is. Otherwise
+        the worker holding the lease runs the loader while the others poll
+        for its snapshot; if the holder dies its lease expires and the next
+        waiter takes over.
+        """
+        waited = False
+        while True:
+            if self.sync_shared() and self._clock() < self._entry.fresh_until:
+                return True
+            if self._store.acquire_lease(self.lease_owner):
+                break
+            if not waited:
+                waited = True
+                self.lease_waits += 1
+                SHARED_SNAPSHOT_EVENTS.inc("lease_wait")
+            await asyncio.sleep(LEASE_POLL_SECONDS)
+
+        try:
+            # Another worker may have published between the check and the lease
+            if self.sync_shared() and self._clock() < self._entry.fresh_until:
+                return True
+            return await self._run_loader(loader)
+        finally:
+            self._store.release_lease(self.lease_owner)
+
+    async def _run_loader(self, loader: TrendsLoader) -> bool:
+        """
+        Run the loader and store its result. Returns True if the snapshot was replaced.
+
+        An empty result never replaces an existing snapshot; the previous
+        snapshot is kept and the next refresh attempt is deferred by
+        `retry_seconds` so a failing upstream is not hit on every request.
+        """
+        started = self._clock()
+        response = await loader()
+        now = self._clock()
+        REFRESH_ITEMS.observe(len(response.items))
+
+        previous = self._entry
+        if not response.items and previous is not None and previous.response.items:
+            logger.warning("Trends refresh returned no items, keeping previous snapshot")
+            previous.fresh_until = now + self.retry_seconds
+            return False
+
+        fresh_for = self.ttl_seconds if response.items else self.retry_seconds
+        entry = CacheEntry.build(response, fetched_at=now, fresh_until=now + fresh_for)
+
+        if previous is not None and previous.content_digest == entry.content_digest:
+            # Nothing changed: keep the previous response (and its last_updated
+            # / ETag) so conditional requests keep revalidating
+            logger.info("Trends refresh returned unchanged content")
+            previous.fetched_at = now
+            previous.fresh_until = now + fresh_for
+            if self.shared:
+                # Republish so workers waiting on the lease adopt it instead
+                # of refreshing again
+                self._persist(previous)
+            return True
+
+        self._entry = entry
+        logger.info(
+            f"Trends snapshot refreshed with {len(response.items)} items "
+            f"in {now - started:.2f}s"
+        )
+        self._persist(entry)
+        return True
+
+    def _persist(self, entry: CacheEntry) -> None:
+        """Write `entry` to the snapshot store; failures are logged, never raised."""
+        if self._store is None or not entry.response.items:
+            return
+        try:
+            # A few KB written once per snapshot change; cheap enough inline
+            version = self._store.save(entry.body)
+        except (OSError, sqlite3.Error) as e:
+            self.persist_failures += 1
+            logger.error(f"Failed to persist trends snapshot: {e}")
+            return
+        if self.shared:
+            self._shared_version = version
+            SHARED_SNAPSHOT_EVENTS.inc("published")
@@ -0,0 +1,185 @@
+"""
+Trends Index
+
+In-memory indexes over a trends snapshot for filtered, paginated reads
+(`/api/trends?category=&source=&since=&limit=&cursor=`). Built once per
+snapshot so queries never scan the full item list:
+
+- Every posting list (all items, per category, per source) is sorted newest
+  first (undated items last, then by URL), with a parallel list of sort keys.
+- `since` is a bisect on the sort keys, so it cuts a posting list to a prefix.
+- Cursors are keyset cursors (the sort key of the last item returned), which
+  stay valid across snapshot refreshes.
+- Each item is serialized once; a page is assembled by joining its bytes.
+"""
+import base64
+import bisect
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from backend.models.trends import TrendItem, TrendsResponse
+from backend.services.serialization import dumps_model
+
+# Sort key for items without a publication date (sorted after all dated items)
+_UNDATED = float("inf")
+
+SortKey = tuple[float, str]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[float]:
+    """POSIX timestamp, treating naive datetimes as UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _sort_key(item: TrendItem) -> SortKey:
+    """Newest first (negated timestamp), undated last, ties broken by URL."""
+    ts = _timestamp(item.published_at)
+    return (-ts if ts is not None else _UNDATED, item.url)
+
+
+def encode_cursor(key: SortKey) -> str:
+    """Opaque, URL-safe cursor for the item with sort key `key`."""
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    """Decode a cursor produced by `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        neg_ts, url = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return (float(neg_ts), str(url))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}") from e
+
+
+@dataclass
+class _Posting:
+    """Item positions in sort order with their sort keys (for bisect)."""
+    positions: list[int]
+    keys: list[SortKey]
+
+
+@dataclass
+class TrendsPage:
+    """Result of a filtered query."""
+    body: bytes
+    count: int
+    next_cursor: Optional[str]
+
+
+class TrendsIndex:
+    """Per-snapshot indexes for filtered, paginated trends queries."""
+
+    def __init__(self, response: TrendsResponse):
+        """Build indexes and per-item JSON for `response`."""
+        self.response = response
+        items = response.items
+        self._keys = [_sort_key(item) for item in items]
+        self._item_bytes = [dumps_model(item) for item in items]
+        self._last_updated = json.dumps(response.last_updated.isoformat()).encode("utf-8")
+
+        order = sorted(range(len(items)), key=self._keys.__getitem__)
+        self._all = self._posting(order)
+
+        by_category: dict[str, list[int]] = {}
+        by_source: dict[str, list[int]] = {}
+        for position in order:
+            item = items[position]
+            by_category.setdefault(item.category, []).append(position)
+            by_source.setdefault(item.source, []).append(position)
+
+        self._by_category = {k: self._posting(v) for k, v in by_category.items()}
+        self._by_source = {k: self._posting(v) for k, v in by_source.items()}
+        self._source_sets = {k: set(v) for k, v in by_source.items()}
+        self._category_sets = {k: set(v) for k, v in by_category.items()}
+
+    def _posting(self, positions: list[int]) -> _Posting:
+        return _Posting(positions=positions, keys=[self._keys[p] for p in positions])
+
+    def query(
+        self,
+        category: Optional[str] = None,
+        source: Optional[str] = None,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> TrendsPage:
+        """
+        Return the matching items, newest first, as a serialized page.
+
+        Args:
+            category: Only items in this category
+            source: Only items from this source domain
+            since: Only items published at or after this time (undated items excluded)
+            limit: Maximum number of items in the page
+            cursor: `next_cursor` from the previous page
+
+        Raises:
+            InvalidCursorError: If `cursor` is malformed
+        """
+        empty = _Posting(positions=[], keys=[])
+
+        # Drive from the smallest posting list; check the other filter by set membership
+        if category is not None and source is not None:
+            by_category = self._by_category.get(category, empty)
+            by_source = self._by_source.get(source, empty)
+            if len(by_category.positions) <= len(by_source.positions):
+                posting, member_of = by_category, self._source_sets.get(source, set())
+            else:
+                posting, member_of = by_source, self._category_sets.get(category, set())
+        elif category is not None:
+            posting, member_of = self._by_category.get(category, empty), None
+        elif source is not None:
+            posting, member_of = self._by_source.get(source, empty), None
+        else:
+            posting, member_of = self._all, None
+
+        start = 0
+        if cursor:
+            start = bisect.bisect_right(posting.keys, decode_cursor(cursor))
+
+        end = len(posting.keys)
+        if since is not None:
+            # Keys with -ts <= -since, i.e. published at or after `since`
+            end = bisect.bisect_right(posting.keys, (-_timestamp(since), "\U0010ffff"))
+
+        selected: list[int] = []
+        has_more = False
+        for i in range(start, end):
+            position = posting.positions[i]
+            if member_of is not None and position not in member_of:
+                continue
+            if limit is not None and len(selected) >= limit:
+                has_more = True
+                break
+            selected.append(position)
+
+        next_cursor = encode_cursor(self._keys[selected[-1]]) if has_more else None
+        return TrendsPage(
+            body=self._page_body(selected, next_cursor),
+            count=len(selected),
+            next_cursor=next_cursor,
+        )
+
+    def _page_body(self, positions: list[int], next_cursor: Optional[str]) -> bytes:
+        """Assemble a TrendsResponse-shaped JSON body from pre-serialized items."""
+        return b"".join([
+            b'{"items":[',
+            b",".join(self._item_bytes[p] for p in positions),
+            b'],"last_updated":',
+            self._last_updated,
+            b',"next_cursor":',
+            json.dumps(next_cursor).encode("utf-8"),
+            b"}",
+        ])
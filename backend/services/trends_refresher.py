@@ -0,0 +1,168 @@
+"""
+Trends Refresher
+
+Background task that keeps the trends snapshot warm so the /api/trends
+request path never waits on SerpAPI or OpenAI. It refreshes once at startup
+(or, when a fresh snapshot was restored from disk, once that goes stale)
+and then on a jittered interval (so multiple instances do not refresh in
+lockstep). Each refresh has a deadline; on failure or timeout the last good
+snapshot is kept and the next attempt comes sooner.
+
+Configuration (see Config):
+- TRENDS_REFRESH_ENABLED: Run the background refresher (default: true)
+- TRENDS_REFRESH_INTERVAL_SECONDS: Time between successful refreshes
+- TRENDS_REFRESH_JITTER_SECONDS: Random +/- spread applied to the interval
+- TRENDS_REFRESH_DEADLINE_SECONDS: Time budget for a single refresh
+- TRENDS_CACHE_RETRY_SECONDS: Delay before retrying a failed refresh
+"""
+import asyncio
+import contextvars
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Optional
+
+from backend.core.config import Config
+from backend.services.trends_cache import TrendsCache, TrendsLoader
+
+logger = logging.getLogger(__name__)
+
+
+class TrendsRefresher:
+    """Periodically refreshes a TrendsCache in the background."""
+
+    def __init__(
+        self,
+        cache: TrendsCache,
+        loader: TrendsLoader,
+        interval_seconds: Optional[float] = None,
+        jitter_seconds: Optional[float] = None,
+        deadline_seconds: Optional[float] = None,
+        retry_seconds: Optional[float] = None,
+    ):
+        """Initialize the refresher, defaulting timings from Config."""
+        self.cache = cache
+        self.loader = loader
+        self.interval_seconds = Config.TRENDS_REFRESH_INTERVAL_SECONDS if interval_seconds is None else interval_seconds
+        self.jitter_seconds = Config.TRENDS_REFRESH_JITTER_SECONDS if jitter_seconds is None else jitter_seconds
+        self.deadline_seconds = Config.TRENDS_REFRESH_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+        self.retry_seconds = Config.TRENDS_CACHE_RETRY_SECONDS if retry_seconds is None else retry_seconds
+        self._task: Optional[asyncio.Task] = None
+        # Set once the first refresh has finished (whatever its outcome)
+        self.warmed = asyncio.Event()
+
+        # Outcome of the most recent refreshes, reported by /api/trends/health
+        self.runs = 0
+        self.consecutive_failures = 0
+        self.last_outcome: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.last_duration_seconds: Optional[float] = None
+        self.last_started_at: Optional[datetime] = None
+        self.last_success_at: Optional[datetime] = None
+
+    def start(self, after: Optional["TrendsRefresher"] = None) -> None:
+        """
+        Start the background loop; the first refresh runs immediately.
+
+        Args:
+            after: Refresher whose first refresh must finish before this one's
+                starts (e.g. so a second region reuses the first region's
+                fresh highlights instead of enriching the same stories in parallel)
+        """
+        if self._task is not None and not self._task.done():
+            return
+
+        self.cache.refresh_on_read = False
+        # Fresh context: each refresh is its own trace, whoever started the refresher
+        self._task = asyncio.create_task(self._run(after), context=contextvars.Context())
+        logger.info(
+            f"Trends refresher started (interval {self.interval_seconds}s "
+            f"+/- {self.jitter_seconds}s, deadline {self.deadline_seconds}s)"
+        )
+
+    async def stop(self) -> None:
+        """Stop the background loop and hand refreshes back to readers."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.cache.cancel_refresh()
+        self.cache.refresh_on_read = True
+
+    async def refresh_once(self) -> bool:
+        """
+        Run one refresh within the deadline and record its outcome.
+
+        Returns:
+            True if the snapshot was replaced; False on timeout, error, or an
+            empty result that left the previous snapshot in place
+        """
+        self.runs += 1
+        self.last_started_at = datetime.utcnow()
+        started = time.monotonic()
+
+        try:
+            replaced = await self.cache.refresh(self.loader, timeout=self.deadline_seconds)
+            self.last_outcome = "success" if replaced else "empty"
+            self.last_error = None
+        except asyncio.TimeoutError:
+            self.last_outcome = "timeout"
+            self.last_error = f"Refresh exceeded {self.deadline_seconds}s deadline"
+        except Exception as e:
+            self.last_outcome = "error"
+            self.last_error = str(e)
+
+        self.last_duration_seconds = round(time.monotonic() - started, 3)
+
+        if self.last_outcome == "success":
+            self.consecutive_failures = 0
+            self.last_success_at = datetime.utcnow()
+            return True
+
+        self.consecutive_failures += 1
+        logger.warning(
+            f"Trends refresh {self.last_outcome} after {self.last_duration_seconds}s "
+            f"({self.consecutive_failures} consecutive), keeping last snapshot"
+            + (f": {self.last_error}" if self.last_error else "")
+        )
+        return False
+
+    def next_delay(self, succeeded: bool) -> float:
+        """Seconds to wait before the next refresh."""
+        if not succeeded:
+            return self.retry_seconds
+        jitter = random.uniform(-self.jitter_seconds, self.jitter_seconds)
+        return max(1.0, self.interval_seconds + jitter)
+
+    def stats(self) -> dict:
+        """Refresher state for health reporting."""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "runs": self.runs,
+            "last_outcome": self.last_outcome,
+            "last_error": self.last_error,
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_success_at": self.last_success_at.isoformat() if self.last_success_at else None,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+    async def _run(self, after: Optional["TrendsRefresher"] = None) -> None:
+        """Refresh forever until cancelled."""
+        if after is not None:
+            await after.warmed.wait()
+        entry = self.cache.entry
+        if entry is not None:
+            delay = self.cache.seconds_until_stale(entry)
+            if delay > 0:
+                logger.info(f"Trends snapshot is fresh, first refresh in {delay:.0f}s")
+                self.warmed.set()
+                await asyncio.sleep(delay)
+        while True:
+            succeeded = await self.refresh_once()
+            self.warmed.set()
+            await asyncio.sleep(self.next_delay(succeeded))
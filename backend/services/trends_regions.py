@@ -0,0 +1,206 @@
+"""
+Trends Regions
+
+Per-region wiring for `/api/trends?region=...`. Each region served
+(Config.trends_regions()) gets its own snapshot cache, snapshot file,
+background refresher and, in two-phase mode, enrichment worker, all backed
+by the one application-wide TrendsService.
+
+SerpAPI results and the incremental-refresh baseline are kept per region;
+the highlight cache, OpenAI client, circuit breakers and batcher are shared.
+An article that ranks in several regions is therefore summarized once, and
+adding a region costs SerpAPI calls only.
+
+With TRENDS_SHARED_CACHE_PATH set, each region's snapshot lives in the
+SQLite store shared by all uvicorn workers (instead of the per-process
+snapshot file), and the workers take turns refreshing it under a lease.
+Each adopted snapshot becomes the worker's incremental-refresh baseline,
+and the lease holder starts from the per-query results the workers share,
+so a query is only refetched once its TTL has passed for all of them.
+
+Configuration (see Config):
+- TRENDS_REGION: Default region (served when `region` is omitted)
+- TRENDS_REGIONS: Additional regions, comma-separated
+- TRENDS_SHARED_CACHE_PATH: Shared snapshot store for multiple workers
+"""
+import logging
+import sqlite3
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional, Union
+
+from backend.core.config import Config
+from backend.models.trends import TrendsResponse
+from backend.services.enrichment_queue import EnrichmentWorker
+from backend.services.query_registry import refresh_interval
+from backend.services.shared_snapshot import SharedSnapshotStore
+from backend.services.snapshot_store import SnapshotStore, snapshot_age
+from backend.services.trends_cache import TrendsCache, TrendsLoader
+from backend.services.trends_refresher import TrendsRefresher
+from backend.services.trends_service import TrendsService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TrendsRegion:
+    """Snapshot cache and background tasks for one region."""
+    name: str
+    service: TrendsService
+    cache: TrendsCache
+    store: Optional[Union[SnapshotStore, SharedSnapshotStore]] = None
+    refresher: Optional[TrendsRefresher] = None
+    worker: Optional[EnrichmentWorker] = None
+
+    @classmethod
+    def create(cls, service: TrendsService, name: str) -> "TrendsRegion":
+        """
+        Create a region's cache and restore its persisted snapshot.
+
+        The cache is refreshed at least as often as the fastest query's TTL.
+        """
+        store = SharedSnapshotStore.from_config(name) or SnapshotStore.from_config(name)
+        cache = TrendsCache(
+            ttl_seconds=refresh_interval(service.queries, Config.TRENDS_CACHE_TTL_SECONDS),
+            store=store
+        )
+        region = cls(name=name, service=service, cache=cache, store=store)
+        cache.on_adopt = region._adopt
+        region.restore()
+        return region
+
+    @property
+    def loader(self) -> TrendsLoader:
+        """Snapshot loader for this region's cache."""
+        if self.worker is not None:
+            return self.coordinate(self.worker.load_trends)
+        return self.coordinate(partial(self.service.get_trends, region=self.name))
+
+    def coordinate(self, loader: TrendsLoader) -> TrendsLoader:
+        """
+        Adapt a loader for this region's cache.
+
+        With a shared store, the loader starts from the per-query results
+        all workers share and publishes its own afterwards.
+        """
+        if self.cache.shared:
+            return partial(self._load_shared, loader)
+        return loader
+
+    def _adopt(self, response: TrendsResponse) -> None:
+        """Make a snapshot adopted from the shared store the incremental-refresh baseline."""
+        self.service.remember_snapshot(response.items, self.name)
+
+    async def _load_shared(self, loader: TrendsLoader) -> TrendsResponse:
+        """
+        Run `loader` from the per-query results all workers share, then publish ours.
+
+        Only the lease holder runs this, so queries another worker fetched
+        within their TTL are reused rather than fetched again, and results
+        older than the shared ones never replace them.
+        """
+        try:
+            self.service.import_query_results(self.store.load_query_results(), self.name)
+        except sqlite3.Error as e:
+            logger.error(f"Could not read shared query results for {self.name}: {e}")
+
+        response = await loader()
+
+        try:
+            self.store.save_query_results(self.service.export_query_results(self.name))
+        except sqlite3.Error as e:
+            logger.error(f"Could not publish shared query results for {self.name}: {e}")
+        return response
+
+    def restore(self) -> bool:
+        """Seed the cache (and the service's incremental baseline) from the persisted snapshot."""
+        if self.store is None:
+            return False
+
+        if self.cache.shared:
+            # Adopting records the shared version, so it is not re-read later,
+            # and makes it the baseline (see _adopt)
+            if not self.cache.sync_shared():
+                return False
+            self.cache.restored = True
+            response = self.cache.entry.response
+        else:
+            loaded = self.store.load()
+            if loaded is None:
+                return False
+            response, saved_at = loaded
+            if not self.cache.restore(response, snapshot_age(saved_at)):
+                return False
+            self.service.remember_snapshot(response.items, self.name)
+
+        logger.info(
+            f"Restored {self.name} trends snapshot with {len(response.items)} items "
+            f"({self.cache.stats()['snapshot_age_seconds']:.0f}s old)"
+        )
+        return True
+
+    def start(self, after: Optional[TrendsRefresher] = None) -> None:
+        """
+        Start the region's enrichment worker (two-phase mode) and refresher.
+
+        Args:
+            after: Refresher whose first refresh this region's waits for
+        """
+        # Two-phase mode: snapshots are published before enrichment and the
+        # worker fills in highlights afterwards
+        if Config.TRENDS_TWO_PHASE:
+            self.worker = EnrichmentWorker(self.service, self.cache, region=self.name)
+            self.worker.start()
+            if self.cache.entry is not None:
+                # Finish enriching a snapshot persisted before its highlights were in
+                self.worker.enqueue(self.cache.entry.response.items)
+
+        # Warm the snapshot in the background so startup (and health checks)
+        # do not wait on SerpAPI/OpenAI
+        if Config.TRENDS_REFRESH_ENABLED:
+            self.refresher = TrendsRefresher(
+                self.cache,
+                self.loader,
+                interval_seconds=refresh_interval(
+                    self.service.queries,
+                    Config.TRENDS_REFRESH_INTERVAL_SECONDS
+                )
+            )
+            self.refresher.start(after=after)
+
+    async def stop(self) -> None:
+        """Stop the refresher and worker, then close the snapshot store."""
+        if self.refresher is not None:
+            await self.refresher.stop()
+        if self.worker is not None:
+            await self.worker.stop()
+        if self.store is not None:
+            self.store.close()
+
+    def stats(self) -> dict:
+        """Region state for health reporting."""
+        return {
+            "cache": self.cache.stats(),
+            "refresher": self.refresher.stats() if self.refresher else None,
+            "enrichment": self.worker.stats() if self.worker else None,
+            "queries": self.service.query_stats(self.name),
+        }
+
+
+def create_regions(service: TrendsService) -> dict[str, TrendsRegion]:
+    """
+    Create and start every configured region, default region first.
+
+    The other regions' first refreshes wait for the default region's, so
+    stories they share with it reuse its highlights instead of being
+    enriched concurrently at startup.
+    """
+    regions: dict[str, TrendsRegion] = {}
+    default: Optional[TrendsRefresher] = None
+    for name in Config.trends_regions():
+        region = TrendsRegion.create(service, name)
+        region.start(after=default)
+        if not regions:
+            default = region.refresher
+        regions[name] = region
+    return regions
@@ -12,64 +12,298 @@ Required Environment Variables:
 - SERPAPI_KEY: SerpAPI key (same as job scraper)
 - OPENAI_API_KEY: OpenAI API key
 - TRENDS_REGION: Region for search results (default: "us")
+- TRENDS_QUERY_REGISTRY: Search queries with per-query TTL, result count and
+  priority (default: TREND_QUERIES, see backend.services.query_registry)
+
+A single TrendsService is created per application (see backend.main lifespan)
+and owns keep-alive HTTP connection pools for SerpAPI and OpenAI, so TLS
+handshakes are paid once per connection rather than once per request.
+
+The OpenAI SDK is imported (and its client created) on first use rather than
+at import time, since it dominates import cost; see backend.core.startup.
 """
 import asyncio
+import json
 import logging
-from datetime import datetime
-from typing import Optional
+import random
+import re
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional
 from urllib.parse import urlparse
 
-from serpapi import GoogleSearch
-from openai import OpenAI
+import httpx
 
 from backend.core.config import Config
+from backend.core.metrics import (
+    ENRICHMENT_TIERS,
+    HIGHLIGHT_CACHE_LOOKUPS,
+    QUERY_FETCHES,
+    REFRESH_DIFF_ITEMS,
+    STAGE_DURATION,
+    UPSTREAM_CALLS,
+    UPSTREAM_ERRORS,
+)
 from backend.models.trends import TrendItem, TrendsResponse
+from backend.services.dedup import canonicalize_url, collapse_duplicates, strip_tracking_params
+from backend.services.enrichment_batcher import TokenBudgetBatcher
+from backend.services.highlight_cache import HighlightCache
+from backend.services.query_registry import TrendQuery, load_query_registry
+from backend.core.startup import STARTUP_PROFILE
+from backend.core.tracing import TRACER
+from backend.services.resilience import CircuitBreaker, CircuitOpenError, Deadline
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
 logger = logging.getLogger(__name__)
 
-# Predefined search queries for tech trends (similar to job scraper pattern)
-TREND_QUERIES = [
-    {
-        "query": "latest technology trends startups 2025",
-        "category": "startups",
-        "num_results": 10
-    },
-    {
-        "query": "software engineering emerging trends",
-        "category": "software_engineering",
-        "num_results": 10
-    },
-    {
-        "query": "AI startup news artificial intelligence",
-        "category": "ai",
-        "num_results": 10
-    },
-    {
-        "query": "engineering firm technology innovations",
-        "category": "engineering",
-        "num_results": 10
+# SerpAPI JSON endpoint (what serpapi.GoogleSearch calls under the hood)
+SERPAPI_SEARCH_URL = "https://serpapi.com/search"
+
+# Part of the highlight cache key; bump whenever the highlight prompts change
+HIGHLIGHT_PROMPT_VERSION = "3"
+
+BATCH_SYSTEM_PROMPT = """You are a concise tech analyst for a professional networking platform called Vetted. 
+Summarize each article into one short highlight (max 40 words) for a feed of tech trends. 
+Mention "AI", "startups", or "software" only if relevant. Avoid fluff.
+Return one entry per article with its highlight and the article's id: the number after "Article id:", e.g. "1"."""
+
+# The number in an article id as answered by the model ("1", "Article 1", "id: 1")
+_BATCH_ID_NUMBER = re.compile(r"(\d+)\s*$")
+
+# Structured output for batch enrichment: one {id, highlight} entry per article
+HIGHLIGHT_BATCH_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "trend_highlights",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "highlights": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string"},
+                            "highlight": {"type": "string"}
+                        },
+                        "required": ["id", "highlight"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["highlights"],
+            "additionalProperties": False
+        }
     }
-]
+}
+
+
+def _pool_limits() -> httpx.Limits:
+    """Connection pool limits shared by all upstream clients."""
+    return httpx.Limits(
+        max_connections=Config.UPSTREAM_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=Config.UPSTREAM_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=Config.UPSTREAM_POOL_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def _build_async_http_client() -> httpx.AsyncClient:
+    """Create a keep-alive async HTTP client using the configured pool limits."""
+    return httpx.AsyncClient(
+        limits=_pool_limits(),
+        timeout=httpx.Timeout(Config.UPSTREAM_TIMEOUT_SECONDS),
+    )
+
+
+def _retry_after_seconds(response: Optional[httpx.Response]) -> Optional[float]:
+    """Extract the server's retry hint (retry-after-ms / retry-after) in seconds."""
+    if response is None:
+        return None
+    
+    headers = response.headers
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+    
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    
+    # HTTP-date form
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _published_timestamp(item: TrendItem) -> float:
+    """Sortable publication time; undated items sort as oldest."""
+    published_at = item.published_at
+    if published_at is None:
+        return float("-inf")
+    if published_at.tzinfo is None:
+        published_at = published_at.replace(tzinfo=timezone.utc)
+    return published_at.timestamp()
 
 
 class TrendsService:
     """Service for fetching and enriching tech trends using SerpAPI."""
     
-    def __init__(self):
-        """Initialize the trends service."""
+    def __init__(
+        self,
+        serpapi_http: Optional[httpx.AsyncClient] = None,
+        openai_client: Optional["AsyncOpenAI"] = None,
+        highlight_cache: Optional[HighlightCache] = None,
+        queries: Optional[list[TrendQuery]] = None,
+    ):
+        """
+        Initialize the trends service.
+        
+        Args:
+            serpapi_http: Pooled async HTTP client for SerpAPI (created if not provided)
+            openai_client: Async OpenAI client (created on first use if not provided and configured)
+            highlight_cache: Persistent highlight cache (owned by the caller)
+            queries: Trend query registry (loaded from TRENDS_QUERY_REGISTRY if not provided)
+        """
         self.serpapi_key = Config.SERPAPI_KEY
         self.region = Config.TRENDS_REGION
-        self.openai_client = None
+        self.highlight_cache = highlight_cache
+        self.queries = load_query_registry() if queries is None else queries
+        
+        # Last successful results per query:
+        # (region, query) -> (monotonic fetch time, raw results)
+        self._query_results: dict[tuple[str, str], tuple[float, list[dict]]] = {}
+        
+        # Clients passed in are owned by the caller; only close what we create
+        self._owned_clients = []
+        
+        if serpapi_http is None:
+            serpapi_http = _build_async_http_client()
+            self._owned_clients.append(serpapi_http)
+        self.serpapi_http = serpapi_http
+        
+        # Created on first use (see openai_client) so the SDK import does not
+        # delay startup; an explicit client (or None) is used as given
+        self._openai_client = openai_client
+        self._openai_client_resolved = openai_client is not None
+        
+        # Bounds concurrent OpenAI calls across all refreshes using this service
+        self._openai_semaphore = asyncio.Semaphore(max(1, Config.OPENAI_MAX_CONCURRENCY))
+        # Monotonic time before which no OpenAI call is issued (set by 429 responses)
+        self._openai_backoff_until = 0.0
         
-        if Config.is_openai_configured():
-            self.openai_client = OpenAI(api_key=Config.OPENAI_API_KEY)
+        # Fail fast while an upstream keeps failing
+        self.serpapi_breaker = CircuitBreaker("serpapi")
+        self.openai_breaker = CircuitBreaker("openai")
+        
+        # How often each enrichment path ran: "batch" and "single" calls,
+        # "missing_retry" calls for ids a batch response left out, "error"
+        # for calls that raised, and "unresolved" items left without a highlight
+        self.enrichment_tiers: Counter = Counter()
+        
+        # Items of each region's last snapshot by canonical URL, for
+        # incremental refreshes: region -> canonical URL -> item
+        self._previous_items: dict[str, dict[str, TrendItem]] = {}
+        
+        # Packs enrichment calls by estimated tokens rather than item count
+        self.batcher = TokenBudgetBatcher(system_prompt=BATCH_SYSTEM_PROMPT)
+    
+    @property
+    def openai_client(self) -> Optional["AsyncOpenAI"]:
+        """OpenAI client, created (importing the SDK) on first access if configured."""
+        if not self._openai_client_resolved:
+            self._openai_client_resolved = True
+            if Config.is_openai_configured():
+                openai = STARTUP_PROFILE.import_module("openai")
+                # Retries are handled by _chat_completion so that 429s honour retry-after
+                self._openai_client = openai.AsyncOpenAI(
+                    api_key=Config.OPENAI_API_KEY,
+                    http_client=_build_async_http_client(),
+                    max_retries=0
+                )
+                self._owned_clients.append(self._openai_client)
+        return self._openai_client
+    
+    @openai_client.setter
+    def openai_client(self, client: Optional["AsyncOpenAI"]) -> None:
+        self._openai_client = client
+        self._openai_client_resolved = True
     
-    def fetch_raw_trends(self) -> list[dict]:
+    @property
+    def openai_available(self) -> bool:
+        """Whether enrichment can run, without creating the client."""
+        if self._openai_client_resolved:
+            return self._openai_client is not None
+        return Config.is_openai_configured()
+    
+    async def _load_openai_client(self) -> Optional["AsyncOpenAI"]:
+        """Return the OpenAI client, importing the SDK off the event loop on first use."""
+        if not self._openai_client_resolved and Config.is_openai_configured():
+            await STARTUP_PROFILE.import_module_async("openai")
+        return self.openai_client
+    
+    async def aclose(self) -> None:
+        """Close the HTTP connection pools owned by this service."""
+        for client in self._owned_clients:
+            try:
+                if isinstance(client, httpx.AsyncClient):
+                    await client.aclose()
+                else:
+                    await client.close()
+            except Exception as e:
+                logger.warning(f"Error closing upstream client: {e}")
+        self._owned_clients = []
+    
+    async def _serpapi_search(self, params: dict) -> dict:
+        """Run a SerpAPI search over the pooled HTTP client."""
+        response = await self.serpapi_http.get(
+            SERPAPI_SEARCH_URL,
+            params={**params, "output": "json", "source": "python"}
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    @TRACER.traced("fetch_raw_trends")
+    async def fetch_raw_trends(
+        self,
+        deadline: Optional[Deadline] = None,
+        region: Optional[str] = None
+    ) -> list[dict]:
         """
         Fetch raw trend data from SerpAPI (same pattern as job scraper).
         
+        Each registry query keeps its last results for its own TTL (see
+        backend.services.query_registry); only queries that are due are
+        requested, and the others reuse their previous results. Results older
+        than TRENDS_QUERY_MAX_AGE_SECONDS are dropped first. Due queries
+        are issued concurrently in priority order, bounded by
+        SERPAPI_MAX_CONCURRENCY, and each is limited to
+        SERPAPI_QUERY_TIMEOUT_SECONDS (or what is left of `deadline`). A slow
+        or failing query falls back to its previous results (or drops its
+        category if it has none); while the SerpAPI circuit is open, queries
+        are skipped without a request.
+        
+        Args:
+            deadline: Pipeline time budget
+            region: SerpAPI country code (defaults to TRENDS_REGION)
+        
         Returns:
-            List of raw search result dictionaries
+            List of raw search result dictionaries, in registry order
         """
         if not Config.is_serpapi_configured():
             logger.warning("SerpAPI not configured, returning empty results")
@@ -79,59 +313,185 @@ class TrendsService:
             logger.warning("SERPAPI_KEY not set, returning empty results")
             return []
         
+        region = region or self.region
+        now = time.monotonic()
+        self._drop_expired_results(now)
+        due = []
+        for query in self.queries:
+            previous = self._query_results.get((region, query.query))
+            if query.is_due(None if previous is None else now - previous[0]):
+                due.append(query)
+            else:
+                QUERY_FETCHES.inc(query.category, "reused")
+        
+        TRACER.set_attribute("region", region)
+        TRACER.set_attribute("queries_due", len(due))
+        
+        # Stable sort: equal priorities keep registry order
+        due.sort(key=lambda query: -query.priority)
+        semaphore = asyncio.Semaphore(max(1, Config.SERPAPI_MAX_CONCURRENCY))
+        fetched = await asyncio.gather(*[
+            self._fetch_query(query, semaphore, deadline, region)
+            for query in due
+        ])
+        
+        fetched_at = time.monotonic()
+        for query, results in zip(due, fetched):
+            if results is None:
+                QUERY_FETCHES.inc(query.category, "failed")
+            else:
+                QUERY_FETCHES.inc(query.category, "fetched")
+                self._query_results[(region, query.query)] = (fetched_at, results)
+        
+        # Keep registry order regardless of priority and completion order
         all_results = []
+        for query in self.queries:
+            if (region, query.query) in self._query_results:
+                all_results.extend(self._query_results[(region, query.query)][1])
         
-        for query_config in TREND_QUERIES:
-            try:
-                query = query_config["query"]
-                category = query_config["category"]
-                num_results = query_config.get("num_results", 10)
+        return all_results
+    
+    def query_stats(self, region: Optional[str] = None) -> list[dict]:
+        """Per-query cadence and the age of its current results in `region`, for health reporting."""
+        region = region or self.region
+        now = time.monotonic()
+        self._drop_expired_results(now)
+        stats = []
+        for query in self.queries:
+            previous = self._query_results.get((region, query.query))
+            stats.append({
+                "category": query.category,
+                "query": query.query,
+                "ttl_seconds": query.ttl_seconds,
+                "num_results": query.num_results,
+                "priority": query.priority,
+                "age_seconds": round(now - previous[0], 1) if previous else None,
+                "results": len(previous[1]) if previous else 0,
+            })
+        return stats
+    
+    def _drop_expired_results(self, now: float) -> None:
+        """Forget retained query results older than TRENDS_QUERY_MAX_AGE_SECONDS."""
+        min_fetched_at = now - Config.TRENDS_QUERY_MAX_AGE_SECONDS
+        for key, (fetched_at, _) in list(self._query_results.items()):
+            if fetched_at < min_fetched_at:
+                del self._query_results[key]
+    
+    def export_query_results(self, region: Optional[str] = None) -> dict[str, tuple[float, list[dict]]]:
+        """`region`'s retained per-query results: query -> (wall-clock fetch time, raw results)."""
+        region = region or self.region
+        offset = time.time() - time.monotonic()
+        return {
+            query: (fetched_at + offset, results)
+            for (name, query), (fetched_at, results) in self._query_results.items()
+            if name == region
+        }
+    
+    def import_query_results(
+        self,
+        results: dict[str, tuple[float, list[dict]]],
+        region: Optional[str] = None
+    ) -> None:
+        """
+        Adopt per-query results fetched elsewhere (e.g. by another worker).
+        
+        Args:
+            results: query -> (wall-clock fetch time, raw results), as
+                returned by export_query_results; only entries newer than
+                this service's own are taken
+        """
+        region = region or self.region
+        offset = time.time() - time.monotonic()
+        for query, (fetched_at, items) in results.items():
+            fetched_at -= offset
+            current = self._query_results.get((region, query))
+            if current is None or current[0] < fetched_at:
+                self._query_results[(region, query)] = (fetched_at, items)
+    
+    async def _fetch_query(
+        self,
+        query_config: TrendQuery,
+        semaphore: asyncio.Semaphore,
+        deadline: Optional[Deadline] = None,
+        region: Optional[str] = None
+    ) -> Optional[list[dict]]:
+        """Fetch results for a single trend query. Returns None on failure; never raises."""
+        query = query_config.query
+        category = query_config.category
+        timeout = Config.SERPAPI_QUERY_TIMEOUT_SECONDS
+        
+        try:
+            # Same parameters as the job scraper's GoogleSearch call
+            params = {
+                "engine": "google",
+                "q": query,
+                "api_key": self.serpapi_key,
+                "num": min(query_config.num_results, 100),  # SerpAPI supports up to 100
+                "gl": region or self.region,  # Country code (e.g., "us")
+                "hl": "en",  # Language
+            }
+            
+            async with semaphore:
+                if deadline is not None:
+                    if deadline.expired:
+                        logger.warning(f"Skipping query '{query}': pipeline deadline reached")
+                        return None
+                    timeout = deadline.timeout(Config.SERPAPI_QUERY_TIMEOUT_SECONDS)
                 
+                self.serpapi_breaker.check()
                 logger.info(f"Fetching trends for query: {query}")
-                
-                # Use SerpAPI same way as job scraper
-                params = {
-                    "engine": "google",
-                    "q": query,
-                    "api_key": self.serpapi_key,
-                    "num": min(num_results, 100),  # SerpAPI supports up to 100
-                    "gl": self.region,  # Country code (e.g., "us")
-                    "hl": "en",  # Language
-                }
-                
-                search = GoogleSearch(params)
-                results = search.get_dict()
-                
-                items = results.get("organic_results", [])
-                
-                # Add category to each item
-                enriched_items = []
-                for item in items:
-                    enriched_items.append({
-                        **item,
-                        "category": category,
-                        "query": query
-                    })
-                
-                logger.info(f"Fetched {len(enriched_items)} results for '{query}'")
-                all_results.extend(enriched_items)
-                
-            except Exception as e:
-                logger.error(f"Error fetching query '{query_config.get('query', 'unknown')}': {e}")
-                continue
-        
-        return all_results
+                UPSTREAM_CALLS.inc("serpapi")
+                with TRACER.span("serpapi_query", category=category, region=params["gl"]):
+                    try:
+                        results = await asyncio.wait_for(
+                            self._serpapi_search(params),
+                            timeout=timeout
+                        )
+                    except Exception:
+                        self.serpapi_breaker.record_failure()
+                        raise
+                    self.serpapi_breaker.record_success()
+            
+            items = results.get("organic_results", [])
+            
+            # Add category to each item
+            enriched_items = [
+                {**item, "category": category, "query": query}
+                for item in items
+            ]
+            
+            logger.info(f"Fetched {len(enriched_items)} results for '{query}'")
+            return enriched_items
+            
+        except asyncio.TimeoutError:
+            UPSTREAM_ERRORS.inc("serpapi", "timeout")
+            logger.error(f"Timed out fetching query '{query}' after {timeout:.1f}s")
+            return None
+        except CircuitOpenError:
+            UPSTREAM_ERRORS.inc("serpapi", "circuit_open")
+            logger.warning(f"Skipping query '{query}': SerpAPI circuit is open")
+            return None
+        except httpx.HTTPStatusError as e:
+            # The error text holds the request URL, api_key included
+            UPSTREAM_ERRORS.inc("serpapi", "error")
+            logger.error(f"Error fetching query '{query}': SerpAPI returned HTTP {e.response.status_code}")
+            return None
+        except Exception as e:
+            UPSTREAM_ERRORS.inc("serpapi", "error")
+            logger.error(f"Error fetching query '{query}': {e}")
+            return None
     
+    @TRACER.traced("normalize_results")
     def _normalize_results(self, raw_items: list[dict]) -> list[TrendItem]:
         """
         Normalize raw SerpAPI results into TrendItem models.
-        Deduplicates by URL.
+        Deduplicates by canonical URL and collapses near-duplicate stories
+        (see backend.services.dedup) into `alternate_sources`.
         """
-        seen_urls = set()
         normalized_items = []
         
         for item in raw_items:
-            url = item.get("link", "")
+            url = strip_tracking_params(item.get("link", ""))
             title = item.get("title", "")
             snippet = item.get("snippet", "")
             category = item.get("category", "general")
@@ -154,11 +514,6 @@ class TrendsService:
             except Exception:
                 source = "unknown"
             
-            # Deduplicate by URL
-            if url in seen_urls:
-                continue
-            seen_urls.add(url)
-            
             # Skip if missing essential fields
             if not url or not title:
                 continue
@@ -175,14 +530,86 @@ class TrendsService:
             
             normalized_items.append(trend_item)
         
-        # Sort by published date (newest first), then by relevance
+        # Deduplicate in SerpAPI rank order, so the best-ranked copy survives
+        normalized_items = collapse_duplicates(normalized_items)
+        TRACER.set_attribute("raw_items", len(raw_items))
+        TRACER.set_attribute("items", len(normalized_items))
+        
+        # Sort by published date (newest first), then by relevance. Dates are
+        # compared as timestamps since SerpAPI mixes naive and offset-aware ones
         normalized_items.sort(
-            key=lambda x: (x.published_at or datetime.min, x.title),
+            key=lambda x: (_published_timestamp(x), x.title),
             reverse=True
         )
         
         return normalized_items
     
+    def remember_snapshot(self, items: list[TrendItem], region: Optional[str] = None) -> None:
+        """
+        Record `items` as `region`'s previous snapshot for the next incremental refresh.
+        
+        The items themselves are kept (not copies), so highlights filled in
+        later (e.g. by the two-phase EnrichmentWorker) are carried forward too.
+        """
+        if items:
+            self._previous_items[region or self.region] = {
+                canonicalize_url(item.url): item for item in items
+            }
+    
+    def carry_forward_highlights(
+        self,
+        items: list[TrendItem],
+        region: Optional[str] = None
+    ) -> tuple[list[TrendItem], list[TrendItem]]:
+        """
+        Diff `items` against `region`'s previous snapshot by canonical URL.
+        
+        Items whose title and excerpt are unchanged reuse their previous
+        highlight; new and changed items (and unchanged ones that never got a
+        highlight) need enrichment. Items that are new to this region but
+        appear unchanged in another region's snapshot reuse that highlight,
+        so a story ranking in several regions is summarized once.
+        
+        Returns:
+            (carried, to_enrich)
+        """
+        region = region or self.region
+        own = self._previous_items.get(region, {})
+        others = [previous for name, previous in self._previous_items.items() if name != region]
+        carried = []
+        to_enrich = []
+        new = changed = 0
+        for item in items:
+            key = canonicalize_url(item.url)
+            previous = own.get(key)
+            if previous is None:
+                new += 1
+                previous = next((other[key] for other in others if key in other), None)
+            elif previous.title != item.title or previous.raw_excerpt != item.raw_excerpt:
+                changed += 1
+            if (
+                previous is not None
+                and previous.title == item.title
+                and previous.raw_excerpt == item.raw_excerpt
+                and previous.highlight
+                and previous.enrichment_status == "done"
+            ):
+                item.highlight = previous.highlight
+                item.enrichment_status = "done"
+                carried.append(item)
+                continue
+            to_enrich.append(item)
+        
+        REFRESH_DIFF_ITEMS.inc("unchanged", amount=len(items) - new - changed)
+        REFRESH_DIFF_ITEMS.inc("changed", amount=changed)
+        REFRESH_DIFF_ITEMS.inc("new", amount=new)
+        if own:
+            logger.info(
+                f"Incremental refresh: {len(carried)} highlights carried forward, "
+                f"{new} new and {changed} changed items"
+            )
+        return carried, to_enrich
+    
     async def enrich_with_ai(self, items: list[TrendItem]) -> list[TrendItem]:
         """
         Enrich trend items with AI-generated highlights.
@@ -193,196 +620,442 @@ class TrendsService:
         Returns:
             List of TrendItem objects with highlights populated
         """
-        if not self.openai_client:
+        async for _ in self.iter_enrichment(items):
+            pass
+        
+        # Items are updated in place, so the input order is preserved
+        return items
+    
+    async def iter_enrichment(
+        self,
+        items: list[TrendItem],
+        deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[list[TrendItem]]:
+        """
+        Enrich trend items in place, yielding each group as its highlights are ready.
+        
+        Cached highlights are yielded first as one group, then each OpenAI
+        batch as soon as it completes (in completion order). When `deadline`
+        runs out, the remaining batches are abandoned and their items stay
+        "pending".
+        """
+        if not await self._load_openai_client():
             logger.warning("OpenAI not configured, skipping AI enrichment")
-            return items
+            for item in items:
+                item.enrichment_status = "skipped"
+            return
         
         if not items:
-            return items
-        
-        # Process items in batches to avoid rate limits
-        batch_size = 5
-        enriched_items = []
+            return
         
-        for i in range(0, len(items), batch_size):
-            batch = items[i:i + batch_size]
-            batch_results = await self._enrich_batch(batch)
-            enriched_items.extend(batch_results)
-            
-            # Small delay between batches to avoid rate limits
-            if i + batch_size < len(items):
-                await asyncio.sleep(0.5)
+        # Reuse cached highlights; only cache misses go to the model
+        hits, misses, cache_keys = self.apply_cached_highlights(items)
+        if hits:
+            yield hits
         
-        return enriched_items
+        # Batches are packed to the per-call token budget and run concurrently;
+        # the service-wide semaphore bounds how many OpenAI calls are in flight
+        # and 429 responses drive the back-off
+        tasks = [
+            asyncio.ensure_future(self._enrich_batch(batch.items, deadline))
+            for batch in self.batcher.plan(misses)
+        ]
+        try:
+            timeout = None if deadline is None else deadline.remaining()
+            for next_done in asyncio.as_completed(tasks, timeout=timeout):
+                batch = await next_done
+                for item in batch:
+                    if item.highlight:
+                        item.enrichment_status = "done"
+                if cache_keys:
+                    self._store_highlights({
+                        cache_keys[id(item)]: item.highlight
+                        for item in batch
+                        if item.highlight
+                    })
+                yield batch
+        except asyncio.TimeoutError:
+            logger.warning("Pipeline deadline reached during enrichment, keeping partial highlights")
+        finally:
+            # The consumer may stop early (e.g. a disconnected stream client)
+            for task in tasks:
+                task.cancel()
     
-    async def _enrich_batch(self, items: list[TrendItem]) -> list[TrendItem]:
-        """Enrich a batch of items with AI highlights."""
-        if not items:
-            return items
+    def apply_cached_highlights(
+        self,
+        items: list[TrendItem]
+    ) -> tuple[list[TrendItem], list[TrendItem], dict[int, str]]:
+        """
+        Fill in highlights available from the highlight cache.
         
-        try:
-            # For single item, use direct completion
-            if len(items) == 1:
-                item = items[0]
-                highlight = await self._generate_highlight(item)
+        Returns:
+            (hits, misses, cache keys by item id); keys are empty when no
+            cache is configured, in which case every item is a miss
+        """
+        if self.highlight_cache is None:
+            return [], list(items), {}
+        
+        cache_keys = {
+            id(item): HighlightCache.make_key(item, Config.OPENAI_MODEL, HIGHLIGHT_PROMPT_VERSION)
+            for item in items
+        }
+        cached = self._lookup_highlights(list(cache_keys.values()))
+        hits = []
+        misses = []
+        for item in items:
+            highlight = cached.get(cache_keys[id(item)])
+            if highlight:
                 item.highlight = highlight
-                return [item]
+                item.enrichment_status = "done"
+                hits.append(item)
+            else:
+                misses.append(item)
+        HIGHLIGHT_CACHE_LOOKUPS.inc("hit", amount=len(hits))
+        HIGHLIGHT_CACHE_LOOKUPS.inc("miss", amount=len(misses))
+        logger.info(f"Highlight cache: {len(hits)} hits, {len(misses)} misses")
+        return hits, misses, cache_keys
+    
+    def _lookup_highlights(self, keys: list[str]) -> dict[str, str]:
+        """Read highlights from the cache, treating cache errors as misses."""
+        try:
+            return self.highlight_cache.get_many(keys)
+        except sqlite3.Error as e:
+            logger.error(f"Highlight cache lookup failed: {e}")
+            return {}
+    
+    def _store_highlights(self, highlights: dict[str, str]) -> None:
+        """Write highlights to the cache, logging (not raising) on failure."""
+        try:
+            self.highlight_cache.put_many(highlights)
+        except sqlite3.Error as e:
+            logger.error(f"Highlight cache write failed: {e}")
+    
+    async def _chat_completion(self, deadline: Optional[Deadline] = None, **kwargs):
+        """
+        Create a chat completion with bounded concurrency and rate-limit back-off.
+        
+        On a 429 the call waits for the server's retry-after hint (or an
+        exponential back-off with jitter when there is none) and retries up to
+        OPENAI_MAX_RETRIES times. The wait is shared: other calls issued during
+        the back-off window wait for it as well instead of hitting the limit.
+        
+        Raises:
+            asyncio.TimeoutError: If `deadline` runs out (including a back-off
+                that would outlast it)
+            CircuitOpenError: If the OpenAI circuit is open
+        """
+        # Already imported with the client (see openai_client)
+        from openai import RateLimitError
+        
+        attempt = 0
+        while True:
+            delay = self._openai_backoff_until - time.monotonic()
+            if delay > 0:
+                if deadline is not None and delay >= deadline.remaining():
+                    raise asyncio.TimeoutError("OpenAI back-off would exceed the pipeline deadline")
+                await asyncio.sleep(delay)
             
-            # For multiple items, batch them in a single request
-            messages = [
-                {
-                    "role": "system",
-                    "content": """You are a concise tech analyst for a professional networking platform called Vetted. 
-Summarize each article into one short highlight (max 40 words) for a feed of tech trends. 
-Mention "AI", "startups", or "software" only if relevant. Avoid fluff.
-Return JSON array with one highlight per article in the same order."""
-                },
-                {
-                    "role": "user",
-                    "content": "\n\n".join([
-                        f"Article {i+1}:\nTitle: {item.title}\nExcerpt: {item.raw_excerpt}\nSource: {item.source}"
-                        for i, item in enumerate(items)
-                    ])
-                }
-            ]
+            try:
+                self.openai_breaker.check()
+            except CircuitOpenError:
+                UPSTREAM_ERRORS.inc("openai", "circuit_open")
+                raise
             
-            # Use asyncio.to_thread to run synchronous OpenAI call
-            def _call_openai():
-                return self.openai_client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=messages,
-                    temperature=0.7,
-                    max_tokens=200 * len(items)
+            try:
+                async with self._openai_semaphore:
+                    UPSTREAM_CALLS.inc("openai")
+                    with TRACER.span("openai_chat", model=kwargs.get("model", ""), attempt=attempt):
+                        create = self.openai_client.chat.completions.create(**kwargs)
+                        if deadline is None:
+                            response = await create
+                        else:
+                            response = await asyncio.wait_for(create, timeout=deadline.remaining())
+            except RateLimitError as e:
+                UPSTREAM_ERRORS.inc("openai", "rate_limited")
+                if attempt >= Config.OPENAI_MAX_RETRIES:
+                    raise
+                
+                delay = _retry_after_seconds(e.response)
+                if delay is None:
+                    delay = Config.OPENAI_BACKOFF_BASE_SECONDS * (2 ** attempt)
+                    delay += random.uniform(0, delay / 2)
+                delay = min(delay, Config.OPENAI_BACKOFF_MAX_SECONDS)
+                
+                attempt += 1
+                logger.warning(
+                    f"OpenAI rate limited, retrying in {delay:.2f}s "
+                    f"(attempt {attempt}/{Config.OPENAI_MAX_RETRIES})"
                 )
-            
-            # Use to_thread if available, otherwise fallback to run_in_executor
-            if hasattr(asyncio, 'to_thread'):
-                response = await asyncio.to_thread(_call_openai)
+                self._openai_backoff_until = max(
+                    self._openai_backoff_until,
+                    time.monotonic() + delay
+                )
+            except Exception as e:
+                UPSTREAM_ERRORS.inc("openai", "timeout" if isinstance(e, asyncio.TimeoutError) else "error")
+                self.openai_breaker.record_failure()
+                raise
             else:
-                import concurrent.futures
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(None, _call_openai)
-            
-            content = response.choices[0].message.content
-            if not content:
-                # Fallback to individual calls
-                return await self._enrich_individually(items)
+                self.openai_breaker.record_success()
+                return response
+    
+    def _count_tier(self, tier: str, amount: int = 1) -> None:
+        """Count an enrichment tier for health reporting and metrics."""
+        self.enrichment_tiers[tier] += amount
+        ENRICHMENT_TIERS.inc(tier, amount=amount)
+        TRACER.add_event(tier, items=amount)
+    
+    @TRACER.traced("enrich_batch")
+    async def _enrich_batch(
+        self,
+        items: list[TrendItem],
+        deadline: Optional[Deadline] = None
+    ) -> list[TrendItem]:
+        """
+        Enrich a batch of items with AI highlights.
+        
+        Multiple items go out in one structured-output call. Items whose ids
+        are missing from the response are retried together (up to
+        OPENAI_MISSING_RETRIES times) rather than one call per item; whatever
+        is still missing is marked "failed". Items not attempted because of
+        an error, the deadline or an open circuit stay "pending".
+        """
+        pending = list(items)
+        TRACER.set_attribute("items", len(items))
+        for attempt in range(Config.OPENAI_MISSING_RETRIES + 1):
+            if not pending:
+                break
+            if attempt > 0:
+                self._count_tier("missing_retry")
+                logger.info(f"Retrying {len(pending)} items missing from the batch response")
             
-            # Try to parse as JSON array
-            import json
             try:
-                highlights = json.loads(content)
-                if isinstance(highlights, list) and len(highlights) == len(items):
-                    for item, highlight in zip(items, highlights):
-                        item.highlight = str(highlight) if highlight else ""
-                    return items
-            except json.JSONDecodeError:
-                pass
-            
-            # Fallback: try to extract highlights from text
-            lines = content.strip().split("\n")
-            highlights = [line.strip() for line in lines if line.strip() and not line.strip().startswith("Article")]
-            if len(highlights) >= len(items):
-                for item, highlight in zip(items, highlights[:len(items)]):
-                    item.highlight = highlight
+                if len(pending) == 1:
+                    self._count_tier("single")
+                    pending[0].highlight = await self._generate_highlight(pending[0], deadline)
+                else:
+                    self._count_tier("batch")
+                    highlights = await self._generate_batch_highlights(pending, deadline)
+                    for i, item in enumerate(pending):
+                        item.highlight = highlights.get(str(i + 1), "")
+            except asyncio.TimeoutError:
+                self._count_tier("deadline")
+                logger.warning(f"Enrichment deadline reached, {len(pending)} items left pending")
+                return items
+            except CircuitOpenError:
+                self._count_tier("circuit_open")
+                return items
+            except Exception as e:
+                self._count_tier("error")
+                logger.error(f"Error enriching batch with AI: {e}")
                 return items
             
-            # Final fallback: individual calls
-            return await self._enrich_individually(items)
-            
-        except Exception as e:
-            logger.error(f"Error enriching batch with AI: {e}")
-            # Return items without highlights on error
-            return items
+            pending = [item for item in pending if not item.highlight]
+        
+        if pending:
+            self._count_tier("unresolved", len(pending))
+            for item in pending:
+                item.enrichment_status = "failed"
+        return items
     
-    async def _enrich_individually(self, items: list[TrendItem]) -> list[TrendItem]:
-        """Enrich items one by one (fallback method)."""
-        enriched = []
-        for item in items:
-            try:
-                highlight = await self._generate_highlight(item)
-                item.highlight = highlight
-            except Exception as e:
-                logger.error(f"Error generating highlight for item: {e}")
-                item.highlight = ""
-            enriched.append(item)
-        return enriched
+    async def _generate_batch_highlights(
+        self,
+        items: list[TrendItem],
+        deadline: Optional[Deadline] = None
+    ) -> dict[str, str]:
+        """
+        Generate highlights for several items in one call.
+        
+        Returns:
+            Mapping of article id ("1".."n", in `items` order) -> highlight,
+            for the ids the response covered
+        """
+        messages = [
+            {
+                "role": "system",
+                "content": BATCH_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": "\n\n".join([
+                    f"Article id: {i+1}\nTitle: {item.title}\nExcerpt: {item.raw_excerpt}\nSource: {item.source}"
+                    for i, item in enumerate(items)
+                ])
+            }
+        ]
+        
+        self.batcher.record_call(items)
+        response = await self._chat_completion(
+            deadline,
+            model=Config.OPENAI_MODEL,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=self.batcher.max_completion_tokens(items),
+            response_format=HIGHLIGHT_BATCH_RESPONSE_FORMAT
+        )
+        return self._parse_batch_highlights(response.choices[0].message.content, len(items))
+    
+    @staticmethod
+    def _parse_batch_highlights(content: Optional[str], count: int) -> dict[str, str]:
+        """Map article ids to highlights from a batch response; unusable entries are dropped."""
+        try:
+            data = json.loads(content or "")
+        except json.JSONDecodeError:
+            return {}
+        
+        # A bare array in article order is accepted too (models without
+        # structured-output support)
+        if isinstance(data, list):
+            if len(data) != count:
+                return {}
+            entries = [{"id": str(i + 1), "highlight": h} for i, h in enumerate(data)]
+        elif isinstance(data, dict) and isinstance(data.get("highlights"), list):
+            entries = data["highlights"]
+        else:
+            return {}
+        
+        highlights = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            highlight = entry.get("highlight")
+            article_id = _BATCH_ID_NUMBER.search(str(entry.get("id", "")))
+            if article_id and isinstance(highlight, str) and highlight.strip():
+                highlights[article_id.group(1)] = highlight.strip()
+        return highlights
     
-    async def _generate_highlight(self, item: TrendItem) -> str:
+    async def _generate_highlight(self, item: TrendItem, deadline: Optional[Deadline] = None) -> str:
         """Generate a single highlight for an item."""
-        def _call_openai():
-            return self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are a concise tech analyst for a professional networking platform called Vetted. 
+        self.batcher.record_call([item])
+        response = await self._chat_completion(
+            deadline,
+            model=Config.OPENAI_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": """You are a concise tech analyst for a professional networking platform called Vetted. 
 Summarize this article into one short highlight (max 40 words) for a feed of tech trends. 
 Mention "AI", "startups", or "software" only if relevant. Avoid fluff."""
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Title: {item.title}\nExcerpt: {item.raw_excerpt}\nSource: {item.source}"
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=100
-            )
-        
-        # Use to_thread if available (Python 3.9+), otherwise fallback to run_in_executor
-        if hasattr(asyncio, 'to_thread'):
-            response = await asyncio.to_thread(_call_openai)
-        else:
-            import concurrent.futures
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, _call_openai)
+                },
+                {
+                    "role": "user",
+                    "content": f"Title: {item.title}\nExcerpt: {item.raw_excerpt}\nSource: {item.source}"
+                }
+            ],
+            temperature=0.7,
+            max_tokens=100
+        )
         
         content = response.choices[0].message.content
         return content.strip() if content else ""
     
-    async def get_trends(self) -> TrendsResponse:
+    async def get_trends(
+        self,
+        enrich: bool = True,
+        deadline: Optional[Deadline] = None,
+        region: Optional[str] = None
+    ) -> TrendsResponse:
         """
         Orchestrate end-to-end flow to fetch and enrich trends.
         
+        Args:
+            enrich: If False, only cached highlights are applied and the other
+                items are returned with enrichment_status "pending" (see
+                EnrichmentWorker for the two-phase mode)
+            deadline: Time budget for the whole pipeline (defaults to
+                TRENDS_PIPELINE_DEADLINE_SECONDS); when it runs out the items
+                gathered so far are returned, possibly without highlights
+            region: SerpAPI country code (defaults to TRENDS_REGION); each
+                region has its own query results and incremental baseline,
+                while highlights are shared across regions
+        
         Returns:
             TrendsResponse with enriched trend items
         """
+        response = None
+        with TRACER.span("get_trends", region=region or self.region, enrich=enrich):
+            async for event, payload in self.stream_trends(enrich=enrich, deadline=deadline, region=region):
+                if event == "done":
+                    response = payload
+            TRACER.set_attribute("items", len(response.items))
+        return response
+    
+    async def stream_trends(
+        self,
+        enrich: bool = True,
+        deadline: Optional[Deadline] = None,
+        region: Optional[str] = None
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """
+        Run the fetch/normalize/enrich pipeline, yielding progress events.
+        
+        Events (in order):
+        - ("items", list[TrendItem]): normalized items, before enrichment
+        - ("highlights", list[TrendItem]): items whose highlights just became
+          available; repeated as each enrichment batch finishes
+        - ("done", TrendsResponse): the final response; always the last event
+          (on error, whatever items were normalized before it)
+        
+        Arguments are as for `get_trends`.
+        """
+        region = region or self.region
+        if deadline is None:
+            deadline = Deadline(Config.TRENDS_PIPELINE_DEADLINE_SECONDS)
+        normalized_items: list[TrendItem] = []
+        
         try:
-            # Step 1: Fetch raw trends from SerpAPI (synchronous call, wrap in executor)
-            logger.info("Fetching raw trends from SerpAPI")
-            
-            def _fetch_sync():
-                return self.fetch_raw_trends()
-            
-            # Run SerpAPI calls in executor since they're synchronous
-            loop = asyncio.get_event_loop()
-            raw_items = await loop.run_in_executor(None, _fetch_sync)
+            # Step 1: Fetch raw trends from SerpAPI (queries run concurrently)
+            logger.info(f"Fetching raw trends from SerpAPI (region {region})")
+            started = time.perf_counter()
+            raw_items = await self.fetch_raw_trends(deadline, region)
+            STAGE_DURATION.observe(time.perf_counter() - started, "fetch")
             
             if not raw_items:
                 logger.warning("No raw trends fetched, returning empty response")
-                return TrendsResponse(
+                yield "done", TrendsResponse(
                     items=[],
                     last_updated=datetime.utcnow()
                 )
+                return
             
             # Step 2: Normalize and deduplicate
             logger.info(f"Normalizing {len(raw_items)} raw items")
+            started = time.perf_counter()
             normalized_items = self._normalize_results(raw_items)
+            STAGE_DURATION.observe(time.perf_counter() - started, "normalize")
+            yield "items", normalized_items
+            
+            # Step 3: Carry forward highlights of items unchanged since the
+            # previous snapshot; only new or changed items are enriched
+            carried, to_enrich = self.carry_forward_highlights(normalized_items, region)
+            if carried:
+                yield "highlights", carried
             
-            # Step 3: Enrich with AI highlights
-            logger.info(f"Enriching {len(normalized_items)} items with AI")
-            enriched_items = await self.enrich_with_ai(normalized_items)
+            # Step 4: Enrich with AI highlights
+            if enrich:
+                logger.info(f"Enriching {len(to_enrich)} items with AI")
+                started = time.perf_counter()
+                async for enriched_group in self.iter_enrichment(to_enrich, deadline):
+                    yield "highlights", enriched_group
+                STAGE_DURATION.observe(time.perf_counter() - started, "enrich")
+            elif not self.openai_available:
+                for item in to_enrich:
+                    item.enrichment_status = "skipped"
+            else:
+                hits, _, _ = self.apply_cached_highlights(to_enrich)
+                if hits:
+                    yield "highlights", hits
             
-            # Step 4: Return response
-            return TrendsResponse(
-                items=enriched_items,
+            # Step 5: Return response
+            self.remember_snapshot(normalized_items, region)
+            yield "done", TrendsResponse(
+                items=normalized_items,
                 last_updated=datetime.utcnow()
             )
             
         except Exception as e:
             logger.error(f"Error in get_trends: {e}", exc_info=True)
-            # Return empty response on error rather than crashing
-            return TrendsResponse(
-                items=[],
+            # Return what we have (possibly nothing) rather than crashing
+            yield "done", TrendsResponse(
+                items=normalized_items,
                 last_updated=datetime.utcnow()
             )
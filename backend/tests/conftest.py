@@ -0,0 +1,61 @@
+"""
+Shared test helpers: a manual clock and TrendItem / TrendsResponse builders.
+"""
+from datetime import datetime
+from typing import Optional
+
+import pytest
+
+from backend.models.trends import TrendItem, TrendsResponse
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_item(
+    i: int = 0,
+    category: str = "ai",
+    *,
+    title: Optional[str] = None,
+    url: Optional[str] = None,
+    source: str = "example.com",
+    excerpt: Optional[str] = None,
+    **fields,
+) -> TrendItem:
+    """Build a trend item; unset fields derive from `i` (or `title`)."""
+    return TrendItem(
+        title=f"Article {i}" if title is None else title,
+        url=url or f"https://{source}/{i if title is None else title.replace(' ', '-')}",
+        source=source,
+        raw_excerpt=f"Excerpt {i}" if excerpt is None else excerpt,
+        category=category,
+        **fields,
+    )
+
+
+def make_response(title: str = "Test Article") -> TrendsResponse:
+    """Build a one-item, enriched snapshot."""
+    return TrendsResponse(
+        items=[
+            make_item(
+                title=title,
+                url="https://example.com/test",
+                excerpt="Test excerpt",
+                highlight="Test highlight",
+                enrichment_status="done",
+            )
+        ],
+        last_updated=datetime(2025, 12, 12, 10, 15)
+    )
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
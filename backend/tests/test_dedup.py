@@ -0,0 +1,94 @@
+"""
+Unit tests for URL canonicalization and near-duplicate collapsing.
+"""
+import pytest
+
+from backend.services.dedup import (
+    canonicalize_url,
+    collapse_duplicates,
+    hamming_distance,
+    simhash,
+    strip_tracking_params,
+)
+from backend.tests.conftest import make_item
+
+
+@pytest.mark.parametrize("url", [
+    "https://example.com/story",
+    "http://example.com/story",
+    "https://www.example.com/story/",
+    "https://example.com/story?utm_source=newsletter&utm_medium=email",
+    "https://example.com/story#comments",
+    "https://example.com/amp/story",
+    "https://example.com/story/amp/",
+    "https://amp.example.com/story?outputType=amp",
+    "https://m.example.com/story?fbclid=abc",
+])
+def test_canonicalize_url_variants(url):
+    assert canonicalize_url(url) == "https://example.com/story"
+
+
+def test_canonicalize_url_keeps_content_params_sorted():
+    assert canonicalize_url("https://example.com/s?b=2&utm_campaign=x&a=1") == "https://example.com/s?a=1&b=2"
+    assert canonicalize_url("https://example.com/news/story.amp.html") == "https://example.com/news/story.html"
+
+
+def test_strip_tracking_params_only_removes_tracking():
+    assert strip_tracking_params("https://www.example.com/s/?id=7&utm_source=x") == "https://www.example.com/s/?id=7"
+    assert strip_tracking_params("https://example.com/s") == "https://example.com/s"
+    assert strip_tracking_params("https://example.com/s?utm_source=x#top") == "https://example.com/s#top"
+
+
+@pytest.mark.parametrize("url", [
+    "https://example.com/s?a=1;b=2",
+    "https://example.com/s?id=1&flag",
+    "https://example.com/search?q=a%20b&page=2",
+])
+def test_strip_tracking_params_keeps_other_params_verbatim(url):
+    assert strip_tracking_params(url) == url
+    assert strip_tracking_params(url + "&utm_medium=email&fbclid=abc") == url
+
+
+def test_simhash_is_close_for_syndicated_copies():
+    body = "OpenAI on Tuesday launched GPT-5, its most capable model, with improved reasoning and coding."
+    original = simhash("OpenAI launches GPT-5 with new reasoning features " + body)
+    syndicated = simhash("OpenAI launches GPT-5 with new reasoning features - The Verge " + body)
+    unrelated = simhash("Startup raises $50M to build AI agents for accounting. The company plans to hire engineers.")
+
+    assert hamming_distance(original, syndicated) <= 6
+    assert hamming_distance(original, unrelated) > 16
+
+
+def test_collapse_duplicates_merges_url_variants_and_syndicated_copies():
+    body = "OpenAI on Tuesday launched GPT-5, its most capable model, with improved reasoning and coding."
+    items = [
+        make_item(url="https://example.com/gpt5", title="OpenAI launches GPT-5 with new reasoning features", excerpt=body),
+        make_item(url="https://www.example.com/gpt5/?utm_source=feed", title="OpenAI launches GPT-5", excerpt="Different snippet"),
+        make_item(
+            url="https://theverge.com/openai-gpt5",
+            title="OpenAI launches GPT-5 with new reasoning features - The Verge",
+            excerpt=body,
+            source="theverge.com",
+        ),
+        make_item(url="https://example.com/funding", title="Startup raises $50M to build AI agents", excerpt="Accounting agents."),
+    ]
+
+    survivors = collapse_duplicates(items, max_distance=6)
+
+    assert [item.url for item in survivors] == ["https://example.com/gpt5", "https://example.com/funding"]
+    # The utm/www variant is the same URL, not an alternate source
+    assert [(a.source, a.url) for a in survivors[0].alternate_sources] == [
+        ("theverge.com", "https://theverge.com/openai-gpt5")
+    ]
+    assert survivors[1].alternate_sources == []
+
+
+def test_negative_distance_disables_near_duplicates():
+    body = "OpenAI on Tuesday launched GPT-5, its most capable model, with improved reasoning and coding."
+    items = [
+        make_item(url="https://example.com/gpt5", title="OpenAI launches GPT-5", excerpt=body),
+        make_item(url="https://theverge.com/gpt5", title="OpenAI launches GPT-5", excerpt=body),
+    ]
+
+    assert len(collapse_duplicates(items, max_distance=-1)) == 2
+    assert len(collapse_duplicates(items, max_distance=0)) == 1
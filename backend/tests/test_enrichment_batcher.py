@@ -0,0 +1,59 @@
+"""
+Unit tests for TokenBudgetBatcher.
+"""
+from backend.services.enrichment_batcher import TokenBudgetBatcher, estimate_tokens
+from backend.tests.conftest import make_item
+
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_plan_packs_items_to_the_token_budget():
+    """Short items share calls; every batch stays within the budget."""
+    batcher = TokenBudgetBatcher(token_budget=500, context_limit=10000, max_items=100, highlight_tokens=50)
+    items = [make_item(i, excerpt="x" * 40) for i in range(20)]
+
+    batches = batcher.plan(items)
+
+    assert [item for batch in batches for item in batch.items] == items
+    assert all(batch.total_tokens <= 500 for batch in batches)
+    # Greedy packing: adding the next batch's first item would overflow
+    for batch, following in zip(batches, batches[1:]):
+        next_cost = batcher.item_prompt_tokens(following.items[0]) + 50
+        assert batch.total_tokens + next_cost > 500
+
+
+def test_plan_respects_context_limit_and_max_items():
+    batcher = TokenBudgetBatcher(token_budget=100000, context_limit=1000, max_items=3, highlight_tokens=50)
+
+    batches = batcher.plan([make_item(i, excerpt="x" * 40) for i in range(10)])
+
+    assert batcher.budget == 1000
+    assert [len(batch.items) for batch in batches] == [3, 3, 3, 1]
+
+
+def test_oversized_item_gets_its_own_batch():
+    batcher = TokenBudgetBatcher(token_budget=300, context_limit=10000, max_items=10, highlight_tokens=50)
+    items = [make_item(0, excerpt="x" * 40), make_item(1, excerpt="x" * 4000), make_item(2, excerpt="x" * 40)]
+
+    batches = batcher.plan(items)
+
+    assert [len(batch.items) for batch in batches] == [1, 1, 1]
+
+
+def test_stats_report_items_per_call_and_fill_ratio():
+    batcher = TokenBudgetBatcher(token_budget=1000, context_limit=10000, max_items=10, highlight_tokens=50)
+    assert batcher.stats()["items_per_call"] is None
+
+    for batch in batcher.plan([make_item(i, excerpt="x" * 40) for i in range(6)]):
+        batcher.record_call(batch.items)
+    batcher.record_call([make_item(9, excerpt="x" * 40)])
+
+    stats = batcher.stats()
+    assert stats["calls"] == 2
+    assert stats["items_per_call"] == 3.5
+    assert stats["max_items_per_call"] == 6
+    assert 0 < stats["fill_ratio"] < 1
@@ -0,0 +1,113 @@
+"""
+Unit tests for the two-phase EnrichmentWorker.
+"""
+import asyncio
+import pytest
+from datetime import datetime
+
+from backend.models.trends import TrendItem, TrendsResponse
+from backend.services.enrichment_queue import EnrichmentWorker
+from backend.services.trends_cache import TrendsCache
+from backend.tests.conftest import make_item
+
+
+def make_items(count: int) -> list[TrendItem]:
+    return [make_item(i) for i in range(count)]
+
+
+class FakeService:
+    """Returns pending items and enriches them one group per item."""
+
+    def __init__(self, items: list[TrendItem], fail_urls: tuple = ()):
+        self.items = items
+        self.fail_urls = fail_urls
+        self.enriched_urls: list[str] = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def get_trends(self, enrich: bool = True, region=None) -> TrendsResponse:
+        assert enrich is False
+        return TrendsResponse(items=self.items, last_updated=datetime.utcnow())
+
+    async def iter_enrichment(self, items):
+        await self.gate.wait()
+        for item in items:
+            self.enriched_urls.append(item.url)
+            if item.url in self.fail_urls:
+                item.enrichment_status = "failed"
+            else:
+                item.highlight = f"Highlight for {item.title}"
+                item.enrichment_status = "done"
+            yield [item]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_published_before_enrichment():
+    """The loader returns pending items at once and queues them."""
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300)
+    service = FakeService(make_items(3))
+    service.gate.clear()
+    worker = EnrichmentWorker(service, cache)
+
+    await cache.refresh(worker.load_trends)
+
+    assert [item.enrichment_status for item in cache.entry.response.items] == ["pending"] * 3
+    assert worker.stats()["queued"] == 3
+
+
+@pytest.mark.asyncio
+async def test_worker_republishes_snapshot_as_highlights_arrive():
+    """Each enriched group rebuilds the snapshot body and ETag in place."""
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300)
+    service = FakeService(make_items(2), fail_urls=("https://example.com/1",))
+    worker = EnrichmentWorker(service, cache)
+
+    await cache.refresh(worker.load_trends)
+    first = cache.entry
+    urls = [worker.queue.get_nowait() for _ in range(worker.queue.qsize())]
+
+    assert await worker.process(urls) == 2
+
+    entry = cache.entry
+    assert entry.etag != first.etag
+    assert entry.fresh_until == first.fresh_until
+    assert b'"enrichment_status":"done"' in entry.body
+    assert b'"enrichment_status":"failed"' in entry.body
+    assert worker.stats()["enriched"] == 1
+    assert worker.stats()["failed"] == 1
+    assert worker.stats()["republished"] == 2
+
+
+@pytest.mark.asyncio
+async def test_worker_skips_items_no_longer_in_snapshot():
+    """Queued URLs are resolved against the current snapshot only."""
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300)
+    service = FakeService(make_items(2))
+    worker = EnrichmentWorker(service, cache)
+
+    await cache.refresh(worker.load_trends)
+
+    assert await worker.process(["https://example.com/gone", "https://example.com/0"]) == 1
+    assert service.enriched_urls == ["https://example.com/0"]
+    # Already enriched items are not sent again
+    assert await worker.process(["https://example.com/0"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_background_worker_drains_queue():
+    """Started worker enriches queued items without further calls."""
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300)
+    service = FakeService(make_items(3))
+    worker = EnrichmentWorker(service, cache, chunk_size=2)
+    worker.start()
+    try:
+        await cache.refresh(worker.load_trends)
+        for _ in range(50):
+            if all(item.enrichment_status == "done" for item in cache.entry.response.items):
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await worker.stop()
+
+    assert all(item.highlight for item in cache.entry.response.items)
+    assert worker.stats()["queued"] == 0
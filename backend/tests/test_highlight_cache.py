@@ -0,0 +1,90 @@
+"""
+Unit tests for HighlightCache.
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from backend.services.highlight_cache import HighlightCache
+from backend.services.trends_service import TrendsService
+from backend.tests.conftest import make_item
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HighlightCache(str(tmp_path / "highlights.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def test_key_depends_on_content_model_and_prompt():
+    """Keys change with article content, model, or prompt version, but not URL."""
+    item = make_item()
+    key = HighlightCache.make_key(item, "gpt-4o-mini", "1")
+
+    same_content = make_item()
+    same_content.url = "https://mirror.example.com/copy"
+    assert HighlightCache.make_key(same_content, "gpt-4o-mini", "1") == key
+
+    assert HighlightCache.make_key(make_item(excerpt="Other"), "gpt-4o-mini", "1") != key
+    assert HighlightCache.make_key(item, "gpt-4o", "1") != key
+    assert HighlightCache.make_key(item, "gpt-4o-mini", "2") != key
+
+
+def test_put_and_get_persist_across_reopen(tmp_path):
+    """Highlights survive closing and reopening the database."""
+    path = str(tmp_path / "highlights.sqlite3")
+    cache = HighlightCache(path)
+    cache.put_many({"a": "Highlight A", "b": "Highlight B"})
+    cache.close()
+
+    reopened = HighlightCache(path)
+    assert reopened.get_many(["a", "b", "c"]) == {"a": "Highlight A", "b": "Highlight B"}
+    reopened.close()
+
+
+def test_lru_eviction(tmp_path):
+    """The least recently used entries are evicted beyond max_entries."""
+    cache = HighlightCache(str(tmp_path / "highlights.sqlite3"), max_entries=2, max_age_seconds=float("inf"))
+
+    with patch("backend.services.highlight_cache.time.time", side_effect=[1.0, 2.0, 3.0, 4.0]):
+        cache.put_many({"a": "A"})
+        cache.put_many({"b": "B"})
+        cache.get_many(["a"])  # "a" is now more recently used than "b"
+        cache.put_many({"c": "C"})
+
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+    cache.close()
+
+
+def test_expired_entries_are_misses(tmp_path):
+    """Entries older than max_age_seconds are not returned."""
+    cache = HighlightCache(str(tmp_path / "highlights.sqlite3"), max_age_seconds=60)
+
+    with patch("backend.services.highlight_cache.time.time", return_value=1000.0):
+        cache.put_many({"a": "A"})
+    with patch("backend.services.highlight_cache.time.time", return_value=1100.0):
+        assert cache.get_many(["a"]) == {}
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_enrich_with_ai_only_sends_cache_misses(cache):
+    """Cached highlights are reused and only misses reach OpenAI."""
+    openai_client = MagicMock()
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = "Fresh highlight"
+    openai_client.chat.completions.create = AsyncMock(return_value=response)
+
+    service = TrendsService(serpapi_http=MagicMock(), openai_client=openai_client, highlight_cache=cache)
+
+    first = await service.enrich_with_ai([make_item(title="Cached")])
+    assert first[0].highlight == "Fresh highlight"
+    assert openai_client.chat.completions.create.await_count == 1
+
+    second = await service.enrich_with_ai([make_item(title="Cached"), make_item(title="New")])
+    assert [i.highlight for i in second] == ["Fresh highlight", "Fresh highlight"]
+    # Only "New" was sent to the model
+    assert openai_client.chat.completions.create.await_count == 2
+    sent = openai_client.chat.completions.create.await_args.kwargs["messages"][1]["content"]
+    assert "New" in sent and "Cached" not in sent
@@ -0,0 +1,52 @@
+"""
+Unit tests for the metrics registry and the /metrics endpoint.
+"""
+from fastapi.testclient import TestClient
+
+from backend.core.config import Config
+from backend.core.metrics import CACHE_REQUESTS, MetricsRegistry
+from backend.main import app
+
+
+def test_counter_renders_labelled_series():
+    registry = MetricsRegistry()
+    calls = registry.counter("upstream_calls_total", "Upstream calls", ["provider"])
+    calls.inc("serpapi")
+    calls.inc("serpapi", amount=2)
+    calls.inc('open"ai')
+
+    text = registry.render()
+
+    assert "# TYPE upstream_calls_total counter" in text
+    assert 'upstream_calls_total{provider="serpapi"} 3' in text
+    assert 'upstream_calls_total{provider="open\\"ai"} 1' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("stage_seconds", "Stage latency", ["stage"], buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.observe(value, "fetch")
+
+    lines = registry.render().splitlines()
+
+    assert 'stage_seconds_bucket{stage="fetch",le="0.1"} 2' in lines
+    assert 'stage_seconds_bucket{stage="fetch",le="1"} 3' in lines
+    assert 'stage_seconds_bucket{stage="fetch",le="+Inf"} 4' in lines
+    assert 'stage_seconds_sum{stage="fetch"} 3.65' in lines
+    assert 'stage_seconds_count{stage="fetch"} 4' in lines
+
+
+def test_metrics_endpoint_serves_prometheus_text(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "TRENDS_HIGHLIGHT_CACHE_PATH", str(tmp_path / "highlights.sqlite3"))
+    monkeypatch.setattr(Config, "TRENDS_SNAPSHOT_PATH", "")
+    monkeypatch.setattr(Config, "TRENDS_REFRESH_ENABLED", False)
+    CACHE_REQUESTS.inc("hit")
+
+    with TestClient(app) as client:
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE trends_stage_duration_seconds histogram" in response.text
+    assert 'trends_cache_requests_total{result="hit"}' in response.text
@@ -0,0 +1,76 @@
+"""
+Unit tests for the trend query registry.
+"""
+import json
+
+import pytest
+
+from backend.services.query_registry import (
+    TREND_QUERIES,
+    TrendQuery,
+    load_query_registry,
+    refresh_interval,
+)
+
+
+def test_default_registry_is_trend_queries():
+    queries = load_query_registry("")
+
+    assert [q.query for q in queries] == [q["query"] for q in TREND_QUERIES]
+    # Every default entry has a TTL, and ai is the fastest and first
+    assert all(q.ttl_seconds for q in queries)
+    ai = next(q for q in queries if q.category == "ai")
+    assert ai.ttl_seconds == min(q.ttl_seconds for q in queries)
+    assert ai.priority == max(q.priority for q in queries)
+
+
+def test_registry_from_inline_json_and_file(tmp_path):
+    entries = [
+        {"query": "AI news", "category": "ai", "ttl_seconds": 300, "priority": 10, "num_results": 20},
+        {"query": "Engineering news", "category": "engineering", "ttl_seconds": 3600},
+    ]
+    path = tmp_path / "queries.json"
+    path.write_text(json.dumps(entries))
+
+    inline = load_query_registry(json.dumps(entries))
+    from_file = load_query_registry(str(path))
+
+    assert inline == from_file
+    assert inline[0] == TrendQuery("AI news", "ai", num_results=20, ttl_seconds=300, priority=10)
+    assert inline[1].num_results == 10
+
+
+@pytest.mark.parametrize("source", [
+    "[]",
+    '[{"category": "ai"}]',
+    '[{"query": "q", "category": "ai", "ttl_seconds": 0}]',
+    '[{"query": "q", "category": "ai", "num_results": 500}]',
+    '[{"query": "q", "category": "ai", "ttl": 60}]',
+    '[{"query": "q", "category": "ai"}, {"query": "q", "category": "startups"}]',
+    "[not json",
+    "/nonexistent/queries.json",
+])
+def test_invalid_registry_raises(source):
+    with pytest.raises(ValueError):
+        load_query_registry(source)
+
+
+def test_is_due_honours_ttl_with_early_slack():
+    query = TrendQuery("AI news", "ai", ttl_seconds=300)
+
+    assert query.is_due(None)
+    assert not query.is_due(100)
+    # A refresh arriving slightly early still refetches
+    assert query.is_due(250)
+    assert TrendQuery("Always", "ai").is_due(0)
+
+
+def test_refresh_interval_follows_fastest_query():
+    queries = load_query_registry(json.dumps([
+        {"query": "AI news", "category": "ai", "ttl_seconds": 300},
+        {"query": "Engineering news", "category": "engineering", "ttl_seconds": 3600},
+        {"query": "Startup news", "category": "startups"},
+    ]))
+
+    assert refresh_interval(queries, 900) == 300
+    assert refresh_interval(queries[1:], 900) == 900
@@ -0,0 +1,69 @@
+"""
+Unit tests for Deadline and CircuitBreaker.
+"""
+import pytest
+
+from backend.services.resilience import CircuitBreaker, CircuitOpenError, Deadline
+
+
+def test_deadline_remaining_and_timeout_cap(clock):
+    deadline = Deadline(10, clock=clock)
+
+    assert deadline.timeout(3) == 3
+    clock.now += 8
+    assert deadline.remaining() == 2
+    assert deadline.timeout(3) == 2
+    assert not deadline.expired
+
+    clock.now += 5
+    assert deadline.remaining() == 0
+    assert deadline.expired
+
+
+def test_circuit_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=30, clock=clock)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.stats()["opened"] == 1
+
+
+def test_half_open_allows_one_trial_call(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=30, clock=clock)
+    breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+
+    # A failed trial re-opens the circuit for another reset period
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now += 30
+    assert breaker.allow() is True
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() is True
+
+
+def test_abandoned_trial_is_superseded(clock):
+    """A trial call that never reports back does not keep the circuit stuck."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=30, clock=clock)
+    breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.allow() is True
+    clock.now += 30
+    assert breaker.allow() is True
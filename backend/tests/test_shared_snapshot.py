@@ -0,0 +1,137 @@
+"""
+Unit tests for the shared (multi-worker) snapshot store and refresh lease.
+"""
+import asyncio
+import time
+
+import pytest
+
+from backend.benchmarks.fake_upstreams import FakeOpenAI, FakeSerpAPI
+from backend.core.config import Config
+from backend.services.query_registry import TREND_QUERIES
+from backend.services.shared_snapshot import SharedSnapshotStore
+from backend.services.trends_cache import TrendsCache, serialize_response
+from backend.services.trends_regions import TrendsRegion
+from backend.services.trends_service import TrendsService
+from backend.tests.conftest import make_response
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "shared" / "trends.sqlite3")
+
+
+def test_save_bumps_version_and_load_newer(db_path):
+    store = SharedSnapshotStore(db_path, "us")
+    other = SharedSnapshotStore(db_path, "us")
+
+    assert other.load() is None
+    assert store.save(serialize_response(make_response("First"))) == 1
+    assert store.save(serialize_response(make_response("Second"))) == 2
+
+    version, response, _ = other.load_newer(0)
+    assert version == 2
+    assert response.items[0].title == "Second"
+    assert other.load_newer(2) is None
+    # Regions have independent snapshots
+    assert SharedSnapshotStore(db_path, "gb").load() is None
+
+
+def test_lease_is_exclusive_until_released_or_expired(db_path):
+    first = SharedSnapshotStore(db_path, "us", lease_seconds=60)
+    second = SharedSnapshotStore(db_path, "us", lease_seconds=60)
+
+    assert first.acquire_lease("worker-1")
+    assert not second.acquire_lease("worker-2")
+    # The holder can extend its own lease
+    assert first.acquire_lease("worker-1")
+
+    first.release_lease("worker-1")
+    assert second.acquire_lease("worker-2")
+
+    expiring = SharedSnapshotStore(db_path, "gb", lease_seconds=0.01)
+    assert expiring.acquire_lease("worker-1")
+    time.sleep(0.02)
+    assert expiring.acquire_lease("worker-2")
+
+
+@pytest.mark.asyncio
+async def test_workers_share_one_refresh(db_path):
+    """Concurrent refreshes in two workers run the pipeline once."""
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.3)
+        return make_response()
+
+    workers = [
+        TrendsCache(ttl_seconds=60, stale_seconds=300, store=SharedSnapshotStore(db_path, "us"))
+        for _ in range(2)
+    ]
+
+    results = await asyncio.gather(*(cache.get(loader) for cache in workers))
+
+    assert calls == 1
+    assert [r.items[0].title for r in results] == ["Test Article", "Test Article"]
+    assert sum(cache.adopted for cache in workers) == 1
+    assert sum(cache.lease_waits for cache in workers) == 1
+
+
+@pytest.mark.asyncio
+async def test_reads_adopt_newer_snapshot(db_path):
+    """A worker serves what another worker published after its next sync."""
+    publisher = TrendsCache(ttl_seconds=60, stale_seconds=300, store=SharedSnapshotStore(db_path, "us"))
+    reader = TrendsCache(
+        ttl_seconds=60, stale_seconds=300, sync_seconds=0, store=SharedSnapshotStore(db_path, "us")
+    )
+
+    async def publish(title):
+        return make_response(title)
+
+    async def fail():
+        raise AssertionError("reader should not refresh")
+
+    await publisher.get(lambda: publish("First"))
+    assert (await reader.get(fail)).items[0].title == "First"
+
+    await publisher.refresh(lambda: publish("Second"))
+    assert (await reader.get(fail)).items[0].title == "Second"
+    assert reader.stats()["shared_version"] == 2
+
+
+def test_query_results_keep_the_latest_fetch(db_path):
+    store = SharedSnapshotStore(db_path, "us")
+    other = SharedSnapshotStore(db_path, "gb")
+
+    store.save_query_results({"ai": (200.0, [{"title": "New"}])})
+    store.save_query_results({"ai": (100.0, [{"title": "Old"}]), "startups": (100.0, [])})
+
+    assert store.load_query_results() == {"ai": (200.0, [{"title": "New"}]), "startups": (100.0, [])}
+    assert other.load_query_results() == {}
+
+
+@pytest.mark.asyncio
+async def test_workers_share_query_results_and_baseline(db_path, monkeypatch):
+    """Each worker taking the lease starts from the shared query results and snapshot."""
+    monkeypatch.setattr(Config, "TRENDS_SHARED_CACHE_PATH", db_path)
+    monkeypatch.setattr(Config, "TRENDS_CACHE_TTL_SECONDS", 0)
+    monkeypatch.setattr(Config, "SERPAPI_KEY", "test-key")
+    serpapi = FakeSerpAPI()
+    openai = FakeOpenAI()
+
+    workers = []
+    for _ in range(3):
+        service = TrendsService(serpapi_http=serpapi.client(), openai_client=openai.client())
+        workers.append(TrendsRegion.create(service, "us"))
+
+    # The snapshot is never fresh, so every worker takes the lease and runs its loader
+    responses = [await region.cache.get(region.loader) for region in workers]
+
+    assert serpapi.calls == len(TREND_QUERIES)
+    assert openai.calls == workers[0].service.enrichment_tiers["batch"]
+    assert len({region.cache.entry.etag for region in workers}) == 1
+    assert responses[1].items == responses[0].items
+    for region in workers:
+        region.store.close()
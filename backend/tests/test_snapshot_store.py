@@ -0,0 +1,112 @@
+"""
+Unit tests for SnapshotStore and snapshot restore at startup.
+"""
+import json
+import os
+
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from backend.core.config import Config
+from backend.main import app
+from backend.services.snapshot_store import SNAPSHOT_SCHEMA_VERSION, SnapshotStore
+from backend.services.trends_cache import TrendsCache, serialize_response
+from backend.tests.conftest import make_response
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """A saved snapshot loads back unchanged, with its save time."""
+    store = SnapshotStore(str(tmp_path / "snapshots" / "trends.json"))
+    response = make_response()
+
+    store.save(serialize_response(response))
+    loaded, saved_at = store.load()
+
+    assert loaded == response
+    assert datetime.now(timezone.utc) - saved_at < timedelta(seconds=5)
+    # The temporary file was renamed into place, not left behind
+    assert os.listdir(tmp_path / "snapshots") == ["trends.json"]
+
+
+def test_missing_snapshot_loads_nothing(tmp_path):
+    assert SnapshotStore(str(tmp_path / "trends.json")).load() is None
+
+
+def test_schema_mismatch_is_ignored(tmp_path):
+    """Snapshots written with another schema version are not served."""
+    path = tmp_path / "trends.json"
+    store = SnapshotStore(str(path))
+    store.save(serialize_response(make_response()))
+
+    envelope = json.loads(path.read_text())
+    envelope["schema_version"] = SNAPSHOT_SCHEMA_VERSION + 1
+    path.write_text(json.dumps(envelope))
+
+    assert store.load() is None
+
+
+def test_corrupt_snapshot_is_ignored(tmp_path):
+    path = tmp_path / "trends.json"
+    path.write_text('{"schema_version": 1, "saved_at": "2025-12-12T10:15:00+00:00", "resp')
+
+    assert SnapshotStore(str(path)).load() is None
+
+
+@pytest.mark.asyncio
+async def test_cache_persists_refreshed_snapshot(tmp_path):
+    """Each new snapshot is written to the store."""
+    store = SnapshotStore(str(tmp_path / "trends.json"))
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300, store=store)
+    response = make_response()
+
+    async def loader():
+        return response
+
+    await cache.get(loader)
+
+    loaded, _ = store.load()
+    assert loaded == response
+
+
+def test_restore_keeps_snapshot_age(clock):
+    """A restored snapshot is fresh or stale according to when it was saved."""
+    fresh = TrendsCache(ttl_seconds=60, stale_seconds=300, clock=clock)
+    stale = TrendsCache(ttl_seconds=60, stale_seconds=300, clock=clock)
+
+    assert fresh.restore(make_response(), age_seconds=20)
+    assert stale.restore(make_response(), age_seconds=90)
+
+    assert fresh.seconds_until_stale(fresh.entry) == 40
+    assert stale.seconds_until_stale(stale.entry) == 0
+    assert fresh.stats()["restored_from_disk"] is True
+    # An existing snapshot is never overwritten by a restore
+    assert not fresh.restore(make_response("Other"), age_seconds=0)
+
+
+def test_startup_serves_persisted_snapshot(tmp_path, monkeypatch):
+    """The first request after a restart is served from disk, without the pipeline."""
+    path = tmp_path / "trends.json"
+    SnapshotStore(str(path)).save(serialize_response(make_response()))
+    monkeypatch.setattr(Config, "TRENDS_SNAPSHOT_PATH", str(path))
+    monkeypatch.setattr(Config, "TRENDS_HIGHLIGHT_CACHE_PATH", str(tmp_path / "highlights.sqlite3"))
+    monkeypatch.setattr(Config, "TRENDS_REFRESH_ENABLED", False)
+
+    with TestClient(app) as client:
+        async def fail():
+            raise AssertionError("pipeline should not run")
+
+        app.state.trends_service.get_trends = fail
+        response = client.get("/api/trends")
+
+    assert response.status_code == 200
+    assert response.json()["items"][0]["title"] == "Test Article"
+
+
+def test_regions_get_their_own_snapshot_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "TRENDS_SNAPSHOT_PATH", str(tmp_path / "trends_snapshot.json"))
+    monkeypatch.setattr(Config, "TRENDS_REGION", "us")
+
+    assert SnapshotStore.from_config("us").path == str(tmp_path / "trends_snapshot.json")
+    assert SnapshotStore.from_config("gb").path == str(tmp_path / "trends_snapshot.gb.json")
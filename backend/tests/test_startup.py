@@ -0,0 +1,104 @@
+"""
+Unit tests for the startup profile and lazy SDK loading.
+"""
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from backend.core.config import Config
+from backend.core.startup import StartupProfile
+from backend.services.trends_service import TrendsService
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_report_lists_steps_and_deferred_imports(clock, tmp_path, monkeypatch):
+    profile = StartupProfile(clock=clock)
+
+    with profile.measure("trends_service"):
+        clock.now += 0.5
+    profile.mark_ready()
+
+    (tmp_path / "lazy_sdk_module.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = profile.import_module("lazy_sdk_module")
+    monkeypatch.delitem(sys.modules, "lazy_sdk_module")
+
+    report = profile.report()
+    assert module.VALUE == 1
+    assert report["ready_seconds"] == 0.5
+    assert report["init"] == [{"name": "trends_service", "seconds": 0.5, "deferred": False}]
+    assert [(s["name"], s["deferred"]) for s in report["imports"]] == [("lazy_sdk_module", True)]
+
+
+def test_trace_imports_records_modules_until_ready(tmp_path, monkeypatch):
+    package = tmp_path / "traced_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("from traced_pkg import child\n")
+    (package / "child.py").write_text("VALUE = 1\n")
+    (tmp_path / "untraced_module.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    profile = StartupProfile()
+    profile.trace_imports(("traced_pkg",))
+    try:
+        import traced_pkg
+        import untraced_module  # noqa: F401
+    finally:
+        profile.mark_ready()
+        for name in ("traced_pkg", "traced_pkg.child", "untraced_module"):
+            monkeypatch.delitem(sys.modules, name, raising=False)
+
+    assert traced_pkg.child.VALUE == 1
+    assert {s["name"] for s in profile.report()["imports"]} == {"traced_pkg", "traced_pkg.child"}
+    assert not any(type(finder).__name__ == "_ImportTracer" for finder in sys.meta_path)
+
+
+def test_openai_client_is_created_on_first_use(monkeypatch):
+    monkeypatch.setattr(Config, "OPENAI_API_KEY", "test-key")
+    service = TrendsService(serpapi_http=MagicMock())
+
+    assert service.openai_available
+    assert service._openai_client is None
+
+    client = service.openai_client
+    assert client is not None
+    assert service.openai_client is client
+
+    # An explicit None (OpenAI disabled) is never replaced by a created client
+    disabled = TrendsService(serpapi_http=MagicMock())
+    disabled.openai_client = None
+    assert not disabled.openai_available
+    assert disabled.openai_client is None
+
+
+def test_health_is_served_before_sdks_load(tmp_path):
+    """Importing the app and answering a health check does not import the OpenAI SDK."""
+    script = (
+        "import sys\n"
+        "from fastapi.testclient import TestClient\n"
+        "from backend.main import app\n"
+        "with TestClient(app) as client:\n"
+        "    assert client.get('/api/trends/health').status_code == 200\n"
+        "assert 'openai' not in sys.modules, 'openai was imported'\n"
+    )
+    env = {
+        "PATH": "",
+        "OPENAI_API_KEY": "test-key",
+        "TRENDS_REFRESH_ENABLED": "false",
+        "TRENDS_SNAPSHOT_PATH": "",
+        "TRENDS_HIGHLIGHT_CACHE_PATH": str(tmp_path / "highlights.sqlite3"),
+        "TRENDS_STARTUP_PROFILE": "true",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "Startup profile: ready in" in result.stderr
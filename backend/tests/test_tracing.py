@@ -0,0 +1,198 @@
+"""
+Unit tests for span tracing and the /debug/traces endpoint.
+"""
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.fake_upstreams import FakeOpenAI, FakeSerpAPI
+from backend.core.config import Config
+from backend.core.tracing import TRACER, OTLPFileExporter, Tracer
+from backend.main import app
+from backend.models.trends import TrendItem, TrendsResponse
+from backend.services.trends_cache import TrendsCache
+from backend.services.trends_service import TrendsService
+
+
+def span_names(trace) -> list[str]:
+    return [span.name for span in trace.spans]
+
+
+def test_nested_spans_form_one_trace():
+    tracer = Tracer()
+
+    with tracer.span("request", path="/api/trends"):
+        with tracer.span("fetch"):
+            tracer.set_attribute("results", 3)
+            tracer.add_event("retry", attempt=1)
+        with pytest.raises(ValueError):
+            with tracer.span("enrich"):
+                raise ValueError("bad response")
+
+    [trace] = tracer.slowest()
+    root, fetch, enrich = trace.spans
+    assert span_names(trace) == ["request", "fetch", "enrich"]
+    assert fetch.parent_id == enrich.parent_id == root.span_id
+    assert fetch.attributes == {"results": 3}
+    assert fetch.events[0][0] == "retry"
+    assert enrich.status == "error" and enrich.error == "ValueError"
+    assert set(trace.breakdown()) == {"fetch", "enrich"}
+
+
+@pytest.mark.asyncio
+async def test_spans_in_child_tasks_join_the_trace():
+    tracer = Tracer()
+
+    async def query(category):
+        with tracer.span("query", category=category):
+            await asyncio.sleep(0)
+
+    with tracer.span("refresh"):
+        await asyncio.gather(query("ai"), query("startups"))
+
+    # A task outliving its trace starts a new one
+    with tracer.span("request"):
+        task = asyncio.ensure_future(query("late"))
+    await task
+
+    traces = tracer.slowest(name="query")
+    assert sorted(span_names(t)[0] for t in traces) == ["query", "refresh"]
+    refresh = next(t for t in traces if t.root.name == "refresh")
+    assert [s.attributes["category"] for s in refresh.spans[1:]] == ["ai", "startups"]
+
+
+def test_ring_buffer_keeps_recent_traces_and_ranks_by_span():
+    tracer = Tracer(capacity=2, max_spans=2)
+    for name in ("first", "second", "third"):
+        with tracer.span(name):
+            with tracer.span("child"):
+                pass
+            with tracer.span("dropped"):
+                pass
+
+    traces = tracer.slowest(limit=10)
+    assert sorted(t.root.name for t in traces) == ["second", "third"]
+    assert all(t.dropped_spans == 1 for t in traces)
+    assert tracer.slowest(name="dropped") == []
+
+    disabled = Tracer(enabled=False)
+    with disabled.span("request") as span:
+        assert span is None
+    assert disabled.slowest() == []
+
+
+def test_otlp_file_exporter(tmp_path):
+    path = tmp_path / "traces" / "otlp.jsonl"
+    tracer = Tracer(exporter=OTLPFileExporter(str(path)))
+
+    with tracer.span("refresh", region="us"):
+        with tracer.span("openai_chat", attempt=0):
+            pass
+    tracer.close()
+
+    [line] = path.read_text().splitlines()
+    spans = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root, child = spans
+    assert child["parentSpanId"] == root["spanId"] and "parentSpanId" not in root
+    assert root["traceId"] == child["traceId"] and len(root["traceId"]) == 32
+    assert int(root["endTimeUnixNano"]) >= int(child["endTimeUnixNano"])
+    assert {"key": "attempt", "value": {"intValue": "0"}} in child["attributes"]
+    assert root["status"] == {"code": 1}
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stages_are_traced():
+    """get_trends records fetch, per-query, normalize, enrichment and OpenAI spans."""
+    TRACER.clear()
+    with patch.object(Config, "SERPAPI_KEY", "test-key"):
+        service = TrendsService(serpapi_http=FakeSerpAPI().client(), openai_client=FakeOpenAI().client())
+        await service.get_trends(region="us")
+
+    [trace] = TRACER.slowest(name="get_trends")
+    spans = {span.span_id: span for span in trace.spans}
+    assert trace.root.name == "get_trends"
+    assert trace.root.attributes["items"] > 0
+    assert set(trace.breakdown()) == {
+        "fetch_raw_trends", "serpapi_query", "normalize_results", "enrich_batch", "openai_chat"
+    }
+    for span in trace.spans[1:]:
+        parent = spans[span.parent_id].name
+        expected = {
+            "serpapi_query": "fetch_raw_trends",
+            "openai_chat": "enrich_batch",
+        }.get(span.name, "get_trends")
+        assert parent == expected, span.name
+    batches = [s for s in trace.spans if s.name == "enrich_batch"]
+    assert all(any(name == "batch" for name, _, _ in s.events) for s in batches)
+
+
+@pytest.mark.asyncio
+async def test_upstream_errors_do_not_record_the_api_key():
+    """Failed SerpAPI spans keep the error type and status, not the keyed URL."""
+    TRACER.clear()
+    with patch.object(Config, "SERPAPI_KEY", "SECRET-KEY-123"):
+        service = TrendsService(
+            serpapi_http=FakeSerpAPI(error_rate=1.0).client(), openai_client=FakeOpenAI().client()
+        )
+        await service.get_trends(region="us")
+
+    [trace] = TRACER.slowest(name="get_trends")
+    errors = [span.error for span in trace.spans if span.name == "serpapi_query"]
+    assert errors and all(error == "HTTPStatusError: HTTP 500" for error in errors)
+    assert "SECRET-KEY-123" not in json.dumps(trace.to_dict())
+
+
+@pytest.mark.asyncio
+async def test_stale_read_refresh_is_traced_on_its_own():
+    """A refresh started by a stale read is its own trace, not part of the read's."""
+    TRACER.clear()
+    response = TrendsResponse(
+        items=[TrendItem(
+            title="Stale", url="https://example.com/stale", source="example.com",
+            raw_excerpt="Stale excerpt", category="ai"
+        )],
+        last_updated=datetime(2025, 12, 12, 10, 15)
+    )
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300)
+    cache.restore(response, age_seconds=90)
+
+    async def loader():
+        with TRACER.span("get_trends"):
+            await asyncio.sleep(0.01)
+        return response
+
+    with TRACER.span("GET /api/trends"):
+        assert await cache.get(loader) is response
+        # The request is still sending its response when the refresh starts
+        await asyncio.sleep(0.005)
+    await cache.wait_for_refresh()
+
+    [refresh] = TRACER.slowest(name="get_trends")
+    request = next(t for t in TRACER.slowest() if t.root.name == "GET /api/trends")
+    assert span_names(refresh) == ["get_trends"]
+    assert span_names(request) == ["GET /api/trends"]
+
+
+def test_debug_traces_lists_slowest_requests(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "TRENDS_HIGHLIGHT_CACHE_PATH", str(tmp_path / "highlights.sqlite3"))
+    monkeypatch.setattr(Config, "TRENDS_SNAPSHOT_PATH", "")
+    monkeypatch.setattr(Config, "TRENDS_REFRESH_ENABLED", False)
+    TRACER.clear()
+
+    with TestClient(app) as client:
+        assert client.get("/debug/traces").status_code == 404
+        monkeypatch.setattr(Config, "DEBUG_TRACES_ENABLED", True)
+        assert client.get("/api/trends/health").status_code == 200
+        response = client.get("/debug/traces", params={"limit": 5})
+
+    assert response.status_code == 200
+    body = response.json()
+    [trace] = body["traces"]
+    assert trace["name"] == "GET /api/trends/health"
+    assert trace["attributes"]["http.status_code"] == 200
+    assert body["enabled"] is True
@@ -0,0 +1,331 @@
+"""
+API tests for the trends routes.
+"""
+import json
+import threading
+
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.fake_upstreams import FakeOpenAI, FakeSerpAPI
+from backend.core.config import Config
+from backend import main
+from backend.main import app
+from backend.models.trends import TrendItem, TrendsResponse
+from backend.services.shared_snapshot import SharedSnapshotStore
+from backend.services.trends_cache import serialize_response
+from backend.services.trends_service import TrendsService
+
+
+class FakeTrendsService:
+    """Stand-in for TrendsService that counts pipeline runs."""
+
+    def __init__(self):
+        self.calls = 0
+        self.regions = []
+        self.queries = []
+
+    async def get_trends(self, region=None) -> TrendsResponse:
+        self.calls += 1
+        self.regions.append(region)
+        return self._response()
+    
+    async def stream_trends(self, enrich=True, region=None):
+        self.calls += 1
+        self.regions.append(region)
+        response = self._response()
+        highlight = response.items[0].highlight
+        response.items[0].highlight = ""
+        yield "items", list(response.items)
+        response.items[0].highlight = highlight
+        yield "highlights", list(response.items)
+        yield "done", response
+    
+    def remember_snapshot(self, items, region=None):
+        pass
+    
+    async def aclose(self):
+        pass
+    
+    def _response(self) -> TrendsResponse:
+        return TrendsResponse(
+            items=[
+                TrendItem(
+                    title="Test Article",
+                    url="https://example.com/test",
+                    source="example.com",
+                    raw_excerpt="Test excerpt",
+                    highlight="Test highlight",
+                    category="ai"
+                )
+            ],
+            last_updated=datetime(2025, 12, 12, 10, 15)
+        )
+
+
+@pytest.fixture(autouse=True)
+def isolated_app_config(tmp_path, monkeypatch):
+    """Keep the app's highlight cache and snapshot out of the working directory and refresh on read."""
+    monkeypatch.setattr(Config, "TRENDS_HIGHLIGHT_CACHE_PATH", str(tmp_path / "highlights.sqlite3"))
+    monkeypatch.setattr(Config, "TRENDS_SNAPSHOT_PATH", str(tmp_path / "trends_snapshot.json"))
+    monkeypatch.setattr(Config, "TRENDS_REFRESH_ENABLED", False)
+
+
+@pytest.fixture
+def fake_service(monkeypatch):
+    """Make the lifespan create FakeTrendsService as the app's service."""
+    service = FakeTrendsService()
+    monkeypatch.setattr(main, "TrendsService", lambda **kwargs: service)
+    return service
+
+
+def test_lifespan_manages_trends_service():
+    """The lifespan creates one service for the app and closes it on shutdown."""
+    with TestClient(app) as client:
+        service = app.state.trends_service
+        service.aclose = AsyncMock(wraps=service.aclose)
+        assert client.get("/api/trends/health").status_code == 200
+        assert app.state.trends_service is service
+
+    service.aclose.assert_awaited_once()
+
+
+def test_get_trends_uses_cached_snapshot(fake_service):
+    """Repeated requests are served from the snapshot cache."""
+    with TestClient(app) as client:
+        first = client.get("/api/trends")
+        second = client.get("/api/trends")
+
+    assert first.status_code == 200
+    assert first.json()["items"][0]["title"] == "Test Article"
+    assert second.json() == first.json()
+    assert fake_service.calls == 1
+
+
+def test_refresher_warms_snapshot_at_startup(monkeypatch):
+    """With the refresher enabled, requests are served from the warmed snapshot."""
+    monkeypatch.setattr(Config, "TRENDS_REFRESH_ENABLED", True)
+    service = FakeTrendsService()
+    
+    with TestClient(app) as client:
+        app.state.trends_refresher.loader = service.get_trends
+        app.state.trends_cache.invalidate()
+        client.portal.call(app.state.trends_refresher.refresh_once)
+        
+        response = client.get("/api/trends")
+        health = client.get("/api/trends/health").json()
+    
+    assert response.json()["items"][0]["title"] == "Test Article"
+    assert health["refresher"]["last_outcome"] == "success"
+    assert health["refresher"]["running"] is True
+
+
+def test_get_trends_sets_validators(fake_service):
+    """Responses carry ETag, Last-Modified and Cache-Control."""
+    with TestClient(app) as client:
+        response = client.get("/api/trends")
+    
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["last-modified"] == "Fri, 12 Dec 2025 10:15:00 GMT"
+    assert "max-age=" in response.headers["cache-control"]
+
+
+def test_get_trends_if_none_match_returns_304(fake_service):
+    """A matching If-None-Match gets an empty 304; a stale tag gets the body."""
+    with TestClient(app) as client:
+        etag = client.get("/api/trends").headers["etag"]
+        
+        not_modified = client.get("/api/trends", headers={"If-None-Match": etag})
+        weak_match = client.get("/api/trends", headers={"If-None-Match": f'"other", W/{etag}'})
+        changed = client.get("/api/trends", headers={"If-None-Match": '"other"'})
+    
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+    assert weak_match.status_code == 304
+    assert changed.status_code == 200
+    assert changed.json()["items"]
+
+
+def test_get_trends_if_modified_since(fake_service):
+    """If-Modified-Since is honoured when no If-None-Match is sent."""
+    with TestClient(app) as client:
+        same = client.get("/api/trends", headers={"If-Modified-Since": "Fri, 12 Dec 2025 10:15:00 GMT"})
+        older = client.get("/api/trends", headers={"If-Modified-Since": "Thu, 11 Dec 2025 10:15:00 GMT"})
+    
+    assert same.status_code == 304
+    assert older.status_code == 200
+
+
+def test_get_trends_serves_preserialized_body(fake_service):
+    """The response body is the snapshot's bytes, serialized once per refresh."""
+    with TestClient(app) as client:
+        response = client.get("/api/trends")
+        entry = app.state.trends_cache.entry
+    
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == entry.body
+    assert TrendsResponse.model_validate_json(response.content) == entry.response
+
+
+def test_get_trends_filtered_page(fake_service):
+    """Query parameters return an indexed page with its own validator."""
+    with TestClient(app) as client:
+        full = client.get("/api/trends")
+        page = client.get("/api/trends", params={"category": "ai", "limit": 1})
+        none = client.get("/api/trends", params={"category": "startups"})
+        not_modified = client.get(
+            "/api/trends",
+            params={"category": "ai", "limit": 1},
+            headers={"If-None-Match": page.headers["etag"]}
+        )
+        bad_cursor = client.get("/api/trends", params={"cursor": "???"})
+    
+    assert page.status_code == 200
+    assert [i["title"] for i in page.json()["items"]] == ["Test Article"]
+    assert page.json()["next_cursor"] is None
+    assert page.headers["etag"] != full.headers["etag"]
+    assert none.json()["items"] == []
+    assert not_modified.status_code == 304
+    assert bad_cursor.status_code == 400
+
+
+def test_if_modified_since_sees_republished_highlights(fake_service):
+    """Highlights filled in after publishing advance Last-Modified, so date-only revalidation refetches."""
+    with TestClient(app) as client:
+        first = client.get("/api/trends")
+        cache = app.state.trends_cache
+        response = cache.entry.response
+        response.items[0].highlight = "Updated highlight"
+        assert cache.republish(response)
+        revalidated = client.get(
+            "/api/trends",
+            headers={"If-Modified-Since": first.headers["last-modified"]}
+        )
+    
+    assert revalidated.status_code == 200
+    assert revalidated.headers["last-modified"] != first.headers["last-modified"]
+    assert revalidated.json()["items"][0]["highlight"] == "Updated highlight"
+
+
+def _parse_sse(text: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_runs_pipeline_progressively_when_cold(fake_service):
+    """A cold stream sends items first, then highlight patches, then done."""
+    with TestClient(app) as client:
+        response = client.get("/api/trends/stream")
+        cached = app.state.trends_cache.entry
+    
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    assert [e for e, _ in events] == ["item", "highlight", "done"]
+    assert events[0][1]["highlight"] == ""
+    assert events[1][1] == {"url": "https://example.com/test", "highlight": "Test highlight"}
+    assert events[2][1]["count"] == 1
+    # The streamed run also populated the snapshot cache
+    assert cached.response.items[0].highlight == "Test highlight"
+    assert fake_service.calls == 1
+
+
+def test_stream_serves_cached_snapshot(fake_service):
+    """With a snapshot cached, the stream sends it without running the pipeline."""
+    with TestClient(app) as client:
+        client.get("/api/trends")
+        response = client.get("/api/trends/stream")
+    
+    events = _parse_sse(response.text)
+    assert [e for e, _ in events] == ["item", "done"]
+    assert events[0][1]["highlight"] == "Test highlight"
+    assert fake_service.calls == 1
+
+
+def test_stream_adopts_snapshot_from_lease_holder(fake_service, tmp_path, monkeypatch):
+    """A cold stream whose refresh waits on another worker's lease sends that worker's snapshot."""
+    path = str(tmp_path / "shared.sqlite3")
+    monkeypatch.setattr(Config, "TRENDS_SHARED_CACHE_PATH", path)
+    other_worker = SharedSnapshotStore(path, Config.TRENDS_REGION)
+    assert other_worker.acquire_lease("other-worker")
+    
+    def publish():
+        response = fake_service._response()
+        response.items[0].title = "Published Elsewhere"
+        other_worker.save(serialize_response(response))
+        other_worker.release_lease("other-worker")
+    
+    with TestClient(app) as client:
+        timer = threading.Timer(0.5, publish)
+        timer.start()
+        try:
+            response = client.get("/api/trends/stream")
+        finally:
+            timer.join()
+    other_worker.close()
+    
+    events = _parse_sse(response.text)
+    assert [e for e, _ in events] == ["item", "done"]
+    assert events[0][1]["title"] == "Published Elsewhere"
+    assert fake_service.calls == 0
+
+
+def test_two_phase_stream_leaves_enrichment_to_the_worker(monkeypatch):
+    """In two-phase mode a cold stream publishes pending items and queues them for the worker."""
+    monkeypatch.setattr(Config, "TRENDS_TWO_PHASE", True)
+    monkeypatch.setattr(Config, "SERPAPI_KEY", "test-key")
+    openai = FakeOpenAI()
+    monkeypatch.setattr(
+        main,
+        "TrendsService",
+        lambda **kwargs: TrendsService(serpapi_http=FakeSerpAPI().client(), openai_client=openai.client(), **kwargs)
+    )
+    
+    with TestClient(app) as client:
+        region = app.state.trends_regions[Config.TRENDS_REGION]
+        # Record what is queued instead of letting the worker enrich it
+        queued = []
+        region.worker.queue.put_nowait = queued.append
+        response = client.get("/api/trends/stream")
+    
+    events = _parse_sse(response.text)
+    items = [data for event, data in events if event == "item"]
+    assert items and all(item["enrichment_status"] == "pending" for item in items)
+    assert "highlight" not in {event for event, _ in events}
+    assert queued == [item["url"] for item in items]
+    assert openai.calls == 0
+
+
+def test_regions_have_separate_snapshots(fake_service, monkeypatch):
+    """Each configured region is cached separately; region defaults to TRENDS_REGION."""
+    monkeypatch.setattr(Config, "TRENDS_REGION", "us")
+    monkeypatch.setattr(Config, "TRENDS_REGIONS", "gb, de")
+    with TestClient(app) as client:
+        default = client.get("/api/trends")
+        client.get("/api/trends?region=GB")
+        client.get("/api/trends?region=gb")
+        unknown = client.get("/api/trends?region=fr")
+        regions = app.state.trends_regions
+    
+    assert default.status_code == 200
+    assert fake_service.regions == ["us", "gb"]
+    assert list(regions) == ["us", "gb", "de"]
+    assert regions["gb"].cache.entry is not None
+    assert regions["de"].cache.entry is None
+    assert unknown.status_code == 400
+
+
+def test_health_reports_requested_region(monkeypatch):
+    monkeypatch.setattr(Config, "TRENDS_REGIONS", "gb")
+    with TestClient(app) as client:
+        health = client.get("/api/trends/health?region=gb").json()
+    
+    assert health["region"] == "gb"
+    assert health["cache"]["has_snapshot"] is False
+    assert "gb" in health["regions"]
@@ -0,0 +1,158 @@
+"""
+Unit tests for TrendsCache.
+"""
+import asyncio
+import pytest
+from datetime import datetime
+
+from backend.models.trends import TrendsResponse
+from backend.services.trends_cache import TrendsCache
+from backend.tests.conftest import make_response
+
+
+class CountingLoader:
+    """Loader that returns a new response per call and counts invocations."""
+
+    def __init__(self, responses=None):
+        self.calls = 0
+        self.responses = responses
+
+    async def __call__(self):
+        self.calls += 1
+        if self.responses is not None:
+            return self.responses[self.calls - 1]
+        return make_response(f"Article {self.calls}")
+
+
+@pytest.mark.asyncio
+async def test_fresh_hit_does_not_reload(clock):
+    """Fresh snapshots are served without calling the loader."""
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300, clock=clock)
+    loader = CountingLoader()
+
+    first = await cache.get(loader)
+    clock.now += 30
+    second = await cache.get(loader)
+
+    assert loader.calls == 1
+    assert first is second
+
+
+@pytest.mark.asyncio
+async def test_stale_hit_returns_old_snapshot_and_refreshes_once(clock):
+    """Stale snapshots are served immediately while one background refresh runs."""
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300, clock=clock)
+    loader = CountingLoader()
+
+    first = await cache.get(loader)
+    clock.now += 120
+
+    stale_a = await cache.get(loader)
+    stale_b = await cache.get(loader)
+    assert stale_a is first
+    assert stale_b is first
+
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert loader.calls == 2
+    refreshed = await cache.get(loader)
+    assert refreshed.items[0].title == "Article 2"
+
+
+@pytest.mark.asyncio
+async def test_expired_snapshot_blocks_on_refresh(clock):
+    """Snapshots past the stale window are rebuilt before returning."""
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300, clock=clock)
+    loader = CountingLoader()
+
+    await cache.get(loader)
+    clock.now += 1000
+    response = await cache.get(loader)
+
+    assert loader.calls == 2
+    assert response.items[0].title == "Article 2"
+
+
+@pytest.mark.asyncio
+async def test_empty_refresh_keeps_previous_snapshot(clock):
+    """A failed (empty) refresh keeps the last good snapshot."""
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300, retry_seconds=10, clock=clock)
+    empty = TrendsResponse(items=[], last_updated=datetime.utcnow())
+    loader = CountingLoader(responses=[make_response("Good"), empty])
+
+    await cache.get(loader)
+    clock.now += 1000
+    response = await cache.get(loader)
+
+    assert loader.calls == 2
+    assert response.items[0].title == "Good"
+
+    # Retry is deferred rather than attempted on every request
+    clock.now += 5
+    await cache.get(loader)
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_cold_callers_share_one_refresh():
+    """Concurrent callers on a cold cache await a single shared refresh."""
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300)
+    release = asyncio.Event()
+    calls = 0
+
+    async def slow_loader():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return make_response()
+
+    waiters = [asyncio.create_task(cache.get(slow_loader)) for _ in range(20)]
+    await asyncio.sleep(0)
+    release.set()
+    responses = await asyncio.gather(*waiters)
+
+    assert calls == 1
+    assert all(r is responses[0] for r in responses)
+    assert cache.coalesced_waiters == 19
+    assert cache.stats()["refreshes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_refresh():
+    """One caller going away does not abort the refresh others wait on."""
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300)
+    release = asyncio.Event()
+
+    async def slow_loader():
+        await release.wait()
+        return make_response()
+
+    first = asyncio.create_task(cache.get(slow_loader))
+    second = asyncio.create_task(cache.get(slow_loader))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    response = await second
+    assert response.items[0].title == "Test Article"
+
+
+@pytest.mark.asyncio
+async def test_unchanged_refresh_keeps_snapshot_and_etag(clock):
+    """A refresh with identical items keeps the previous response and ETag."""
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300, clock=clock)
+    loader = CountingLoader(responses=[make_response("Same"), make_response("Same"), make_response("New")])
+
+    first = await cache.get_entry(loader)
+    etag = first.etag
+
+    clock.now += 1000
+    second = await cache.get_entry(loader)
+    assert second.response is first.response
+    assert second.etag == etag
+    assert cache.seconds_until_stale(second) == 60
+
+    clock.now += 1000
+    third = await cache.get_entry(loader)
+    assert third.etag != etag
@@ -0,0 +1,79 @@
+"""
+Unit tests for TrendsIndex.
+"""
+import json
+import pytest
+from datetime import datetime, timedelta
+
+from backend.models.trends import TrendsResponse
+from backend.services.trends_index import InvalidCursorError, TrendsIndex
+from backend.tests.conftest import make_item
+
+NOW = datetime(2025, 12, 12, 12, 0)
+
+
+@pytest.fixture
+def index():
+    items = [
+        make_item(0, "ai", published_at=NOW - timedelta(hours=1)),
+        make_item(1, "startups", published_at=NOW - timedelta(hours=2)),
+        make_item(2, "ai", source="techcrunch.com", published_at=NOW - timedelta(hours=3)),
+        make_item(3, "ai", published_at=NOW - timedelta(hours=5)),
+        make_item(4, "startups", source="techcrunch.com", published_at=NOW - timedelta(hours=8)),
+        make_item(5, "ai"),  # undated
+    ]
+    return TrendsIndex(TrendsResponse(items=items, last_updated=NOW))
+
+
+def titles(page) -> list[str]:
+    return [item["title"] for item in json.loads(page.body)["items"]]
+
+
+def test_query_by_category_newest_first(index):
+    page = index.query(category="ai")
+    assert titles(page) == ["Article 0", "Article 2", "Article 3", "Article 5"]
+    assert page.next_cursor is None
+
+
+def test_query_by_category_and_source(index):
+    assert titles(index.query(category="ai", source="techcrunch.com")) == ["Article 2"]
+    assert titles(index.query(category="unknown")) == []
+
+
+def test_query_since_excludes_older_and_undated(index):
+    page = index.query(since=NOW - timedelta(hours=3))
+    assert titles(page) == ["Article 0", "Article 1", "Article 2"]
+
+
+def test_pagination_with_cursor(index):
+    first = index.query(category="ai", limit=2)
+    assert titles(first) == ["Article 0", "Article 2"]
+    assert first.next_cursor is not None
+
+    second = index.query(category="ai", limit=2, cursor=first.next_cursor)
+    assert titles(second) == ["Article 3", "Article 5"]
+    assert second.next_cursor is None
+    assert json.loads(second.body)["next_cursor"] is None
+
+
+def test_cursor_survives_new_snapshot(index):
+    """Keyset cursors continue correctly after a refresh adds newer items."""
+    first = index.query(category="ai", limit=2)
+
+    refreshed = TrendsIndex(TrendsResponse(
+        items=[make_item(9, "ai", published_at=NOW - timedelta(hours=0))] + list(index.response.items),
+        last_updated=NOW
+    ))
+    assert titles(refreshed.query(category="ai", cursor=first.next_cursor)) == ["Article 3", "Article 5"]
+
+
+def test_page_body_matches_response_schema(index):
+    page = index.query(source="techcrunch.com")
+    parsed = TrendsResponse.model_validate_json(page.body)
+    assert [i.title for i in parsed.items] == ["Article 2", "Article 4"]
+    assert parsed.last_updated == NOW
+
+
+def test_invalid_cursor(index):
+    with pytest.raises(InvalidCursorError):
+        index.query(cursor="not-a-cursor")
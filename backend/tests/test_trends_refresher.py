@@ -0,0 +1,88 @@
+"""
+Unit tests for TrendsRefresher.
+"""
+import asyncio
+import pytest
+
+from backend.services.trends_cache import TrendsCache
+from backend.services.trends_refresher import TrendsRefresher
+from backend.tests.conftest import make_response
+
+
+@pytest.mark.asyncio
+async def test_refresh_once_records_success():
+    """A successful refresh stores the snapshot and records the outcome."""
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300)
+
+    async def loader():
+        return make_response("Warm")
+
+    refresher = TrendsRefresher(cache, loader, deadline_seconds=1)
+    assert await refresher.refresh_once() is True
+
+    assert cache.entry.response.items[0].title == "Warm"
+    stats = refresher.stats()
+    assert stats["last_outcome"] == "success"
+    assert stats["consecutive_failures"] == 0
+    assert stats["last_duration_seconds"] is not None
+
+
+@pytest.mark.asyncio
+async def test_refresh_deadline_keeps_last_good_snapshot():
+    """A refresh that overruns its deadline is cancelled; the last snapshot stays."""
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300)
+    responses = iter([make_response("Good")])
+
+    async def loader():
+        try:
+            return next(responses)
+        except StopIteration:
+            await asyncio.sleep(10)
+
+    refresher = TrendsRefresher(cache, loader, deadline_seconds=0.05)
+    await refresher.refresh_once()
+    assert await refresher.refresh_once() is False
+
+    assert refresher.last_outcome == "timeout"
+    assert refresher.consecutive_failures == 1
+    assert cache.entry.response.items[0].title == "Good"
+
+
+@pytest.mark.asyncio
+async def test_reads_never_refresh_while_refresher_owns_cache():
+    """With a refresher running, stale reads do not trigger upstream calls."""
+    clock_now = [1000.0]
+    cache = TrendsCache(ttl_seconds=60, stale_seconds=300, clock=lambda: clock_now[0])
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        return make_response(f"Run {calls}")
+
+    refresher = TrendsRefresher(cache, loader, interval_seconds=3600, jitter_seconds=0)
+    refresher.start()
+    await asyncio.sleep(0)
+    response = await cache.get(loader)  # joins the startup warm-up
+    assert response.items[0].title == "Run 1"
+
+    clock_now[0] += 10_000  # far beyond TTL + stale window
+    response = await cache.get(loader)
+    await asyncio.sleep(0)
+
+    assert calls == 1
+    assert response.items[0].title == "Run 1"
+    await refresher.stop()
+    assert cache.refresh_on_read is True
+
+
+def test_next_delay_applies_jitter_and_retry():
+    cache = TrendsCache()
+
+    async def loader():
+        return make_response()
+
+    refresher = TrendsRefresher(cache, loader, interval_seconds=600, jitter_seconds=60, retry_seconds=30)
+    delays = [refresher.next_delay(True) for _ in range(50)]
+    assert all(540 <= d <= 660 for d in delays)
+    assert refresher.next_delay(False) == 30
@@ -1,33 +1,43 @@
 """
 Unit tests for TrendsService.
 """
+import asyncio
+import json
+import time
+
 import pytest
-from datetime import datetime
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
+from openai import RateLimitError
+
+from backend.benchmarks.fake_upstreams import FakeOpenAI, FakeSerpAPI
+from backend.core.config import Config
 from backend.models.trends import TrendItem
+from backend.services.query_registry import TREND_QUERIES, TrendQuery
+from backend.services.resilience import Deadline
 from backend.services.trends_service import TrendsService
 
 
 @pytest.fixture
-def mock_google_response():
-    """Mock Google Search API response."""
+def mock_serpapi_response():
+    """Mock SerpAPI Google search response."""
     return {
-        "items": [
+        "search_metadata": {"status": "Success"},
+        "organic_results": [
             {
+                "position": 1,
                 "title": "AI Startup Raises $50M",
                 "link": "https://example.com/ai-startup",
                 "snippet": "A new AI startup has raised significant funding...",
-                "pagemap": {
-                    "metatags": [{
-                        "article:published_time": "2025-12-11T08:00:00Z"
-                    }]
-                }
+                "date": "2025-12-11T08:00:00Z"
             },
             {
+                "position": 2,
                 "title": "Software Engineering Trends 2025",
-                "link": "https://techcrunch.com/eng-trends",
-                "snippet": "Latest trends in software engineering...",
+                "link": "https://www.techcrunch.com/eng-trends",
+                "snippet": "Latest trends in software engineering..."
             }
         ]
     }
@@ -35,57 +45,45 @@ def mock_google_response():
 
 @pytest.fixture
 def trends_service():
-    """Create a TrendsService instance."""
-    with patch("backend.services.trends_service.Config") as mock_config:
-        mock_config.GOOGLE_SEARCH_API_KEY = "test-key"
-        mock_config.GOOGLE_SEARCH_ENGINE_ID = "test-engine-id"
-        mock_config.OPENAI_API_KEY = "test-openai-key"
-        mock_config.is_google_configured.return_value = True
-        mock_config.is_openai_configured.return_value = True
-        mock_config.GOOGLE_TRENDS_REGION = "US"
-        
-        service = TrendsService()
-        service.google_api_key = "test-key"
-        service.google_engine_id = "test-engine-id"
-        return service
+    """Create a TrendsService instance with stubbed SerpAPI and OpenAI clients."""
+    with patch.object(Config, "SERPAPI_KEY", "test-key"):
+        return TrendsService(serpapi_http=MagicMock(), openai_client=MagicMock())
 
 
 @pytest.mark.asyncio
-async def test_fetch_raw_trends_success(trends_service, mock_google_response):
+async def test_fetch_raw_trends_success(serpapi_service, mock_serpapi_response):
     """Test successful fetching of raw trends."""
-    with patch("httpx.AsyncClient") as mock_client:
-        mock_response = MagicMock()
-        mock_response.json.return_value = mock_google_response
-        mock_response.raise_for_status = MagicMock()
-        
-        mock_client_instance = AsyncMock()
-        mock_client_instance.__aenter__.return_value = mock_client_instance
-        mock_client_instance.__aexit__.return_value = None
-        mock_client_instance.get = AsyncMock(return_value=mock_response)
-        mock_client.return_value = mock_client_instance
-        
-        results = await trends_service.fetch_raw_trends()
-        
-        assert len(results) > 0
-        assert "title" in results[0]
-        assert "link" in results[0]
+    mock_response = MagicMock()
+    mock_response.json.return_value = mock_serpapi_response
+    mock_response.raise_for_status = MagicMock()
+    serpapi_service.serpapi_http.get = AsyncMock(return_value=mock_response)
+    
+    results = await serpapi_service.fetch_raw_trends()
+    
+    assert len(results) == 2 * len(TREND_QUERIES)
+    assert "title" in results[0]
+    assert "link" in results[0]
+    assert results[0]["category"] == TREND_QUERIES[0]["category"]
+    params = serpapi_service.serpapi_http.get.call_args.kwargs["params"]
+    assert params["engine"] == "google"
+    assert params["api_key"] == "test-key"
 
 
 @pytest.mark.asyncio
 async def test_fetch_raw_trends_no_config():
-    """Test fetching trends when Google API is not configured."""
-    with patch("backend.services.trends_service.Config") as mock_config:
-        mock_config.is_google_configured.return_value = False
-        
-        service = TrendsService()
+    """Test fetching trends when SerpAPI is not configured."""
+    with patch.object(Config, "SERPAPI_KEY", None):
+        service = TrendsService(serpapi_http=MagicMock(), openai_client=MagicMock())
+        service.serpapi_http.get = AsyncMock()
         results = await service.fetch_raw_trends()
-        
-        assert results == []
+    
+    assert results == []
+    service.serpapi_http.get.assert_not_called()
 
 
-def test_normalize_results(trends_service, mock_google_response):
+def test_normalize_results(trends_service, mock_serpapi_response):
     """Test normalization of raw results."""
-    raw_items = mock_google_response["items"]
+    raw_items = mock_serpapi_response["organic_results"]
     raw_items[0]["category"] = "startups"
     raw_items[1]["category"] = "software_engineering"
     
@@ -93,9 +91,12 @@ def test_normalize_results(trends_service, mock_google_response):
     
     assert len(normalized) == 2
     assert isinstance(normalized[0], TrendItem)
+    # Dated items sort before undated ones
     assert normalized[0].title == "AI Startup Raises $50M"
     assert normalized[0].category == "startups"
     assert normalized[0].source == "example.com"
+    assert normalized[0].published_at == datetime(2025, 12, 11, 8, 0, tzinfo=timezone.utc)
+    assert normalized[1].source == "techcrunch.com"
 
 
 def test_normalize_results_deduplication(trends_service):
@@ -138,16 +139,14 @@ async def test_enrich_with_ai_success(trends_service):
     mock_openai_response.choices[0].message.content = "AI-generated highlight here"
     
     trends_service.openai_client = MagicMock()
-    trends_service.openai_client.chat.completions.create = MagicMock(
+    trends_service.openai_client.chat.completions.create = AsyncMock(
         return_value=mock_openai_response
     )
     
-    # Mock asyncio.to_thread or run_in_executor
-    with patch("asyncio.to_thread", new_callable=AsyncMock, return_value=mock_openai_response) as mock_to_thread:
-        enriched = await trends_service.enrich_with_ai(items)
-        
-        assert len(enriched) == 1
-        assert enriched[0].highlight == "AI-generated highlight here"
+    enriched = await trends_service.enrich_with_ai(items)
+    
+    assert len(enriched) == 1
+    assert enriched[0].highlight == "AI-generated highlight here"
 
 
 @pytest.mark.asyncio
@@ -172,35 +171,468 @@ async def test_enrich_with_ai_no_openai(trends_service):
 
 
 @pytest.mark.asyncio
-async def test_get_trends_end_to_end(trends_service, mock_google_response):
-    """Test end-to-end get_trends flow."""
-    with patch("httpx.AsyncClient") as mock_client:
-        # Mock Google API response
-        mock_response = MagicMock()
-        mock_response.json.return_value = mock_google_response
-        mock_response.raise_for_status = MagicMock()
+async def test_get_trends_end_to_end():
+    """Test end-to-end get_trends flow against the fake SerpAPI and OpenAI servers."""
+    serpapi = FakeSerpAPI()
+    openai = FakeOpenAI()
+    with patch.object(Config, "SERPAPI_KEY", "test-key"):
+        service = TrendsService(serpapi_http=serpapi.client(), openai_client=openai.client())
+        response = await service.get_trends()
+    
+    expected = sum(query["num_results"] for query in TREND_QUERIES)
+    assert len(response.items) == expected
+    assert isinstance(response.last_updated, datetime)
+    assert all(item.highlight and item.enrichment_status == "done" for item in response.items)
+    assert serpapi.calls == len(TREND_QUERIES)
+    assert openai.calls == service.batcher.calls
+
+
+@pytest.mark.asyncio
+async def test_get_trends_tolerates_injected_upstream_errors():
+    """Failing upstream requests drop results or highlights, never the response."""
+    serpapi = FakeSerpAPI(error_rate=0.5, seed=1)
+    openai = FakeOpenAI(error_rate=1.0)
+    with patch.object(Config, "SERPAPI_KEY", "test-key"):
+        service = TrendsService(serpapi_http=serpapi.client(), openai_client=openai.client())
+        response = await service.get_trends()
+    
+    assert 0 < serpapi.errors < len(TREND_QUERIES)
+    assert response.items
+    assert all(item.highlight == "" for item in response.items)
+    assert service.enrichment_tiers["error"] > 0
+
+
+@pytest.fixture
+def serpapi_service():
+    """TrendsService with SerpAPI configured and a stubbed HTTP client."""
+    with patch.object(Config, "SERPAPI_KEY", "test-key"):
+        service = TrendsService(serpapi_http=MagicMock(), openai_client=MagicMock())
+        yield service
+
+
+@pytest.mark.asyncio
+async def test_fetch_raw_trends_runs_queries_concurrently(serpapi_service):
+    """Fetch latency is the slowest query, not the sum of all queries."""
+    async def slow_search(params):
+        await asyncio.sleep(0.2)
+        return {"organic_results": [{"title": params["q"], "link": f"https://example.com/{params['q']}"}]}
+    
+    serpapi_service._serpapi_search = slow_search
+    
+    with patch.object(Config, "SERPAPI_MAX_CONCURRENCY", len(TREND_QUERIES)):
+        started = time.monotonic()
+        results = await serpapi_service.fetch_raw_trends()
+        elapsed = time.monotonic() - started
+    
+    assert len(results) == len(TREND_QUERIES)
+    assert elapsed < 0.2 * len(TREND_QUERIES) / 2
+    # Results keep TREND_QUERIES order
+    assert [r["category"] for r in results] == [q["category"] for q in TREND_QUERIES]
+
+
+@pytest.mark.asyncio
+async def test_fetch_raw_trends_isolates_slow_and_failing_queries(serpapi_service):
+    """A hung or failing query does not hold up or break the others."""
+    hung_query = TREND_QUERIES[0]["query"]
+    failing_query = TREND_QUERIES[1]["query"]
+    
+    async def search(params):
+        if params["q"] == hung_query:
+            await asyncio.sleep(10)
+        if params["q"] == failing_query:
+            raise RuntimeError("upstream error")
+        return {"organic_results": [{"title": params["q"], "link": "https://example.com/a"}]}
+    
+    serpapi_service._serpapi_search = search
+    
+    with patch.object(Config, "SERPAPI_QUERY_TIMEOUT_SECONDS", 0.05):
+        results = await serpapi_service.fetch_raw_trends()
+    
+    categories = {r["category"] for r in results}
+    assert categories == {q["category"] for q in TREND_QUERIES[2:]}
+
+
+def _make_items(count: int) -> list[TrendItem]:
+    return [
+        TrendItem(
+            title=f"Article {i}",
+            url=f"https://example.com/{i}",
+            source="example.com",
+            raw_excerpt=f"Excerpt {i}",
+            category="ai"
+        )
+        for i in range(count)
+    ]
+
+
+def _completion(content: str) -> MagicMock:
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    return response
+
+
+@pytest.mark.asyncio
+async def test_enrich_with_ai_runs_batches_concurrently(trends_service):
+    """Batches are enriched in parallel without fixed sleeps, preserving order."""
+    in_flight = 0
+    max_in_flight = 0
+    
+    async def create(**kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        articles = kwargs["messages"][1]["content"].split("\n\n")
+        titles = [a.split("\n")[1].replace("Title: ", "") for a in articles]
+        return _completion(json.dumps([f"Highlight for {t}" for t in titles]))
+    
+    trends_service.openai_client.chat.completions.create = create
+    
+    enriched = await trends_service.enrich_with_ai(_make_items(20))
+    
+    assert max_in_flight > 1
+    assert max_in_flight <= Config.OPENAI_MAX_CONCURRENCY
+    assert [i.highlight for i in enriched] == [f"Highlight for Article {i}" for i in range(20)]
+
+
+@pytest.mark.asyncio
+async def test_chat_completion_honours_retry_after(trends_service):
+    """A 429 waits for the retry-after hint and then retries."""
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    rate_limited = httpx.Response(429, headers={"retry-after-ms": "50"}, request=request)
+    error = RateLimitError("rate limited", response=rate_limited, body=None)
+    
+    trends_service.openai_client.chat.completions.create = AsyncMock(
+        side_effect=[error, _completion("ok")]
+    )
+    
+    started = time.monotonic()
+    response = await trends_service._chat_completion(model="gpt-4o-mini", messages=[])
+    
+    assert response.choices[0].message.content == "ok"
+    assert time.monotonic() - started >= 0.05
+    assert trends_service.openai_client.chat.completions.create.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_trends_emits_items_before_highlights(serpapi_service):
+    """Normalized items are emitted before enrichment, then highlight groups, then done."""
+    async def search(params):
+        return {"organic_results": [{"title": params["q"], "link": f"https://example.com/{params['q']}"}]}
+    
+    serpapi_service._serpapi_search = search
+    serpapi_service.openai_client.chat.completions.create = AsyncMock(
+        return_value=_completion(json.dumps({
+            "highlights": [{"id": str(i + 1), "highlight": "Highlight"} for i in range(len(TREND_QUERIES))]
+        }))
+    )
+    
+    events = []
+    async for event, payload in serpapi_service.stream_trends():
+        if event == "items":
+            assert all(item.highlight == "" for item in payload)
+        events.append((event, payload))
+    
+    assert events[0][0] == "items"
+    assert len(events[0][1]) == len(TREND_QUERIES)
+    assert {e for e, _ in events[1:-1]} == {"highlights"}
+    assert events[-1][0] == "done"
+    assert all(item.highlight for item in events[-1][1].items)
+
+
+@pytest.mark.asyncio
+async def test_get_trends_without_enrichment_leaves_items_pending(trends_service):
+    """enrich=False skips OpenAI and marks the items pending."""
+    trends_service.fetch_raw_trends = AsyncMock(return_value=[
+        {
+            "title": "Article",
+            "link": "https://example.com/a",
+            "snippet": "Excerpt",
+            "displayLink": "example.com",
+            "category": "ai"
+        }
+    ])
+    trends_service.openai_client.chat.completions.create = AsyncMock()
+    
+    response = await trends_service.get_trends(enrich=False)
+    
+    assert [item.enrichment_status for item in response.items] == ["pending"]
+    trends_service.openai_client.chat.completions.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_enrich_batch_uses_structured_output(trends_service):
+    """A batch is one call constrained to the id -> highlight schema."""
+    trends_service.openai_client.chat.completions.create = AsyncMock(
+        return_value=_completion(json.dumps({
+            "highlights": [
+                {"id": "2", "highlight": "Second"},
+                {"id": "1", "highlight": "First"}
+            ]
+        }))
+    )
+    
+    items = await trends_service._enrich_batch(_make_items(2))
+    
+    assert [item.highlight for item in items] == ["First", "Second"]
+    kwargs = trends_service.openai_client.chat.completions.create.call_args.kwargs
+    assert kwargs["response_format"]["type"] == "json_schema"
+    assert trends_service.enrichment_tiers == {"batch": 1}
+
+
+@pytest.mark.asyncio
+async def test_enrich_batch_accepts_labelled_ids(trends_service):
+    """Ids echoed with their label ("Article 1", "id: 2") still match their articles."""
+    trends_service.openai_client.chat.completions.create = AsyncMock(
+        return_value=_completion(json.dumps({
+            "highlights": [
+                {"id": "Article 1", "highlight": "First"},
+                {"id": "id: 2", "highlight": "Second"}
+            ]
+        }))
+    )
+    
+    items = await trends_service._enrich_batch(_make_items(2))
+    
+    assert [item.highlight for item in items] == ["First", "Second"]
+    prompt = trends_service.openai_client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+    assert prompt.startswith("Article id: 1\n")
+    assert trends_service.enrichment_tiers == {"batch": 1}
+
+
+@pytest.mark.asyncio
+async def test_enrich_batch_retries_only_missing_ids(trends_service):
+    """Ids left out of the response are re-asked together, not one call per item."""
+    trends_service.openai_client.chat.completions.create = AsyncMock(side_effect=[
+        _completion(json.dumps({"highlights": [{"id": "1", "highlight": "First"}]})),
+        _completion(json.dumps({
+            "highlights": [
+                {"id": "1", "highlight": "Second"},
+                {"id": "2", "highlight": "Third"}
+            ]
+        }))
+    ])
+    
+    items = await trends_service._enrich_batch(_make_items(3))
+    
+    assert [item.highlight for item in items] == ["First", "Second", "Third"]
+    create = trends_service.openai_client.chat.completions.create
+    assert create.await_count == 2
+    retry_prompt = create.call_args.kwargs["messages"][1]["content"]
+    assert "Article 0" not in retry_prompt
+    assert trends_service.enrichment_tiers == {"batch": 2, "missing_retry": 1}
+
+
+@pytest.mark.asyncio
+async def test_enrich_batch_counts_unresolved_items(trends_service, monkeypatch):
+    """Items still missing after the retries stay empty and are counted."""
+    monkeypatch.setattr(Config, "OPENAI_MISSING_RETRIES", 1)
+    trends_service.openai_client.chat.completions.create = AsyncMock(
+        return_value=_completion("not json")
+    )
+    
+    items = await trends_service._enrich_batch(_make_items(2))
+    
+    assert all(item.highlight == "" for item in items)
+    assert trends_service.openai_client.chat.completions.create.await_count == 2
+    assert trends_service.enrichment_tiers == {"batch": 2, "missing_retry": 1, "unresolved": 2}
+
+
+@pytest.mark.asyncio
+async def test_deadline_returns_unenriched_items(serpapi_service):
+    """When the budget runs out during enrichment, items come back without highlights."""
+    async def search(params):
+        return {"organic_results": [{"title": params["q"], "link": f"https://example.com/{params['q']}"}]}
+    
+    async def hung_create(**kwargs):
+        await asyncio.sleep(10)
+    
+    serpapi_service._serpapi_search = search
+    serpapi_service.openai_client.chat.completions.create = hung_create
+    
+    started = time.monotonic()
+    response = await serpapi_service.get_trends(deadline=Deadline(0.1))
+    
+    assert time.monotonic() - started < 1
+    assert len(response.items) == len(TREND_QUERIES)
+    assert all(item.enrichment_status == "pending" for item in response.items)
+
+
+@pytest.mark.asyncio
+async def test_serpapi_circuit_opens_after_failures(serpapi_service):
+    """Once the SerpAPI circuit opens, queries are skipped without requests."""
+    calls = 0
+    
+    async def failing_search(params):
+        nonlocal calls
+        calls += 1
+        raise httpx.ConnectError("down")
+    
+    serpapi_service._serpapi_search = failing_search
+    serpapi_service.serpapi_breaker.failure_threshold = len(TREND_QUERIES)
+    
+    assert await serpapi_service.fetch_raw_trends() == []
+    assert serpapi_service.serpapi_breaker.state == "open"
+    
+    assert await serpapi_service.fetch_raw_trends() == []
+    assert calls == len(TREND_QUERIES)
+    assert serpapi_service.serpapi_breaker.stats()["rejected"] == len(TREND_QUERIES)
+
+
+@pytest.mark.asyncio
+async def test_incremental_refresh_enriches_only_new_and_changed_items():
+    """Unchanged items keep their highlight; only new or changed ones reach OpenAI."""
+    serpapi = FakeSerpAPI()
+    openai = FakeOpenAI()
+    with patch.object(Config, "SERPAPI_KEY", "test-key"):
+        service = TrendsService(serpapi_http=serpapi.client(), openai_client=openai.client())
+        first = await service.get_trends()
+        openai.reset()
         
-        mock_client_instance = AsyncMock()
-        mock_client_instance.__aenter__.return_value = mock_client_instance
-        mock_client_instance.__aexit__.return_value = None
-        mock_client_instance.get = AsyncMock(return_value=mock_response)
-        mock_client.return_value = mock_client_instance
+        second = await service.get_trends()
+        assert openai.calls == 0
+        assert [i.highlight for i in second.items] == [i.highlight for i in first.items]
+        assert all(item.enrichment_status == "done" for item in second.items)
         
-        # Mock OpenAI response
-        mock_openai_response = MagicMock()
-        mock_openai_response.choices = [MagicMock()]
-        mock_openai_response.choices[0].message.content = "Test highlight"
+        original = serpapi._result
         
-        trends_service.openai_client = MagicMock()
-        trends_service.openai_client.chat.completions.create = MagicMock(
-            return_value=mock_openai_response
-        )
+        def changed_result(query, slug, i):
+            result = original(query, slug, i)
+            if i == 0:
+                result["snippet"] = "Rewritten snippet about a different development."
+            return result
+        
+        serpapi._result = changed_result
+        # Age every query's results past its TTL so the refresh refetches them
+        for key, (fetched_at, results) in service._query_results.items():
+            service._query_results[key] = (fetched_at - 3600, results)
+        prompts = []
+        create = service.openai_client.chat.completions.create
+        
+        async def recording_create(**kwargs):
+            prompts.append(kwargs["messages"][-1]["content"])
+            return await create(**kwargs)
+        
+        service.openai_client.chat.completions.create = recording_create
+        third = await service.get_trends()
+    
+    changed = [item for item in third.items if item.raw_excerpt.startswith("Rewritten")]
+    assert len(changed) == len(TREND_QUERIES)
+    assert sum(prompt.count("Article ") for prompt in prompts) == len(TREND_QUERIES)
+    assert all(item.enrichment_status == "done" for item in third.items)
+
+
+@pytest.mark.asyncio
+async def test_queries_refresh_on_their_own_ttl():
+    """Only due queries hit SerpAPI; the others reuse their previous results."""
+    queries = [
+        TrendQuery("AI startup news", "ai", ttl_seconds=300, priority=10),
+        TrendQuery("Engineering firm innovations", "engineering", ttl_seconds=3600),
+    ]
+    serpapi = FakeSerpAPI()
+    searched = []
+    with patch.object(Config, "SERPAPI_KEY", "test-key"):
+        service = TrendsService(serpapi_http=serpapi.client(), openai_client=MagicMock(), queries=queries)
+        search = service._serpapi_search
+        
+        async def recording_search(params):
+            searched.append(params["q"])
+            return await search(params)
         
-        # Mock asyncio.to_thread for OpenAI calls
-        with patch("asyncio.to_thread", new_callable=AsyncMock, return_value=mock_openai_response):
-            response = await trends_service.get_trends()
-            
-            assert response.items is not None
-            assert response.last_updated is not None
-            assert isinstance(response.last_updated, datetime)
+        service._serpapi_search = recording_search
+        first = await service.fetch_raw_trends()
+        
+        # Age the AI results past their TTL, but not the engineering ones
+        key = (service.region, "AI startup news")
+        fetched_at, results = service._query_results[key]
+        service._query_results[key] = (fetched_at - 400, results)
+        second = await service.fetch_raw_trends()
+    
+    # Both queries once (AI first, by priority), then only the expired AI query
+    assert searched == ["AI startup news", "Engineering firm innovations", "AI startup news"]
+    assert {r["category"] for r in second} == {"ai", "engineering"}
+    assert len(second) == len(first)
+    stats = {s["category"]: s for s in service.query_stats()}
+    assert stats["engineering"]["age_seconds"] < 300
+
+
+@pytest.mark.asyncio
+async def test_failed_query_keeps_previous_results(serpapi_service):
+    """A query that fails after succeeding once serves its last results."""
+    fail = False
+    
+    async def search(params):
+        if fail and params["q"] == TREND_QUERIES[0]["query"]:
+            raise RuntimeError("upstream error")
+        return {"organic_results": [{"title": params["q"], "link": f"https://example.com/{params['q']}"}]}
+    
+    serpapi_service._serpapi_search = search
+    first = await serpapi_service.fetch_raw_trends()
+    fail = True
+    second = await serpapi_service.fetch_raw_trends()
+    
+    assert second == first
+
+
+@pytest.mark.asyncio
+async def test_failed_query_drops_results_past_max_age(serpapi_service):
+    """Retained results older than TRENDS_QUERY_MAX_AGE_SECONDS are not served."""
+    fail = False
+    
+    async def search(params):
+        if fail and params["q"] == TREND_QUERIES[0]["query"]:
+            raise RuntimeError("upstream error")
+        return {"organic_results": [{"title": params["q"], "link": f"https://example.com/{params['q']}"}]}
+    
+    serpapi_service._serpapi_search = search
+    await serpapi_service.fetch_raw_trends()
+    
+    # Age every query's results past the maximum so all are due again
+    for key, (fetched_at, results) in serpapi_service._query_results.items():
+        serpapi_service._query_results[key] = (fetched_at - Config.TRENDS_QUERY_MAX_AGE_SECONDS - 1, results)
+    fail = True
+    second = await serpapi_service.fetch_raw_trends()
+    
+    assert TREND_QUERIES[0]["category"] not in {r["category"] for r in second}
+    assert len(second) == len(TREND_QUERIES) - 1
+    stats = {s["query"]: s for s in serpapi_service.query_stats()}
+    assert stats[TREND_QUERIES[0]["query"]]["age_seconds"] is None
 
+
+@pytest.mark.asyncio
+async def test_serpapi_errors_are_logged_without_the_api_key(caplog):
+    """A SerpAPI error status is logged by code; the keyed request URL is not."""
+    with patch.object(Config, "SERPAPI_KEY", "SECRET-KEY-123"):
+        service = TrendsService(serpapi_http=FakeSerpAPI(error_rate=1.0).client(), openai_client=MagicMock())
+        with caplog.at_level("ERROR", logger="backend.services.trends_service"):
+            assert await service.fetch_raw_trends() == []
+    
+    assert "SerpAPI returned HTTP 500" in caplog.text
+    assert "SECRET-KEY-123" not in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_regions_share_highlights():
+    """A second region fetches its own results but does not re-enrich shared stories."""
+    serpapi = FakeSerpAPI()
+    openai = FakeOpenAI()
+    regions = []
+    with patch.object(Config, "SERPAPI_KEY", "test-key"):
+        service = TrendsService(serpapi_http=serpapi.client(), openai_client=openai.client())
+        search = service._serpapi_search
+        
+        async def recording_search(params):
+            regions.append(params["gl"])
+            return await search(params)
+        
+        service._serpapi_search = recording_search
+        us = await service.get_trends(region="us")
+        openai.reset()
+        gb = await service.get_trends(region="gb")
+    
+    assert regions == ["us"] * len(TREND_QUERIES) + ["gb"] * len(TREND_QUERIES)
+    assert openai.calls == 0
+    assert [item.highlight for item in gb.items] == [item.highlight for item in us.items]
+    assert all(item.enrichment_status == "done" for item in gb.items)